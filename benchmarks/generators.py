@@ -0,0 +1,88 @@
+#
+# Seeded generators for benchmark missions.
+# Every generator takes an explicit seed, so the same tier always produces the same grid, fleet
+# and instruction strings. Fleets reuse a pool of instruction strings, as production fleets do,
+# and are produced lazily so the million-robot tier never has to be held in memory.
+#
+import random
+
+# Scale tiers: grid size, fleet size, instruction length and number of distinct instruction strings
+TIERS = {
+    'small': {'max_x': 5, 'max_y': 3, 'robots': 100, 'length': 20, 'distinct': 20},
+    '50x50': {'max_x': 50, 'max_y': 50, 'robots': 10000, 'length': 100, 'distinct': 2000},
+    '10k': {'max_x': 10000, 'max_y': 10000, 'robots': 10000, 'length': 100, 'distinct': 2000},
+    'huge': {'max_x': 10 ** 12, 'max_y': 10 ** 12, 'robots': 10000, 'length': 100, 'distinct': 2000},
+    'million': {'max_x': 50, 'max_y': 50, 'robots': 1000000, 'length': 100, 'distinct': 5000},
+}
+
+# Command mixes for the different workloads
+MIXES = {
+    'mixed': 'LRFF',
+    'forward': 'FFFFFFFFFL',
+    'turn': 'LLRRRLRLLF',
+}
+
+#
+# Generate a single instruction string
+#
+# Args:
+#     rng: random.Random instance
+#     length: Number of commands
+#     mix: Key of MIXES selecting the command distribution
+def generate_instructions(rng, length: int, mix: str = 'mixed') -> str:
+    commands = MIXES[mix]
+    return ''.join(rng.choice(commands) for _ in range(length))
+
+#
+# Generate a pool of distinct instruction strings for a tier
+#
+def generate_instruction_pool(tier: str, seed: int, mix: str = 'mixed') -> list:
+    spec = TIERS[tier]
+    rng = random.Random(f"{seed}:{tier}:{mix}:pool")
+    return [generate_instructions(rng, spec['length'], mix) for _ in range(spec['distinct'])]
+
+#
+# Lazily generate the robots of a tier
+#
+# Yields:
+#     Tuple of (x, y, orientation, instructions)
+def iter_robots(tier: str, seed: int, mix: str = 'mixed'):
+    spec = TIERS[tier]
+    pool = generate_instruction_pool(tier, seed, mix)
+    rng = random.Random(f"{seed}:{tier}:{mix}:robots")
+    max_x, max_y = spec['max_x'], spec['max_y']
+    for _ in range(spec['robots']):
+        yield (rng.randint(0, max_x), rng.randint(0, max_y), rng.choice('NESW'), rng.choice(pool))
+
+#
+# Lazily generate robots standing on the edge of a tier's grid and facing off it, so every robot
+# is lost or held by a scent and memory is dominated by the scents rather than the grid
+#
+# Yields:
+#     Tuple of (x, y, orientation, instructions)
+def iter_edge_robots(tier: str, seed: int):
+    spec = TIERS[tier]
+    pool = generate_instruction_pool(tier, seed, 'forward')
+    rng = random.Random(f"{seed}:{tier}:edge:robots")
+    max_x, max_y = spec['max_x'], spec['max_y']
+    for _ in range(spec['robots']):
+        orientation = rng.choice('NESW')
+        if orientation == 'N':
+            x, y = rng.randint(0, max_x), max_y
+        elif orientation == 'S':
+            x, y = rng.randint(0, max_x), 0
+        elif orientation == 'E':
+            x, y = max_x, rng.randint(0, max_y)
+        else:
+            x, y = 0, rng.randint(0, max_y)
+        yield (x, y, orientation, rng.choice(pool))
+
+#
+# Lazily generate a tier as lines of the text input format
+#
+def iter_mission_lines(tier: str, seed: int, mix: str = 'mixed'):
+    spec = TIERS[tier]
+    yield f"{spec['max_x']} {spec['max_y']}"
+    for x, y, orientation, instructions in iter_robots(tier, seed, mix):
+        yield f"{x} {y} {orientation}"
+        yield instructions
@@ -0,0 +1,265 @@
+#
+# Benchmark harness for the Martian Robot Challenge.
+# Times parsing, command execution, forward-heavy, turn-heavy and edge workloads and output
+# formatting separately for each scale tier, writes the results as JSON and can compare them
+# against a stored baseline to flag regressions. Garbage collections are counted for every workload, and --memory
+# adds tracemalloc allocation figures. The edge workload loses robots all around the perimeter, so
+# its peak memory across the 10k and huge tiers shows what large grids cost.
+#
+# Usage:
+#     python3 benchmarks/run_benchmarks.py --tiers small,50x50 --output results.json
+#     python3 benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.15
+#
+import argparse
+import builtins
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generators import TIERS, iter_edge_robots, iter_mission_lines, iter_robots
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from main import parse_input
+from validation import Limits, DEFAULT_LIMITS
+from gc_control import gc_paused, collection_counts
+
+DEFAULT_TIERS = ('small', '50x50')
+DEFAULT_SEED = 2025
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+
+# Workloads timed for every tier
+WORKLOADS = ('parse', 'execute', 'forward', 'turn', 'edge', 'output')
+
+
+#
+# Measured section of a workload: wall time, and optionally tracemalloc allocation figures and
+# garbage collector activity, with the collector optionally paused
+#
+class _Section:
+
+    def __init__(self, memory: bool = False, gc_pause: bool = False):
+        self.memory = memory
+        self.gc_pause = gc_pause
+        self.seconds = None
+        self.figures = {}
+
+    def __enter__(self):
+        self._collections = collection_counts()
+        self._pause = gc_paused() if self.gc_pause else None
+        if self._pause is not None:
+            self._pause.__enter__()
+        if self.memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        if self.memory:
+            # Blocks allocated during the section and still alive, and the peak of traced memory
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self.figures['peak_bytes'] = peak
+            self.figures['live_blocks'] = sum(stat.count for stat in snapshot.statistics('filename'))
+        if self._pause is not None:
+            self._pause.__exit__(*exc_info)
+        self.figures['gc_collections'] = sum(collection_counts()) - sum(self._collections)
+
+
+# Limits accepting a tier, the mission constraints with the coordinate limit lifted for large grids
+def tier_limits(tier: str) -> Limits:
+    spec = TIERS[tier]
+    if max(spec['max_x'], spec['max_y']) <= DEFAULT_LIMITS.max_coordinate:
+        return DEFAULT_LIMITS
+    return Limits(None, DEFAULT_LIMITS.max_instructions)
+
+
+# Run parse_input() over generated lines by standing in for builtins.input
+def _bench_parse(tier: str, seed: int, section: _Section) -> int:
+    limits = tier_limits(tier)
+    lines = iter(list(iter_mission_lines(tier, seed)))
+
+    def fake_input():
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError
+
+    original_input = builtins.input
+    builtins.input = fake_input
+    try:
+        with section:
+            _, robots_data = parse_input(limits)
+    finally:
+        builtins.input = original_input
+    return len(robots_data)
+
+
+# Run a generated fleet through CommandProcessor.execute_commands, resetting one robot as the
+# simulator does
+def _bench_execute(tier: str, seed: int, mix: str, section: _Section) -> int:
+    spec = TIERS[tier]
+    robots = list(iter_edge_robots(tier, seed) if mix == 'edge' else iter_robots(tier, seed, mix))
+    grid = MarsGrid(spec['max_x'], spec['max_y'])
+    command_processor = CommandProcessor()
+
+    count = 0
+    with section:
+        robot = Robot(0, 0, 'N', grid)
+        for x, y, orientation, instructions in robots:
+            robot.reset(x, y, orientation)
+            command_processor.execute_commands(robot, instructions)
+            count += 1
+    return count
+
+
+# Format final robot states and write them to an in-memory stream
+def _bench_output(tier: str, seed: int, section: _Section) -> int:
+    spec = TIERS[tier]
+    grid = MarsGrid(spec['max_x'], spec['max_y'])
+    robots = [Robot(x, y, orientation, grid) for x, y, orientation, _ in iter_robots(tier, seed)]
+    out = io.StringIO()
+
+    with section:
+        write = out.write
+        for robot in robots:
+            write(f"{robot}\n")
+    return len(robots)
+
+
+# Run one workload once, measuring its section
+def _run_once(tier: str, workload: str, seed: int, section: _Section):
+    if workload == 'parse':
+        return _bench_parse(tier, seed, section)
+    if workload == 'output':
+        return _bench_output(tier, seed, section)
+    mix = 'mixed' if workload == 'execute' else workload
+    return _bench_execute(tier, seed, mix, section)
+
+#
+# Time one workload of one tier
+#
+# Args:
+#     memory: Add tracemalloc figures (peak bytes, live blocks) from one extra untimed run
+#     gc_pause: Run the measured sections with the garbage collector frozen and disabled
+#
+# Returns:
+#     Dictionary with seconds (best of repeat), operations, operations per second and garbage
+#     collections during the fastest run, or a skipped reason
+def run_workload(tier: str, workload: str, seed: int = DEFAULT_SEED, repeat: int = DEFAULT_REPEAT,
+                 memory: bool = False, gc_pause: bool = False) -> dict:
+    best = None
+    operations = 0
+    for _ in range(repeat):
+        section = _Section(gc_pause=gc_pause)
+        operations = _run_once(tier, workload, seed, section)
+        if best is None or section.seconds < best.seconds:
+            best = section
+
+    result = {
+        'seconds': best.seconds,
+        'operations': operations,
+        'ops_per_sec': operations / best.seconds if best.seconds else None,
+        'gc_collections': best.figures['gc_collections'],
+    }
+    if memory:
+        # Tracing slows everything down, so allocations come from a separate run
+        section = _Section(memory=True, gc_pause=gc_pause)
+        _run_once(tier, workload, seed, section)
+        result['peak_bytes'] = section.figures['peak_bytes']
+        result['live_blocks'] = section.figures['live_blocks']
+    return result
+
+#
+# Run all workloads for the given tiers
+#
+# Returns:
+#     JSON-serialisable report with metadata and results keyed "tier/workload"
+def run_benchmarks(tiers=DEFAULT_TIERS, workloads=WORKLOADS, seed: int = DEFAULT_SEED,
+                   repeat: int = DEFAULT_REPEAT, memory: bool = False, gc_pause: bool = False) -> dict:
+    results = {}
+    for tier in tiers:
+        for workload in workloads:
+            results[f"{tier}/{workload}"] = run_workload(tier, workload, seed, repeat, memory, gc_pause)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'gc_pause': gc_pause,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+#
+# Compare a report against a baseline report
+#
+# Args:
+#     report: Report from run_benchmarks()
+#     baseline: Stored report to compare against
+#     threshold: Allowed slowdown as a fraction (0.10 allows 10% slower)
+#
+# Returns:
+#     List of (name, baseline seconds, current seconds, ratio) for each regression
+def compare_reports(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or 'seconds' not in previous or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / previous['seconds'] if previous['seconds'] else float('inf')
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['seconds'], result['seconds'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Martian Robot Challenge benchmarks")
+    parser.add_argument("--tiers", default=','.join(DEFAULT_TIERS),
+                        help=f"Comma separated tiers from: {', '.join(TIERS)}")
+    parser.add_argument("--workloads", default=','.join(WORKLOADS),
+                        help=f"Comma separated workloads from: {', '.join(WORKLOADS)}")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Flag regressions against a stored report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before a result counts as a regression")
+    parser.add_argument("--memory", action="store_true",
+                        help="Also measure allocations with tracemalloc in an extra run per workload")
+    parser.add_argument("--gc-pause", action="store_true",
+                        help="Freeze and disable the garbage collector during measured sections")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.tiers.split(','), args.workloads.split(','), args.seed, args.repeat,
+                            args.memory, args.gc_pause)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare_reports(report, json.load(baseline_file), args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.4f}s -> {after:.4f}s ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#
+# Request latency benchmark for the mission service.
+# Starts a MissionService on a free localhost port, sends the sample mission from a number of
+# concurrent clients, each waiting for its response before sending the next request, and reports
+# the p50 and p99 round-trip latency next to the cost of spawning `main.py --batch` per job.
+#
+# Usage:
+#     python3 benchmarks/service_latency.py --requests 2000 --clients 4
+#     python3 benchmarks/service_latency.py --json
+#
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from service import MissionService
+from startup import time_startup
+
+DEFAULT_REQUESTS = 1000
+DEFAULT_CLIENTS = 1
+DEFAULT_SPAWN_RUNS = 10
+
+SAMPLE_REQUEST = {'grid': [5, 3],
+                  'robots': [[1, 1, 'E', 'RFRFRFRF'], [3, 2, 'N', 'FRRFLLFFRRFLL'], [0, 3, 'W', 'LLFFFLFLFL']]}
+
+
+# Value at a percentile of sorted samples, nearest rank
+def percentile(samples: list, fraction: float) -> float:
+    return samples[min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))]
+
+#
+# Measure request round trips against an in-process service
+#
+# Args:
+#     requests: Total number of requests, shared between the clients
+#     clients: Number of connections sending requests at the same time
+#
+# Returns:
+#     Dictionary with the p50, p99 and maximum latency in milliseconds and the request rate
+def measure_latency(requests: int = DEFAULT_REQUESTS, clients: int = DEFAULT_CLIENTS) -> dict:
+    async def client(port, count, latencies):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for index in range(count):
+            line = json.dumps(dict(SAMPLE_REQUEST, id=index)).encode() + b'\n'
+            start = time.perf_counter()
+            writer.write(line)
+            response = json.loads(await reader.readline())
+            latencies.append((time.perf_counter() - start) * 1000)
+            if 'error' in response:
+                raise RuntimeError(response['error'])
+        writer.close()
+
+    async def scenario():
+        service = MissionService()
+        port = await service.start('127.0.0.1', 0)
+        latencies = []
+        try:
+            counts = [requests // clients + (index < requests % clients) for index in range(clients)]
+            start = time.perf_counter()
+            await asyncio.gather(*(client(port, count, latencies) for count in counts if count))
+            seconds = time.perf_counter() - start
+        finally:
+            await service.close()
+        return latencies, seconds
+
+    latencies, seconds = asyncio.run(scenario())
+    latencies.sort()
+    return {'requests': len(latencies), 'clients': clients, 'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99), 'max_ms': latencies[-1],
+            'requests_per_second': len(latencies) / seconds}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mission service latency benchmark")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument("--spawn-runs", type=int, default=DEFAULT_SPAWN_RUNS,
+                        help="Process spawns of main.py --batch timed for comparison, 0 to skip")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = measure_latency(max(args.requests, 1), max(args.clients, 1))
+    if args.spawn_runs > 0:
+        report['spawn'] = time_startup(runs=args.spawn_runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"service   p50 {report['p50_ms']:.2f} ms   p99 {report['p99_ms']:.2f} ms   "
+          f"max {report['max_ms']:.2f} ms   {report['requests_per_second']:.0f} requests/s "
+          f"({report['requests']} requests, {report['clients']} clients)")
+    if 'spawn' in report:
+        print(f"spawn     best {report['spawn']['best_ms']:.2f} ms   median {report['spawn']['median_ms']:.2f} ms "
+              f"(main.py --batch per job)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#
+# Startup benchmark for the --batch mode of the Martian Robot Challenge.
+# Runs `main.py --batch` as a fresh process on the sample mission and reports the best and median
+# wall time from spawn to exit, along with the modules that --batch loads beyond a bare interpreter.
+# Heavy modules on that list (typing, argparse, mmap, ...) are what regress startup-to-first-byte.
+#
+# Usage:
+#     python3 benchmarks/startup.py --runs 30
+#     python3 benchmarks/startup.py --main /path/to/other/checkout/src/main.py --json
+#
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+
+SAMPLE_MISSION = b"5 3\n1 1 E\nRFRFRFRF\n3 2 N\nFRRFLLFFRRFLL\n0 3 W\nLLFFFLFLFL\n"
+
+DEFAULT_RUNS = 30
+
+#
+# Time full process runs of main.py --batch
+#
+# Args:
+#     main: Path of the main.py to run
+#     runs: Number of process runs
+#     args: Mode arguments passed to main.py
+#
+# Returns:
+#     Dictionary with best and median milliseconds per run, and of a bare interpreter for reference
+def time_startup(main: str = MAIN, runs: int = DEFAULT_RUNS, args=('--batch',)) -> dict:
+    def best_and_median(command):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, input=SAMPLE_MISSION, stdout=subprocess.DEVNULL, check=True)
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings), statistics.median(timings)
+
+    best, median = best_and_median([sys.executable, main, *args])
+    bare_best, bare_median = best_and_median([sys.executable, '-c', 'pass'])
+    return {'runs': runs, 'best_ms': best, 'median_ms': median,
+            'interpreter_best_ms': bare_best, 'interpreter_median_ms': bare_median}
+
+#
+# Modules main.py loads for a mode, beyond those of a bare interpreter, from -X importtime
+#
+def loaded_modules(main: str = MAIN, args=('--batch',)) -> list:
+    def imported(command):
+        result = subprocess.run([sys.executable, '-X', 'importtime', *command], input=SAMPLE_MISSION,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        return {line.rsplit('|', 1)[1].strip() for line in result.stderr.decode().splitlines()
+                if line.startswith('import time:') and not line.endswith('| package')}
+
+    return sorted(imported([main, *args]) - imported(['-c', 'pass']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Martian Robot Challenge startup benchmark")
+    parser.add_argument("--main", default=MAIN, help="main.py to run, e.g. from another checkout")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = time_startup(args.main, max(args.runs, 1))
+    report['modules'] = loaded_modules(args.main)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"--batch       best {report['best_ms']:.1f} ms   median {report['median_ms']:.1f} ms")
+    print(f"interpreter   best {report['interpreter_best_ms']:.1f} ms   "
+          f"median {report['interpreter_median_ms']:.1f} ms")
+    print(f"modules       {' '.join(report['modules'])}")
+
+
+if __name__ == "__main__":
+    main()
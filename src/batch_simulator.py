@@ -0,0 +1,243 @@
+#
+# Vectorized batch simulator for fleets of robots sharing one Mars grid.
+# The fleet is held as NumPy arrays of x, y and heading, and every robot advances one instruction
+# per step. Robots only depend on each other through scent, so each block is simulated against the
+# current scent state and then committed in robot order. A robot that was lost on a cell which an
+# earlier robot in the same pass has since scented is re-simulated, so results match running
+# Robot and CommandProcessor sequentially. Extra scents only matter to robots that were lost: every
+# off-grid move of a robot that survived a pass was already blocked by a scent, so only the lost
+# robots from the first conflict onwards are re-simulated. Each pass groups robots by instruction
+# length so the padded instruction matrix stays small, and stops once every robot is lost or done.
+#
+# NumPy is an optional dependency, only needed by this engine.
+#
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy installed
+    np = None
+
+from collections.abc import Callable
+
+from robot import Robot, HEADING_INDEX, DELTA_X, DELTA_Y
+from command_processor import expand_repetitions
+
+# Number of robots simulated together, bounds the size of the instruction matrix
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+# Largest grid dimension for the int64 position arrays, leaving room for the step off the edge
+_MAX_COORDINATE = (1 << 63) - 2
+
+# Largest instruction matrix (robots times padded width) built at once, robots are grouped by
+# instruction length so one long robot does not pad the rows of every short one
+_MAX_MATRIX_CELLS = 1 << 24
+
+# Largest grid area whose scents are copied into a boolean mask for each pass, larger grids
+# check the scent of each off-grid move on the grid itself
+_MAX_MASK_AREA = 1 << 20
+
+# Instruction codes used in the instruction matrix, anything else is a no-op
+_CODE_NOOP = 0
+_CODE_LEFT = 1
+_CODE_RIGHT = 2
+_CODE_FORWARD = 3
+
+#
+# Simulate a fleet of robots on a shared grid
+#
+# Args:
+#     grid: MarsGrid instance, scents left by lost robots are added to it
+#     robots: Iterable of (x, y, orientation, instructions) tuples, as returned by parse_input()
+#     block_size: Number of robots simulated together
+#     warn: Function called with each warning message, in robot order
+#
+# Returns:
+#     List of result strings in robot order, formatted like str(Robot)
+#
+# Raises:
+#     ValueError: If the grid is too large for 64-bit coordinates, or a robot's instructions expand
+#         past command_processor.MAX_EXPANDED_LENGTH
+def simulate_batch(grid, robots, block_size: int = DEFAULT_BLOCK_SIZE, warn: Callable = print) -> list:
+    if np is None:
+        raise ImportError("The batch simulator requires NumPy (pip3 install numpy).")
+    if grid.max_x > _MAX_COORDINATE or grid.max_y > _MAX_COORDINATE:
+        raise ValueError("The batch simulator holds coordinates as 64-bit integers, "
+                         "grids this large need the scalar engine.")
+
+    # Every robot advances one plain instruction per step, so repetition groups are expanded
+    robots = [(x, y, orientation, expand_repetitions(instructions)) for x, y, orientation, instructions in robots]
+    results = []
+    for start in range(0, len(robots), block_size):
+        results.extend(_simulate_block(grid, robots[start:start + block_size], warn))
+    return results
+
+
+# Simulate and commit one block of robots in order
+def _simulate_block(grid, robots, warn) -> list:
+    count = len(robots)
+    headings = []
+    for _, _, orientation, _ in robots:
+        if orientation not in HEADING_INDEX:
+            raise ValueError(f"Invalid orientation '{orientation}'. Must be one of N, E, S, W.")
+        headings.append(HEADING_INDEX[orientation])
+
+    instruction_strings = [instructions for _, _, _, instructions in robots]
+    lengths = np.array([len(instructions) for instructions in instruction_strings], dtype=np.int64)
+    start_x = np.array([robot[0] for robot in robots], dtype=np.int64)
+    start_y = np.array([robot[1] for robot in robots], dtype=np.int64)
+    start_heading = np.array(headings, dtype=np.int64)
+
+    orientations = Robot.ORIENTATIONS
+    results = [None] * count
+    stops = [None] * count  # Number of instructions each robot executed, None for all of them
+    pending = np.arange(count)
+    while len(pending):
+        x, y, heading, lost, lost_step = _simulate_pending(
+            grid, pending, start_x, start_y, start_heading, instruction_strings, lengths)
+
+        # Commit in robot order. Once a robot falls where an earlier robot of this pass left scent,
+        # every later lost robot may depend on it and is re-simulated in the next pass.
+        retry = []
+        for index, cell_x, cell_y, facing, is_lost, step in zip(
+                pending.tolist(), x.tolist(), y.tolist(), heading.tolist(), lost.tolist(), lost_step.tolist()):
+            if is_lost:
+                if retry or grid.has_scent(cell_x, cell_y):
+                    retry.append(index)
+                    continue
+                grid.add_scent(cell_x, cell_y)
+                stops[index] = step + 1
+
+            result = f"{cell_x} {cell_y} {orientations[facing]}"
+            results[index] = result + " LOST" if is_lost else result
+        pending = np.array(retry, dtype=np.int64)
+
+    # Warnings are raised once every outcome is known, so they come out in robot order
+    for (_, _, _, instructions), stop in zip(robots, stops):
+        for instruction in instructions[:stop]:
+            if instruction not in 'LRF':
+                warn(f"Warning: Unknown command '{instruction}' ignored")
+
+    return results
+
+
+# Simulate the pending robots of a block against the current scent state, in groups of similar
+# instruction length whose padded matrix stays under _MAX_MATRIX_CELLS
+#
+# Returns:
+#     Tuple of (x, y, heading, lost, lost_step) arrays in the order of pending
+def _simulate_pending(grid, pending, start_x, start_y, start_heading, instruction_strings, lengths):
+    scented = _scent_mask(grid)
+    x = start_x[pending]
+    y = start_y[pending]
+    heading = start_heading[pending]
+    lost = np.zeros(len(pending), dtype=bool)
+    lost_step = np.full(len(pending), -1, dtype=np.int64)
+
+    pending_lengths = lengths[pending]
+    order = np.argsort(pending_lengths, kind='stable')
+    sorted_lengths = pending_lengths[order].tolist()
+    count = len(order)
+    first = 0
+    while first < count:
+        # Rows are sorted by length, so the last row of a group sets its width and the matrix
+        # size grows with the end of the group: binary search for the largest group that fits
+        low, high = first + 1, count
+        while low < high:
+            middle = (low + high + 1) // 2
+            if (middle - first) * sorted_lengths[middle - 1] <= _MAX_MATRIX_CELLS:
+                low = middle
+            else:
+                high = middle - 1
+        last = low
+        group = order[first:last]
+        codes = _encode_instructions([instruction_strings[index] for index in pending[group].tolist()])
+        (x[group], y[group], heading[group], lost[group], lost_step[group]) = _simulate_arrays(
+            grid, scented, x[group], y[group], heading[group], codes, pending_lengths[group])
+        first = last
+    return x, y, heading, lost, lost_step
+
+
+# Scents of a small grid as a boolean mask, None if the grid is too large or holds scents left
+# off the grid by robots that started there
+def _scent_mask(grid):
+    max_x, max_y = grid.max_x, grid.max_y
+    if (max_x + 1) * (max_y + 1) > _MAX_MASK_AREA:
+        return None
+    scented = np.zeros((max_x + 1, max_y + 1), dtype=bool)
+    for cell_x, cell_y in grid.scent_positions:
+        if not (0 <= cell_x <= max_x and 0 <= cell_y <= max_y):
+            return None
+        scented[cell_x, cell_y] = True
+    return scented
+
+
+# Build a padded matrix of instruction codes, one row per robot
+def _encode_instructions(instruction_strings):
+    table = np.zeros(256, dtype=np.uint8)
+    table[ord('L')] = _CODE_LEFT
+    table[ord('R')] = _CODE_RIGHT
+    table[ord('F')] = _CODE_FORWARD
+
+    width = max((len(instructions) for instructions in instruction_strings), default=0)
+    codes = np.zeros((len(instruction_strings), width), dtype=np.uint8)
+    for row, instructions in enumerate(instruction_strings):
+        raw = np.frombuffer(instructions.encode('latin-1', 'replace'), dtype=np.uint8)
+        codes[row, :len(raw)] = table[raw]
+    return codes
+
+
+# Advance all robots in lockstep against the current scent state without modifying it, until
+# every robot is lost or out of instructions
+#
+# Args:
+#     scented: Scent mask from _scent_mask, None to check scents on the grid
+#     lengths: Number of instructions of each row of codes
+def _simulate_arrays(grid, scented, x, y, heading, codes, lengths):
+    x = x.copy()
+    y = y.copy()
+    heading = heading.copy()
+    lost = np.zeros(len(x), dtype=bool)
+    lost_step = np.full(len(x), -1, dtype=np.int64)
+
+    turn_delta = np.array([0, 3, 1, 0], dtype=np.int64)
+    delta_x = np.array(DELTA_X, dtype=np.int64)
+    delta_y = np.array(DELTA_Y, dtype=np.int64)
+    max_x, max_y = grid.max_x, grid.max_y
+
+    for step in range(codes.shape[1]):
+        active = ~lost & (lengths > step)
+        if not active.any():
+            break
+        command = codes[:, step]
+        heading = np.where(active, (heading + turn_delta[command]) & 3, heading)
+
+        forward = active & (command == _CODE_FORWARD)
+        if not forward.any():
+            continue
+        new_x = x + delta_x[heading]
+        new_y = y + delta_y[heading]
+        inside = (new_x >= 0) & (new_x <= max_x) & (new_y >= 0) & (new_y <= max_y)
+
+        move = forward & inside
+        x = np.where(move, new_x, x)
+        y = np.where(move, new_y, y)
+
+        falling = forward & ~inside
+        if scented is not None:
+            # Robots can start off the grid, the snapshot only holds scents on the grid
+            index = np.flatnonzero(falling)
+            cell_x = x[index]
+            cell_y = y[index]
+            on_grid = (cell_x >= 0) & (cell_x <= max_x) & (cell_y >= 0) & (cell_y <= max_y)
+            blocked = np.zeros(len(index), dtype=bool)
+            blocked[on_grid] = scented[cell_x[on_grid], cell_y[on_grid]]
+            index = index[~blocked]
+            lost[index] = True
+            lost_step[index] = step
+        else:
+            # Off-grid moves are rare, so on large grids the scent check for them is done per robot
+            for index in np.flatnonzero(falling):
+                if not grid.has_scent(int(x[index]), int(y[index])):
+                    lost[index] = True
+                    lost_step[index] = step
+
+    return x, y, heading, lost, lost_step
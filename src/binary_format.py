@@ -0,0 +1,278 @@
+#
+# Compact binary mission and result formats for the Martian Robot Challenge.
+#
+# Mission: header (magic "MRB1", max_x, max_y as little-endian int64) followed by one record per
+# robot until the end of the data. A robot record is x, y (int64), heading (uint8, 0=N 1=E 2=S 3=W)
+# and the number of commands (uint32), followed by the commands packed 2 bits each (L=0, R=1, F=2),
+# four per byte starting from the low bits.
+#
+# Result: header (magic "MRR1") followed by one record per robot: x, y (int64), heading (uint8)
+# and lost flag (uint8).
+#
+# Decoding works on any buffer, including an mmap of the file, through memoryview slices, so the
+# mission data is never copied as a whole.
+#
+import mmap
+import struct
+import sys
+from itertools import product
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from main import iter_lines
+from validation import Limits, Validator, UNLIMITED, parse_limit
+
+MISSION_MAGIC = b'MRB1'
+RESULT_MAGIC = b'MRR1'
+
+_MISSION_HEADER = struct.Struct('<4sqq')
+_ROBOT_HEADER = struct.Struct('<qqBI')
+_RESULT_HEADER = struct.Struct('<4s')
+_RESULT = struct.Struct('<qqBB')
+
+# 2 bit code of each command
+_COMMAND_CODES = {'L': 0, 'R': 1, 'F': 2}
+
+# Packed byte for every group of up to four commands
+_PACK = {}
+for _length in range(1, 5):
+    for _group in product('LRF', repeat=_length):
+        _PACK[''.join(_group)] = sum(_COMMAND_CODES[command] << (2 * shift) for shift, command in enumerate(_group))
+
+# Four commands for every packed byte, code 3 is reserved and decodes as '?'
+_UNPACK = tuple(''.join('LRF?'[(byte >> shift) & 3] for shift in (0, 2, 4, 6)) for byte in range(256))
+
+#
+# Pack an instruction string, 2 bits per command
+#
+# Raises:
+#     ValueError: If the instructions contain anything other than L, R and F
+def pack_instructions(instructions: str) -> bytes:
+    try:
+        return bytes([_PACK[instructions[index:index + 4]] for index in range(0, len(instructions), 4)])
+    except KeyError:
+        raise ValueError(f"Instructions '{instructions}' contain commands that cannot be packed, only L, R and F are supported.")
+
+#
+# Unpack the first count commands from packed bytes
+#
+def unpack_instructions(packed, count: int) -> str:
+    return ''.join([_UNPACK[byte] for byte in packed])[:count]
+
+#
+# Encode a mission
+#
+# Args:
+#     max_x: Maximum x coordinate of the grid
+#     max_y: Maximum y coordinate of the grid
+#     robots: Iterable of (x, y, orientation, instructions) tuples
+def encode_mission(max_x: int, max_y: int, robots) -> bytes:
+    out = bytearray(_pack(_MISSION_HEADER, MISSION_MAGIC, max_x, max_y))
+    for x, y, orientation, instructions in robots:
+        out += _encode_robot(x, y, orientation, instructions)
+    return bytes(out)
+
+
+# Encode a single robot record
+def _encode_robot(x: int, y: int, orientation: str, instructions: str) -> bytes:
+    heading = Robot.ORIENTATIONS.index(orientation) if orientation in Robot.ORIENTATIONS else -1
+    if heading < 0:
+        raise ValueError(f"Invalid orientation '{orientation}'. Must be one of N, E, S, W.")
+    return _pack(_ROBOT_HEADER, x, y, heading, len(instructions)) + pack_instructions(instructions)
+
+
+# Pack a record, reporting values the fixed-width fields cannot hold as a ValueError
+def _pack(record: struct.Struct, *values) -> bytes:
+    try:
+        return record.pack(*values)
+    except struct.error:
+        raise ValueError("Coordinates must fit in signed 64-bit integers for the binary format, "
+                         "and instruction strings in 32-bit counts.") from None
+
+#
+# Decode a mission without copying the buffer
+#
+# Args:
+#     buffer: bytes, bytearray, mmap or memoryview holding an encoded mission
+#
+# Returns:
+#     Tuple of (max_x, max_y, robots) where robots lazily yields (x, y, orientation, instructions)
+def decode_mission(buffer) -> tuple:
+    view = memoryview(buffer)
+    if len(view) < _MISSION_HEADER.size:
+        raise ValueError("Invalid binary mission: truncated header.")
+    magic, max_x, max_y = _MISSION_HEADER.unpack_from(view, 0)
+    if magic != MISSION_MAGIC:
+        raise ValueError("Invalid binary mission: bad header.")
+    return max_x, max_y, _iter_robots(view, _MISSION_HEADER.size)
+
+
+# Yield robot records starting at offset
+def _iter_robots(view, offset: int):
+    end = len(view)
+    unpack_from = _ROBOT_HEADER.unpack_from
+    header_size = _ROBOT_HEADER.size
+    orientations = Robot.ORIENTATIONS
+    while offset < end:
+        if offset + header_size > end:
+            raise ValueError("Invalid binary mission: truncated robot record.")
+        x, y, heading, count = unpack_from(view, offset)
+        offset += header_size
+        packed_size = (count + 3) >> 2
+        if offset + packed_size > end or heading > 3:
+            raise ValueError("Invalid binary mission: corrupt robot record.")
+        yield x, y, orientations[heading], unpack_instructions(view[offset:offset + packed_size], count)
+        offset += packed_size
+
+#
+# Encode robot results
+#
+# Args:
+#     robots: Iterable of Robot instances after their commands have run
+def encode_results(robots) -> bytes:
+    out = bytearray(_RESULT_HEADER.pack(RESULT_MAGIC))
+    for robot in robots:
+        out += _pack(_RESULT, robot.x, robot.y, robot.heading, robot.is_lost)
+    return bytes(out)
+
+#
+# Decode robot results without copying the buffer
+#
+# Yields:
+#     Tuple of (x, y, orientation, is_lost)
+def decode_results(buffer):
+    view = memoryview(buffer)
+    if bytes(view[:_RESULT_HEADER.size]) != RESULT_MAGIC:
+        raise ValueError("Invalid binary results: bad header.")
+    if (len(view) - _RESULT_HEADER.size) % _RESULT.size:
+        raise ValueError("Invalid binary results: truncated record.")
+    for x, y, heading, lost in _RESULT.iter_unpack(view[_RESULT_HEADER.size:]):
+        yield x, y, Robot.ORIENTATIONS[heading], bool(lost)
+
+#
+# Simulate an encoded mission
+#
+# Args:
+#     buffer: Encoded mission, e.g. an mmap of a mission file
+#
+# Returns:
+#     Encoded results
+def simulate_binary(buffer) -> bytes:
+    max_x, max_y, robots = decode_mission(buffer)
+    grid = MarsGrid(max_x, max_y)
+    command_processor = CommandProcessor()
+    out = bytearray(_RESULT_HEADER.pack(RESULT_MAGIC))
+    pack = _RESULT.pack
+    robot = Robot(0, 0, 'N', grid)
+    for x, y, orientation, instructions in robots:
+        robot.reset(x, y, orientation)
+        command_processor.execute_commands(robot, instructions)
+        out += pack(robot.x, robot.y, robot.heading, robot.is_lost)
+    return bytes(out)
+
+#
+# Simulate a mission file through a read-only memory map and write the encoded results
+#
+def simulate_file(mission_path: str, result_path: str):
+    with open(mission_path, 'rb') as mission_file:
+        with mmap.mmap(mission_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            results = simulate_binary(mapped)
+    with open(result_path, 'wb') as result_file:
+        result_file.write(results)
+
+#
+# Convert a text mission to the binary format, streaming robot by robot
+#
+# Args:
+#     in_stream: Text stream with the mission
+#     out_stream: Binary stream receiving the encoded mission
+#     limits: validation.Limits to enforce, the mission constraints by default
+#
+# Returns:
+#     Number of robots converted
+def text_to_binary(in_stream, out_stream, limits: Limits = None) -> int:
+    validator = Validator(limits)
+    lines = iter_lines(in_stream)
+    max_x, max_y = validator.grid(next(lines, None) or '')
+
+    out_stream.write(_pack(_MISSION_HEADER, MISSION_MAGIC, max_x, max_y))
+    count = 0
+    for x, y, orientation, instructions in validator.robots(lines):
+        out_stream.write(_encode_robot(x, y, orientation, instructions))
+        count += 1
+    return count
+
+#
+# Convert a binary mission back to the text format
+#
+def binary_to_text(buffer, out_stream) -> int:
+    max_x, max_y, robots = decode_mission(buffer)
+    out_stream.write(f"{max_x} {max_y}\n")
+    count = 0
+    for x, y, orientation, instructions in robots:
+        out_stream.write(f"{x} {y} {orientation}\n{instructions}\n")
+        count += 1
+    return count
+
+#
+# Convert binary results to the text output format
+#
+def results_to_text(buffer, out_stream) -> int:
+    count = 0
+    for x, y, orientation, is_lost in decode_results(buffer):
+        out_stream.write(f"{x} {y} {orientation} LOST\n" if is_lost else f"{x} {y} {orientation}\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binary mission and result formats")
+    commands = parser.add_subparsers(dest='command', required=True)
+    encode = commands.add_parser('encode', help="Convert a text mission to binary")
+    encode.add_argument('text_mission')
+    encode.add_argument('binary_mission')
+    configured = Limits.from_env()
+    encode.add_argument("--max-coordinate", type=parse_limit, default=configured.max_coordinate, metavar="N",
+                        help="Largest grid dimension allowed for either axis, or 'none' (default: %(default)s)")
+    encode.add_argument("--max-instructions", type=parse_limit, default=configured.max_instructions, metavar="N",
+                        help="Longest robot instruction string allowed, or 'none' (default: %(default)s)")
+    encode.add_argument("--no-limits", action="store_true", help="Disable the grid and instruction limits")
+    encode.add_argument("--large-grid", action="store_true",
+                        help="Accept grids of any size that fits the format, keeping the instruction limit")
+    decode = commands.add_parser('decode', help="Print a binary mission as text")
+    decode.add_argument('binary_mission')
+    run = commands.add_parser('run', help="Simulate a binary mission and write binary results")
+    run.add_argument('binary_mission')
+    run.add_argument('binary_results')
+    results = commands.add_parser('results', help="Print binary results as text")
+    results.add_argument('binary_results')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'encode':
+            if args.no_limits:
+                limits = UNLIMITED
+            elif args.large_grid:
+                limits = Limits(None, args.max_instructions)
+            else:
+                limits = Limits(args.max_coordinate, args.max_instructions)
+            with open(args.text_mission) as in_stream, open(args.binary_mission, 'wb') as out_stream:
+                text_to_binary(in_stream, out_stream, limits)
+        elif args.command == 'decode':
+            with open(args.binary_mission, 'rb') as in_stream:
+                binary_to_text(in_stream.read(), sys.stdout)
+        elif args.command == 'run':
+            simulate_file(args.binary_mission, args.binary_results)
+        else:
+            with open(args.binary_results, 'rb') as in_stream:
+                results_to_text(in_stream.read(), sys.stdout)
+    except ValueError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
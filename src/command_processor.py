@@ -1,27 +1,295 @@
-from typing import Dict, Callable
+import time
+from collections import OrderedDict
+from collections.abc import Callable  # Lighter to import than typing, keeps startup fast
+
+from robot import DELTA_X, DELTA_Y
+
+# Opcodes of a compiled instruction program, each op is an (opcode, argument) pair
+OP_TURN = 0      # Argument: net clockwise quarter turns (1 to 3)
+OP_FORWARD = 1   # Argument: number of consecutive forward steps
+OP_CALL = 2      # Argument: callback function to call with the robot
+OP_UNKNOWN = 3   # Argument: unknown command character to warn about
+OP_REPEAT = 4    # Argument: (body program, count, period, block summary or None), see _repeat_op
+OP_MOVE = 5      # Argument: (steps, direction) for a run of moves that are not straight ahead
+
+# Default number of compiled programs kept in the LRU cache
+DEFAULT_CACHE_SIZE = 4096
+
+# Shortest plain instruction string checked for being one pattern repeated
+MIN_PERIODIC_LENGTH = 16
+
+# Characters of the explicit repetition syntax, e.g. "(RFRF)*250"
+REPETITION_CHARS = '()*'
+
+# Longest expanded instruction string accepted by consumers that step one instruction at a time
+# (instrumentation, trajectories, the lockstep and batch engines). The compiled path runs repeat
+# ops in closed form and only applies it to repetition groups containing callbacks or unknown
+# commands, which have to be run one repetition at a time.
+MAX_EXPANDED_LENGTH = 1000000
+
+#
+# Declarative command specs accepted by CommandProcessor.register_command
+#
+# Rotations and moves describe what a command does, so they are compiled into the same folded
+# program as the built-in commands. Callbacks are opaque and are called once per character.
+# Every spec can also be called with a robot to run it on its own.
+#
+
+#
+# Rotate the robot by a number of clockwise quarter turns (3 or -1 is a left turn)
+#
+class Rotate:
+
+    __slots__ = ('quarter_turns',)
+
+    def __init__(self, quarter_turns: int):
+        self.quarter_turns = quarter_turns % 4
+
+    def __call__(self, robot):
+        robot.rotate(self.quarter_turns)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is Rotate and other.quarter_turns == self.quarter_turns
+
+    def __hash__(self) -> int:
+        return hash((Rotate, self.quarter_turns))
+
+    def __repr__(self) -> str:
+        return f"Rotate({self.quarter_turns})"
+
+#
+# Move the robot a number of single steps in a direction relative to its heading, without turning
+# it, following the usual scent rules at the edge
+#
+class Move:
+
+    __slots__ = ('steps', 'direction')
+
+    # Args:
+    #     steps: Number of single steps
+    #     direction: Clockwise quarter turns from the heading, 0 ahead, 1 right, 2 back, 3 left
+    def __init__(self, steps: int = 1, direction: int = 0):
+        if steps < 0:
+            raise ValueError("A move must not have a negative number of steps.")
+        self.steps = steps
+        self.direction = direction % 4
+
+    def __call__(self, robot):
+        if self.direction:
+            robot.move(self.steps, self.direction)
+        else:
+            robot.advance(self.steps)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is Move and (other.steps, other.direction) == (self.steps, self.direction)
+
+    def __hash__(self) -> int:
+        return hash((Move, self.steps, self.direction))
+
+    def __repr__(self) -> str:
+        return f"Move({self.steps}, {self.direction})"
+
+#
+# Opaque command calling a function with the robot
+#
+class Callback:
+
+    __slots__ = ('function',)
+
+    def __init__(self, function: Callable):
+        self.function = function
+
+    def __call__(self, robot):
+        self.function(robot)
+
+    def __eq__(self, other) -> bool:
+        return type(other) is Callback and other.function == self.function
+
+    def __hash__(self) -> int:
+        return hash((Callback, self.function))
+
+    def __repr__(self) -> str:
+        return f"Callback({self.function!r})"
+
+# Specs of the built-in commands
+BUILTIN_COMMANDS = {'L': Rotate(-1), 'R': Rotate(1), 'F': Move(1)}
+
+#
+# Parse explicit repetition syntax such as "F(RF(L)*2)*10" into a list of plain strings and
+# (items, count) groups, nesting allowed
+#
+# Args:
+#     instructions: String of command characters and repetition groups
+#
+# Returns:
+#     List of items, or None if the syntax is malformed (unbalanced brackets or missing count)
+def parse_repetitions(instructions: str):
+    items, index = _parse_group(instructions, 0, 0)
+    return items if items is not None and index == len(instructions) else None
+
+
+# Parse items up to the end of the string, or up to the ')' closing the current group
+def _parse_group(text: str, index: int, depth: int):
+    items = []
+    start = index
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == '(':
+            if index > start:
+                items.append(text[start:index])
+            body, index = _parse_group(text, index + 1, depth + 1)
+            if body is None or index >= length or text[index] != '*':
+                return None, index
+            digits = index + 1
+            index = digits
+            while index < length and '0' <= text[index] <= '9':
+                index += 1
+            if index == digits:
+                return None, index
+            items.append((body, int(text[digits:index])))
+            start = index
+        elif char == ')':
+            if depth == 0:
+                return None, index
+            if index > start:
+                items.append(text[start:index])
+            return items, index + 1
+        else:
+            index += 1
+
+    if depth:
+        return None, index  # Group never closed
+    if index > start:
+        items.append(text[start:index])
+    return items, index
+
+#
+# Expand explicit repetition syntax into the plain instruction string it stands for
+# Strings without valid repetition syntax are returned unchanged
+#
+# Args:
+#     instructions: String of command characters and repetition groups
+#     limit: Longest expansion allowed, None for no limit
+#
+# Raises:
+#     ValueError: If the expansion would be longer than the limit, checked before expanding
+def expand_repetitions(instructions: str, limit: int = MAX_EXPANDED_LENGTH) -> str:
+    if '(' not in instructions:
+        return instructions
+    items = parse_repetitions(instructions)
+    if items is None:
+        return instructions
+    if limit is not None:
+        length = _items_length(items)
+        if length > limit:
+            raise ValueError(f"Expanded robot instruction string length ({length}) exceeds maximum "
+                             f"of {limit} characters.")
+    return _expand_items(items)
+
+#
+# Length of the plain instruction string a string with repetition syntax stands for,
+# computed without expanding it
+#
+def expanded_length(instructions: str) -> int:
+    items = parse_repetitions(instructions) if '(' in instructions else None
+    return len(instructions) if items is None else _items_length(items)
+
+
+def _expand_items(items) -> str:
+    return ''.join(item if isinstance(item, str) else _expand_items(item[0]) * item[1] for item in items)
+
+
+def _items_length(items) -> int:
+    return sum(len(item) if isinstance(item, str) else _items_length(item[0]) * item[1] for item in items)
+
+#
+# Motion summaries of turn/forward programs
+#
+# A summary holds, for each starting heading, the tuple (dx, dy, rotation, min_dx, max_dx, min_dy, max_dy):
+# the net displacement and clockwise rotation of the program on an unbounded plane, and the bounding
+# box of every cell it visits or tries to enter, relative to the starting cell.
+#
+_IDENTITY_SUMMARY = ((0, 0, 0, 0, 0, 0, 0),) * 4
+
+
+# Summary of a single turn, forward or move op
+def _op_summary(opcode: int, arg) -> tuple:
+    if opcode == OP_TURN:
+        return ((0, 0, arg % 4, 0, 0, 0, 0),) * 4
+    steps, direction = (arg, 0) if opcode == OP_FORWARD else arg
+    summary = []
+    for heading in range(4):
+        dx = DELTA_X[(heading + direction) & 3] * steps
+        dy = DELTA_Y[(heading + direction) & 3] * steps
+        summary.append((dx, dy, 0, min(dx, 0), max(dx, 0), min(dy, 0), max(dy, 0)))
+    return tuple(summary)
+
+
+# Summary of running program a and then program b
+def _compose_summaries(a: tuple, b: tuple) -> tuple:
+    summary = []
+    for heading in range(4):
+        a_dx, a_dy, a_rotation, a_min_x, a_max_x, a_min_y, a_max_y = a[heading]
+        b_dx, b_dy, b_rotation, b_min_x, b_max_x, b_min_y, b_max_y = b[(heading + a_rotation) % 4]
+        summary.append((a_dx + b_dx, a_dy + b_dy, (a_rotation + b_rotation) % 4,
+                        min(a_min_x, a_dx + b_min_x), max(a_max_x, a_dx + b_max_x),
+                        min(a_min_y, a_dy + b_min_y), max(a_max_y, a_dy + b_max_y)))
+    return tuple(summary)
+
+
+# Summary of a program repeated count times, by repeated squaring
+def _repeat_summary(summary: tuple, count: int) -> tuple:
+    result = _IDENTITY_SUMMARY
+    while count:
+        if count & 1:
+            result = _compose_summaries(result, summary)
+        summary = _compose_summaries(summary, summary)
+        count >>= 1
+    return result
 
 #
 # CommandProcessor class to handle robot commands input by the user.
-# This class allows for extensibility by registering new commands dynamically.
+# This class allows for extensibility by registering new commands dynamically, as declarative
+# rotations and moves that compile into the fast path or as opaque callbacks.
 #
 class CommandProcessor:
 
     # Initialize command processor with default commands
-    def __init__(self):
+    #
+    # Args:
+    #     cache_size: Maximum number of compiled instruction programs to keep (0 disables caching)
+    #     warn: Function called with each warning message, prints to stdout by default
+    #     stats: Optional instrumentation.Stats, enables per-command counters and timings
+    #     max_expanded: Longest expansion accepted by expand, None for no limit
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, warn: Callable = print, stats=None,
+                 max_expanded: int = MAX_EXPANDED_LENGTH):
 
-        self.commands: Dict[str, Callable] = {
-            'L': self._turn_left,
-            'R': self._turn_right,
-            'F': self._move_forward
-        }
+        self.commands = dict(BUILTIN_COMMANDS)  # Command character to spec
+        self.cache_size = cache_size
+        self.warn = warn
+        self.stats = stats
+        self.max_expanded = max_expanded
+        self._program_cache = OrderedDict()
+        self._summaries = {}
+        self._tables = None  # Fold tables of the declarative commands, see _fold_tables
 
-    #  Register a new command for future extensibility
+    # Register a new command, or replace an existing one
+    #
+    # Rotate and Move specs are folded into compiled programs like the built-in commands, so
+    # strings using them keep run folding and repetition compression. Plain functions are
+    # wrapped in a Callback and called once per character.
     #
     # Args:
-    #   command_char: Single character command identifier
-    #    command_func: Function to execute for this command
-    def register_command(self, command_char: str, command_func: Callable):
-        self.commands[command_char] = command_func
+    #     command_char: Single character command identifier
+    #     command: Rotate, Move or Callback spec, or a function to call with the robot
+    def register_command(self, command_char: str, command: Callable):
+        if not isinstance(command, (Rotate, Move, Callback)):
+            command = Callback(command)
+        self.commands[command_char] = command
+        self._tables = None
+        self._program_cache.clear()  # Compiled programs may refer to the old command
+        self._summaries.clear()
     
     # Execute a string of commands on the given robot
     #
@@ -30,30 +298,327 @@ class CommandProcessor:
     #     instructions: String of command characters
     def execute_commands(self, robot, instructions: str):
 
-        for instruction in instructions:
+        if self.stats is not None:
+            self._execute_instrumented(robot, instructions)
+            return
+
+        self._run(robot, self.compile(instructions))
+
+    # Run a compiled program on the robot
+    def _run(self, robot, program: tuple):
+        for opcode, arg in program:
             if robot.is_lost:
                 break  # Stop processing if robot is lost
-            
-            if instruction in self.commands:
-                self.commands[instruction](robot)
+
+            if opcode == OP_FORWARD:
+                robot.advance(arg)
+            elif opcode == OP_TURN:
+                robot.rotate(arg)
+            elif opcode == OP_MOVE:
+                robot.move(*arg)
+            elif opcode == OP_CALL:
+                arg(robot)
+            elif opcode == OP_REPEAT:
+                self._repeat(robot, *arg)
             else:
-                print(f"Warning: Unknown command '{instruction}' ignored")
-    
-    # Execute left turn command
-    def _turn_left(self, robot):
-        robot.turn_left()
-    
-    # Execute right turn command
-    def _turn_right(self, robot):
-        robot.turn_right()
-    
-    # Execute forward movement command
-    def _move_forward(self, robot):
-        robot.move_forward()
+                self.warn(f"Warning: Unknown command '{arg}' ignored")
+
+    # Run a repeated body, skipping repetitions that cannot reach the edge of the grid
+    #
+    # While the robot stays on the grid it never consults scent, so a block of repetitions whose
+    # whole bounding box lies inside the grid is applied as one displacement. Near the edges the
+    # body is run normally. Scents do not change until the robot is lost, so the robot's state
+    # after each repetition decides all later ones: once a state repeats, the remaining
+    # repetitions are reduced modulo the cycle length.
+    #
+    # Args:
+    #     robot: Robot instance to command
+    #     body: Compiled program of one repetition
+    #     count: Number of repetitions
+    #     period: Repetitions in one block, after which the heading is back where it started
+    #     block: Summary of one block, None if the body contains callbacks or unknown commands
+    def _repeat(self, robot, body: tuple, count: int, period: int, block):
+        grid = robot.grid
+        max_x = grid.max_x
+        max_y = grid.max_y
+        remaining = count
+        seen = {}
+        while remaining and not robot.is_lost:
+            x = robot.x
+            y = robot.y
+            heading = robot.heading
+            if block is not None and remaining >= period:
+                dx, dy, _, min_dx, max_dx, min_dy, max_dy = block[heading]
+                blocks = _safe_blocks(x, dx, min_dx, max_dx, max_x, remaining // period)
+                if blocks:
+                    blocks = _safe_blocks(y, dy, min_dy, max_dy, max_y, blocks)
+                if blocks:
+                    robot.x = x + dx * blocks
+                    robot.y = y + dy * blocks
+                    remaining -= blocks * period
+                    continue
+
+            if block is not None:
+                state = (x, y, heading)
+                if state in seen:
+                    remaining %= seen[state] - remaining
+                    seen.clear()
+                    if not remaining:
+                        break
+                seen[state] = remaining
+
+            self._run(robot, body)
+            remaining -= 1
+
+    # Execute instructions one character at a time, counting and timing every command
+    # and every scent operation on the robot's grid
+    def _execute_instrumented(self, robot, instructions: str):
+        from instrumentation import InstrumentedGrid  # Only needed when instrumentation is enabled
+
+        stats = self.stats
+        commands = self.commands
+        perf_counter = time.perf_counter
+        grid = robot.grid
+        robot.grid = InstrumentedGrid(grid, stats)
+        robot_start = perf_counter()
+        try:
+            for instruction in self.expand(instructions):
+                if robot.is_lost:
+                    break
+
+                start = perf_counter()
+                command = commands.get(instruction)
+                if command is not None:
+                    command(robot)
+                else:
+                    self.warn(f"Warning: Unknown command '{instruction}' ignored")
+                stats.command_seconds[instruction] += perf_counter() - start
+                stats.command_counts[instruction] += 1
+        finally:
+            robot.grid = grid
+        stats.record_robot(instructions, perf_counter() - robot_start, robot.is_lost)
+
+    # Compile an instruction string into a compact program, using the LRU cache
+    #
+    # Runs of rotations collapse into a single net rotation and runs of moves in the same
+    # direction into a single segment. Callbacks and unknown commands keep their
+    # position in the program so they execute in the original order.
+    #
+    # Args:
+    #     instructions: String of command characters
+    #
+    # Returns:
+    #     Tuple of (opcode, argument) pairs
+    #
+    # Raises:
+    #     ValueError: If a repetition group that cannot run in closed form expands past max_expanded
+    def compile(self, instructions: str) -> tuple:
+        cache = self._program_cache
+        program = cache.get(instructions)
+        if program is not None:
+            cache.move_to_end(instructions)
+            return program
+
+        program = self._compile(instructions)
+        if self.cache_size > 0:
+            cache[instructions] = program
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return program
+
+    # Expand explicit repetition syntax into plain instructions, for consumers that step through
+    # instructions one character at a time
+    #
+    # Raises:
+    #     ValueError: If the expansion would be longer than max_expanded
+    def expand(self, instructions: str) -> str:
+        return expand_repetitions(instructions, self.max_expanded) if self._repetition_syntax() else instructions
+
+    # Repetition syntax is only recognised while none of its characters is a registered command
+    def _repetition_syntax(self) -> bool:
+        return not any(char in self.commands for char in REPETITION_CHARS)
+
+    # Build the program for an instruction string without consulting the cache
+    #
+    # Explicit repetition groups compile to repeat ops. Malformed syntax is compiled character
+    # by character, so the brackets are reported as unknown commands.
+    def _compile(self, instructions: str) -> tuple:
+        if '(' in instructions and self._repetition_syntax():
+            items = parse_repetitions(instructions)
+            if items is not None:
+                return tuple(self._compile_items(items))
+        return tuple(self._compile_periodic(instructions))
+
+    # Compile parsed repetition items
+    def _compile_items(self, items) -> list:
+        program = []
+        for item in items:
+            if isinstance(item, str):
+                program.extend(self._compile_periodic(item))
+            else:
+                body, count = item
+                program.extend(self._repeat_op(tuple(self._compile_items(body)), count, _items_length(body) * count))
+        return program
+
+    # Compile plain instructions, detecting strings that are a single pattern repeated
+    def _compile_periodic(self, instructions: str) -> list:
+        length = len(instructions)
+        if length >= MIN_PERIODIC_LENGTH:
+            # The first match of a string inside itself doubled is its shortest period
+            period = (instructions + instructions).find(instructions, 1)
+            if period < length:
+                return self._repeat_op(tuple(self._compile_plain(instructions[:period])), length // period)
+        return self._compile_plain(instructions)
+
+    # Build the ops running a compiled body count times
+    #
+    # Args:
+    #     body: Compiled program of one repetition
+    #     count: Number of repetitions
+    #     length: Expanded length of the instructions repeated, None if already bounded by the input
+    #
+    # Raises:
+    #     ValueError: If a body without a closed form would expand past max_expanded
+    def _repeat_op(self, body: tuple, count: int, length: int = None) -> list:
+        if count <= 0 or not body:
+            return []
+        if count == 1:
+            return list(body)
+        if len(body) == 1 and body[0][0] == OP_FORWARD:
+            return [(OP_FORWARD, body[0][1] * count)]
+        if len(body) == 1 and body[0][0] == OP_TURN:
+            turn = body[0][1] * count % 4
+            return [(OP_TURN, turn)] if turn else []
+
+        summary = self._summary(body)
+        if summary is None:
+            # Callbacks and unknown commands run once per repetition, so the count must be bounded
+            if length is not None and self.max_expanded is not None and length > self.max_expanded:
+                raise ValueError(f"Repetition group expanding to {length} instructions contains commands "
+                                 f"that run one at a time, maximum is {self.max_expanded}.")
+            return [(OP_REPEAT, (body, count, 1, None))]
+        rotation = summary[0][2]
+        period = 1 if rotation == 0 else 2 if rotation == 2 else 4
+        return [(OP_REPEAT, (body, count, period, _repeat_summary(summary, period)))]
+
+    # Motion summary of a compiled program, None if it contains callbacks or unknown commands
+    def _summary(self, program: tuple):
+        summaries = self._summaries
+        if program in summaries:
+            return summaries[program]
+
+        summary = _IDENTITY_SUMMARY
+        for opcode, arg in program:
+            if opcode == OP_REPEAT:
+                body, count, _, block = arg
+                part = None if block is None else _repeat_summary(self._summary(body), count)
+            elif opcode == OP_TURN or opcode == OP_FORWARD or opcode == OP_MOVE:
+                part = _op_summary(opcode, arg)
+            else:
+                part = None
+            if part is None:
+                summary = None
+                break
+            summary = _compose_summaries(summary, part)
+
+        if len(summaries) >= self.cache_size:
+            summaries.clear()
+        summaries[program] = summary
+        return summary
+
+    # Fold runs of rotations and of moves in the same direction in plain instructions
+    def _compile_plain(self, instructions: str) -> list:
+        commands = self.commands
+        turns, forward, moves = self._fold_tables()
+
+        program = []
+        turn = 0
+        direction = 0
+        steps = 0
+        for instruction in instructions:
+            if instruction in turns:
+                if steps:
+                    program.append(_move_op(steps, direction))
+                    steps = 0
+                turn += turns[instruction]
+            elif instruction in forward:
+                if turn % 4:
+                    program.append((OP_TURN, turn % 4))
+                turn = 0
+                if direction:
+                    if steps:
+                        program.append(_move_op(steps, direction))
+                        steps = 0
+                    direction = 0
+                steps += forward[instruction]
+            elif instruction in moves:
+                if turn % 4:
+                    program.append((OP_TURN, turn % 4))
+                turn = 0
+                move_steps, move_direction = moves[instruction]
+                if steps and move_direction != direction:
+                    program.append(_move_op(steps, direction))
+                    steps = 0
+                direction = move_direction
+                steps += move_steps
+            else:
+                if steps:
+                    program.append(_move_op(steps, direction))
+                    steps = 0
+                if turn % 4:
+                    program.append((OP_TURN, turn % 4))
+                turn = 0
+                if instruction in commands:
+                    program.append((OP_CALL, commands[instruction].function))
+                else:
+                    program.append((OP_UNKNOWN, instruction))
+
+        if steps:
+            program.append(_move_op(steps, direction))
+        if turn % 4:
+            program.append((OP_TURN, turn % 4))
+        return program
+
+    # Quarter turns of every rotation, steps of every forward move and (steps, direction) of every
+    # other move, rebuilt only when commands are registered
+    def _fold_tables(self) -> tuple:
+        if self._tables is None:
+            commands = self.commands.items()
+            self._tables = (
+                {char: command.quarter_turns for char, command in commands if type(command) is Rotate},
+                {char: command.steps for char, command in commands if type(command) is Move and not command.direction},
+                {char: (command.steps, command.direction)
+                 for char, command in commands if type(command) is Move and command.direction},
+            )
+        return self._tables
 
     # Get list of available command characters
     #
     # Returns:
     #     List of command characters
     def get_available_commands(self) -> list:
-        return list(self.commands.keys())
\ No newline at end of file
+        return list(self.commands.keys())
+
+
+# Op moving a number of steps in a direction relative to the heading
+def _move_op(steps: int, direction: int) -> tuple:
+    return (OP_FORWARD, steps) if direction == 0 else (OP_MOVE, (steps, direction))
+
+
+# Number of blocks, at most limit, that keep one axis inside [0, maximum] for every block
+#
+# Args:
+#     position: Starting coordinate on the axis
+#     delta: Displacement of one block along the axis
+#     low: Smallest offset reached within one block, relative to its start
+#     high: Largest offset reached within one block, relative to its start
+#     maximum: Largest coordinate on the grid along the axis
+#     limit: Number of blocks wanted
+def _safe_blocks(position: int, delta: int, low: int, high: int, maximum: int, limit: int) -> int:
+    if position + low < 0 or position + high > maximum:
+        return 0
+    if delta > 0:
+        return min(limit, (maximum - position - high) // delta + 1)
+    if delta < 0:
+        return min(limit, (position + low) // -delta + 1)
+    return limit
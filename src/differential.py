@@ -0,0 +1,466 @@
+#
+# Deterministic differential testing of the simulation engines.
+# Random missions are generated from a seed and run through the reference path (Robot, MarsGrid and
+# one built-in command per character) and through every alternate backend: the compiled command
+# processor, the instrumented interpreter, the text and binary batch paths, the mission runner,
+# the trajectory recorder, the speculative engine and, when NumPy is installed, the vectorized batch
+# simulator. Results, warnings and the final scent state must match exactly. A mismatch is shrunk to
+# a minimal reproducer, and the time spent in every backend is reported alongside, so correctness
+# and throughput are checked in the same run.
+#
+# Usage:
+#     python3 src/differential.py --seed 7 --missions 500
+#     python3 src/differential.py --backends compiled,vectorized --max-size 4 --json
+#
+import json
+import random
+import sys
+import time
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor, expand_repetitions
+from validation import UNLIMITED
+
+# Defaults for generated missions
+DEFAULT_MISSIONS = 200
+DEFAULT_MAX_SIZE = 8
+DEFAULT_MAX_ROBOTS = 30
+DEFAULT_MAX_LENGTH = 40
+
+# Probability that a generated instruction is not a built-in command
+UNKNOWN_RATE = 0.02
+
+# Probability that a generated robot uses repetition syntax
+REPETITION_RATE = 0.15
+
+#
+# Generate a random mission
+#
+# Grids are kept small and robots often start on or next to the edge, so most robots interact
+# with the boundary and with scents left by earlier robots.
+#
+# Args:
+#     rng: random.Random instance, the only source of randomness
+#     max_size: Largest grid coordinate
+#     max_robots: Largest number of robots
+#     max_length: Longest plain instruction string
+#     unknown: Include unknown commands in some missions
+#     repetitions: Include repetition groups such as "(RF)*7" in some missions
+#
+# Returns:
+#     Tuple of (max_x, max_y, robots) where robots is a list of (x, y, orientation, instructions)
+def generate_mission(rng, max_size: int = DEFAULT_MAX_SIZE, max_robots: int = DEFAULT_MAX_ROBOTS,
+                     max_length: int = DEFAULT_MAX_LENGTH, unknown: bool = True, repetitions: bool = True) -> tuple:
+    max_x = rng.randint(0, max_size)
+    max_y = rng.randint(0, max_size)
+    # Half of the missions stay plain, so backends limited to L, R and F get exercised too
+    unknown = unknown and rng.random() < 0.5
+    repetitions = repetitions and rng.random() < 0.5
+    alphabet = rng.choice(('LRF', 'LRFFF', 'FFFFR', 'LLRF'))
+    robots = []
+    for _ in range(rng.randint(1, max_robots)):
+        # Mostly on the grid, sometimes one cell outside it
+        x = rng.randint(-1, max_x + 1) if rng.random() < 0.05 else rng.randint(0, max_x)
+        y = rng.randint(-1, max_y + 1) if rng.random() < 0.05 else rng.randint(0, max_y)
+        length = rng.randint(0, max_length)
+        instructions = ''.join(
+            rng.choice('XB?') if unknown and rng.random() < UNKNOWN_RATE else rng.choice(alphabet)
+            for _ in range(length))
+        if repetitions and rng.random() < REPETITION_RATE:
+            body = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+            instructions = f"{instructions[:length // 2]}({body})*{rng.randint(0, 60)}{instructions[length // 2:]}"
+        robots.append((x, y, rng.choice('NESW'), instructions))
+    return max_x, max_y, robots
+
+#
+# Format a mission in the text input format
+#
+def format_mission(mission) -> str:
+    max_x, max_y, robots = mission
+    lines = [f"{max_x} {max_y}"]
+    for x, y, orientation, instructions in robots:
+        lines.append(f"{x} {y} {orientation}")
+        lines.append(instructions)
+    return '\n'.join(lines) + '\n'
+
+# True if a mission only uses plain L, R and F commands
+def _is_plain(mission) -> bool:
+    return all(set(instructions) <= set('LRF') for _, _, _, instructions in mission[2])
+
+#
+# Backends
+#
+# Each backend runs a mission on a fresh grid and returns (results, warnings, scents), where
+# results are formatted like str(Robot), warnings are in the order they were raised and scents is
+# the final scent set, or None if the backend does not expose its grid.
+#
+
+# Reference path: one built-in command per character, exactly as the original engine
+def run_reference(mission) -> tuple:
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    handlers = {'L': Robot.turn_left, 'R': Robot.turn_right, 'F': Robot.move_forward}
+    results = []
+    warnings = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        for instruction in expand_repetitions(instructions):
+            if robot.is_lost:
+                break
+            if instruction in handlers:
+                handlers[instruction](robot)
+            else:
+                warnings.append(f"Warning: Unknown command '{instruction}' ignored")
+        results.append(str(robot))
+    return results, warnings, set(grid.scent_positions)
+
+
+# Compiled command processor, the default engine
+def _run_compiled(mission) -> tuple:
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    command_processor = CommandProcessor(warn=warnings.append)
+    results = []
+    robot = Robot(0, 0, 'N', grid)
+    for x, y, orientation, instructions in robots:
+        robot.reset(x, y, orientation)
+        command_processor.execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results, warnings, set(grid.scent_positions)
+
+
+# Instrumented interpreter used by --profile
+def _run_instrumented(mission) -> tuple:
+    from instrumentation import Stats
+
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    command_processor = CommandProcessor(warn=warnings.append, stats=Stats())
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        command_processor.execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results, warnings, set(grid.scent_positions)
+
+
+# Split output lines into results and warnings
+def _split_output(lines) -> tuple:
+    results = [line for line in lines if not line.startswith("Warning:")]
+    warnings = [line for line in lines if line.startswith("Warning:")]
+    return results, warnings, None
+
+
+# Text batch path used by --batch
+def _run_text_batch(mission) -> tuple:
+    from main import run_batch
+
+    output = run_batch(format_mission(mission).encode(), UNLIMITED)
+    return _split_output(output.decode().splitlines())
+
+
+# Multi-mission runner with its reused grid
+def _run_mission_runner(mission) -> tuple:
+    from mission_runner import run_mission
+
+    return _split_output(run_mission(mission))
+
+
+# Binary mission format, plain missions only
+def _run_binary(mission) -> tuple:
+    from binary_format import encode_mission, simulate_binary, decode_results
+
+    max_x, max_y, robots = mission
+    results = []
+    for x, y, orientation, is_lost in decode_results(simulate_binary(encode_mission(max_x, max_y, robots))):
+        results.append(f"{x} {y} {orientation} LOST" if is_lost else f"{x} {y} {orientation}")
+    return results, [], None
+
+
+# Trajectory recorder, executing in stride-sized slices
+def _run_trajectory(mission) -> tuple:
+    from trajectory import TrajectoryRecorder
+
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    recorder = TrajectoryRecorder(CommandProcessor(warn=warnings.append), capacity=4, stride=3)
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        recorder.execute(robot, instructions)
+        results.append(str(robot))
+    return results, warnings, set(grid.scent_positions)
+
+
+# Speculative engine in one process, with small chunks so commits and re-simulation are exercised
+def _run_speculative(mission) -> tuple:
+    from speculative_engine import simulate_speculative
+
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    results, _ = simulate_speculative(grid, robots, workers=1, chunk_size=4, warn=warnings.append)
+    return results, warnings, set(grid.scent_positions)
+
+
+# Vectorized batch simulator
+def _run_vectorized(mission) -> tuple:
+    from batch_simulator import simulate_batch
+
+    max_x, max_y, robots = mission
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    results = simulate_batch(grid, robots, block_size=8, warn=warnings.append)
+    return results, warnings, set(grid.scent_positions)
+
+
+# Alternate backends by name: (run function, plain missions only)
+BACKENDS = {
+    'compiled': (_run_compiled, False),
+    'instrumented': (_run_instrumented, False),
+    'text-batch': (_run_text_batch, False),
+    'mission-runner': (_run_mission_runner, False),
+    'binary': (_run_binary, True),
+    'trajectory': (_run_trajectory, False),
+    'speculative': (_run_speculative, False),
+    'vectorized': (_run_vectorized, False),
+}
+
+#
+# Names of the backends that can run here
+#
+def available_backends() -> list:
+    from batch_simulator import np
+
+    return [name for name in BACKENDS if name != 'vectorized' or np is not None]
+
+#
+# Compare one backend with the reference on a mission
+#
+# Args:
+#     mission: Tuple of (max_x, max_y, robots)
+#     backend: Backend run function
+#     expected: Reference outcome, computed if omitted
+#
+# Returns:
+#     Description of the first difference, or None if the outcomes match
+def compare(mission, backend, expected=None):
+    if expected is None:
+        expected = run_reference(mission)
+    return _difference(expected, _outcome(backend, mission))
+
+
+# Run a backend, turning a crash into an outcome that differs from any real one
+def _outcome(backend, mission):
+    try:
+        return backend(mission)
+    except Exception as e:
+        return e
+
+
+# First difference between the reference outcome and a backend outcome, None if they match
+def _difference(expected, actual):
+    if isinstance(actual, Exception):
+        return f"raised {type(actual).__name__}: {actual}"
+    for label, want, got in zip(('results', 'warnings'), expected, actual):
+        if list(want) != list(got):
+            for index, (a, b) in enumerate(zip(want, got)):
+                if a != b:
+                    return f"{label}[{index}]: expected '{a}', got '{b}'"
+            return f"{label}: expected {len(want)} lines, got {len(got)}"
+    if actual[2] is not None and set(actual[2]) != set(expected[2]):
+        return f"scents: expected {sorted(expected[2])}, got {sorted(actual[2])}"
+    return None
+
+#
+# Shrink a failing mission to a minimal reproducer
+#
+# Robots are removed, instructions shortened (repetition groups are expanded first), the grid made
+# smaller and start positions moved towards the origin, keeping each change only while the
+# backend still disagrees with the reference. The result is not guaranteed to be globally
+# minimal, but no single one of these steps can make it smaller.
+#
+# Args:
+#     mission: Tuple of (max_x, max_y, robots) on which the backend disagrees with the reference
+#     backend: Backend run function
+#
+# Returns:
+#     Smaller mission on which the backend still disagrees
+def shrink(mission, backend) -> tuple:
+    def fails(candidate) -> bool:
+        try:
+            return compare(candidate, backend) is not None
+        except Exception:
+            return False  # The reference rejects it, e.g. an invalid shrunk position
+
+    max_x, max_y, robots = mission
+    robots = list(robots)
+    changed = True
+    while changed:
+        changed = False
+
+        # Remove robots, in halves first and then one at a time
+        size = max(len(robots) // 2, 1)
+        while size >= 1:
+            start = 0
+            while start < len(robots) and len(robots) > 1:
+                candidate = robots[:start] + robots[start + size:]
+                if candidate and fails((max_x, max_y, candidate)):
+                    robots = candidate
+                    changed = True
+                else:
+                    start += size
+            size //= 2
+
+        # Shorten instructions
+        for index, (x, y, orientation, instructions) in enumerate(robots):
+            for candidate in _shorter_instructions(instructions):
+                trial = robots[:index] + [(x, y, orientation, candidate)] + robots[index + 1:]
+                if fails((max_x, max_y, trial)):
+                    robots = trial
+                    changed = True
+                    break
+
+        # Shrink the grid and move robots towards the origin
+        for candidate_x, candidate_y in ((max_x - 1, max_y), (max_x, max_y - 1)):
+            if min(candidate_x, candidate_y) >= 0 and fails((candidate_x, candidate_y, robots)):
+                max_x, max_y = candidate_x, candidate_y
+                changed = True
+                break
+        for index, (x, y, orientation, instructions) in enumerate(robots):
+            for candidate_x, candidate_y in ((x - 1, y), (x, y - 1), (x + 1, y), (x, y + 1)):
+                if abs(candidate_x) + abs(candidate_y) >= abs(x) + abs(y):
+                    continue
+                trial = robots[:index] + [(candidate_x, candidate_y, orientation, instructions)] + robots[index + 1:]
+                if fails((max_x, max_y, trial)):
+                    robots = trial
+                    changed = True
+                    break
+
+    return max_x, max_y, robots
+
+
+# Candidate shortenings of an instruction string, largest cuts first
+def _shorter_instructions(instructions: str):
+    expanded = expand_repetitions(instructions)
+    if expanded != instructions and len(expanded) <= 4 * DEFAULT_MAX_LENGTH:
+        yield expanded
+    length = len(instructions)
+    size = length // 2
+    while size >= 1:
+        for start in range(0, length - size + 1, size):
+            yield instructions[:start] + instructions[start + size:]
+        size //= 2
+
+#
+# Run the differential test
+#
+# Args:
+#     seed: Seed for the mission generator
+#     missions: Number of missions to generate
+#     backends: Backend names to check, every available backend by default
+#     max_size: Largest grid coordinate
+#     max_robots: Largest number of robots per mission
+#     max_length: Longest plain instruction string
+#     max_mismatches: Stop shrinking and reporting after this many mismatches
+#
+# Returns:
+#     Report with per-backend throughput and a list of mismatches with their reproducers
+def run_differential(seed: int = 0, missions: int = DEFAULT_MISSIONS, backends=None,
+                     max_size: int = DEFAULT_MAX_SIZE, max_robots: int = DEFAULT_MAX_ROBOTS,
+                     max_length: int = DEFAULT_MAX_LENGTH, max_mismatches: int = 5) -> dict:
+    names = available_backends() if backends is None else list(backends)
+    rng = random.Random(seed)
+    timings = {name: {'missions': 0, 'robots': 0, 'instructions': 0, 'seconds': 0.0, 'mismatches': 0}
+               for name in ['reference'] + names}
+    mismatches = []
+
+    for number in range(missions):
+        mission = generate_mission(rng, max_size, max_robots, max_length)
+        instructions = sum(len(expand_repetitions(robot[3])) for robot in mission[2])
+
+        start = time.perf_counter()
+        expected = run_reference(mission)
+        _count(timings['reference'], mission, instructions, time.perf_counter() - start)
+
+        for name in names:
+            backend, plain_only = BACKENDS[name]
+            if plain_only and not _is_plain(mission):
+                continue
+            start = time.perf_counter()
+            actual = _outcome(backend, mission)
+            _count(timings[name], mission, instructions, time.perf_counter() - start)
+            difference = _difference(expected, actual)
+            if difference is None:
+                continue
+
+            timings[name]['mismatches'] += 1
+            if len(mismatches) < max_mismatches:
+                reproducer = shrink(mission, backend)
+                mismatches.append({
+                    'backend': name,
+                    'mission': number,
+                    'difference': difference,
+                    'reproducer': format_mission(reproducer),
+                    'reproducer_difference': compare(reproducer, backend),
+                })
+
+    for timing in timings.values():
+        seconds = timing['seconds']
+        timing['robots_per_sec'] = timing['robots'] / seconds if seconds else None
+        timing['instructions_per_sec'] = timing['instructions'] / seconds if seconds else None
+    return {'seed': seed, 'missions': missions, 'backends': timings, 'mismatches': mismatches}
+
+
+# Add one mission run to a backend's totals
+def _count(timing: dict, mission, instructions: int, seconds: float):
+    timing['missions'] += 1
+    timing['robots'] += len(mission[2])
+    timing['instructions'] += instructions
+    timing['seconds'] += seconds
+
+#
+# Format a report as a table followed by any reproducers
+#
+def format_report(report: dict) -> str:
+    lines = [f"Differential run: seed {report['seed']}, {report['missions']} missions",
+             f"{'backend':<16}{'missions':>10}{'robots/s':>14}{'instr/s':>14}{'mismatches':>12}"]
+    for name, timing in report['backends'].items():
+        robots_per_sec = timing['robots_per_sec'] or 0
+        instructions_per_sec = timing['instructions_per_sec'] or 0
+        lines.append(f"{name:<16}{timing['missions']:>10}{robots_per_sec:>14.0f}"
+                     f"{instructions_per_sec:>14.0f}{timing['mismatches']:>12}")
+    for mismatch in report['mismatches']:
+        lines.append("")
+        lines.append(f"MISMATCH {mismatch['backend']} on mission {mismatch['mission']}: {mismatch['difference']}")
+        lines.append(f"Minimal reproducer ({mismatch['reproducer_difference']}):")
+        lines.append(mismatch['reproducer'].rstrip('\n'))
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Differential test of the simulation engines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--missions", type=int, default=DEFAULT_MISSIONS)
+    parser.add_argument("--backends", help=f"Comma separated backends from: {', '.join(BACKENDS)}")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="Largest grid coordinate")
+    parser.add_argument("--max-robots", type=int, default=DEFAULT_MAX_ROBOTS)
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    backends = args.backends.split(',') if args.backends else None
+    report = run_differential(args.seed, args.missions, backends, args.max_size, args.max_robots, args.max_length)
+    sys.stdout.write(json.dumps(report, indent=2) + '\n' if args.json else format_report(report))
+    if report['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
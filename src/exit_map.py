@@ -0,0 +1,106 @@
+#
+# Exit map index for O(1) "where does this forward run end" queries.
+# From any cell and heading a forward run can only leave the grid through one exit cell: the cell
+# on the facing edge in the same row or column. The exit map keeps, for each heading, which cells
+# of the facing edge have scent, indexed by their position along that edge. Together with the
+# distance to the edge this answers whether a run of F commands ends on the grid, stops on a scent
+# or loses the robot, without walking any steps. MarsGrid keeps the map up to date as scents are
+# added.
+#
+from robot import HEADING_INDEX, DELTA_X, DELTA_Y
+from scent_store import DENSE_PERIMETER_LIMIT
+
+#
+# Sparse edge flags for huge grids, indexed like a bytearray
+#
+class _SparseEdge(set):
+
+    def __getitem__(self, coordinate: int) -> int:
+        return 1 if coordinate in self else 0
+
+    def __setitem__(self, coordinate: int, value: int):
+        if value:
+            self.add(coordinate)
+        else:
+            self.discard(coordinate)
+
+#
+# Scent flags of the exit cells for each heading
+#
+class ExitMap:
+
+    # Build the exit map from the grid's current scents
+    #
+    # Args:
+    #     grid: MarsGrid instance
+    def __init__(self, grid):
+        self.max_x = grid.max_x
+        self.max_y = grid.max_y
+        self.grid = grid
+        self.refresh()
+
+    # Rebuild the map from the grid's scents, e.g. after another process added scents to a shared store
+    def refresh(self):
+        width = self.max_x + 1
+        height = self.max_y + 1
+        # Edges indexed by heading: north and south edges by x, east and west edges by y
+        self._edges = [_make_edge(width), _make_edge(height), _make_edge(width), _make_edge(height)]
+        for x, y in self.grid.scent_positions:
+            self.update(x, y)
+
+    # Record a new scent, only exit cells on the grid edges are tracked
+    def update(self, x: int, y: int):
+        if not (0 <= x <= self.max_x and 0 <= y <= self.max_y):
+            return
+        edges = self._edges
+        if y == self.max_y:
+            edges[0][x] = 1
+        if x == self.max_x:
+            edges[1][y] = 1
+        if y == 0:
+            edges[2][x] = 1
+        if x == 0:
+            edges[3][y] = 1
+
+    # Exit cell of a forward run
+    #
+    # Args:
+    #     x: X coordinate on the grid
+    #     y: Y coordinate on the grid
+    #     heading: Heading index (0=N, 1=E, 2=S, 3=W) or orientation character
+    #
+    # Returns:
+    #     Tuple of (distance, exit_x, exit_y, scented) where distance is the number of
+    #     steps to reach the exit cell
+    def exit(self, x: int, y: int, heading) -> tuple:
+        heading = HEADING_INDEX.get(heading, heading)
+        if not (0 <= x <= self.max_x and 0 <= y <= self.max_y):
+            raise ValueError(f"Position ({x}, {y}) is off the grid.")
+
+        if heading == 0:
+            return self.max_y - y, x, self.max_y, self._edges[0][x] == 1
+        if heading == 1:
+            return self.max_x - x, self.max_x, y, self._edges[1][y] == 1
+        if heading == 2:
+            return y, x, 0, self._edges[2][x] == 1
+        return x, 0, y, self._edges[3][y] == 1
+
+    # Outcome of a run of forward steps, without moving any robot
+    #
+    # Returns:
+    #     Tuple of (x, y, is_lost) at the end of the run
+    def outcome(self, x: int, y: int, heading, steps: int) -> tuple:
+        heading = HEADING_INDEX.get(heading, heading)
+        distance, exit_x, exit_y, scented = self.exit(x, y, heading)
+        if steps <= distance:
+            return x + DELTA_X[heading] * steps, y + DELTA_Y[heading] * steps, False
+        return exit_x, exit_y, not scented
+
+    # Check whether a run of forward steps would lose the robot
+    def will_be_lost(self, x: int, y: int, heading, steps: int) -> bool:
+        return self.outcome(x, y, heading, steps)[2]
+
+
+# Flags for one edge, dense for normal grids and sparse for huge ones
+def _make_edge(length: int):
+    return bytearray(length) if length <= DENSE_PERIMETER_LIMIT else _SparseEdge()
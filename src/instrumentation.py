@@ -0,0 +1,168 @@
+#
+# Opt-in instrumentation for the Martian Robot Challenge.
+# A Stats object collects counters and timings per command character, per robot, per MarsGrid
+# operation and per phase (parse, simulate, output). Passing it to CommandProcessor switches that
+# processor to an instrumented interpreter; without it the fast compiled path runs untouched, so
+# the cost when disabled is a single attribute check per instruction string.
+#
+# Grid operations are counted as they reach the grid. Robot checks the bounds inline and loses
+# itself through one claim_scent call, so a plain mission only reports scent claims; the other
+# operations appear once something, such as a callback command, calls them.
+#
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Grid operations counted by the instrumentation
+GRID_OPERATIONS = ('is_valid_position', 'has_scent', 'add_scent', 'claim_scent')
+
+# Operations reported even when never called, the only one the robot itself performs
+REPORTED_GRID_OPERATIONS = ('claim_scent',)
+
+#
+# Counters and timings collected while simulating
+#
+class Stats:
+
+    # Initialize empty statistics
+    #
+    # Args:
+    #     per_robot: Keep a record for every robot, memory grows with the number of robots
+    def __init__(self, per_robot: bool = False):
+        self.command_counts = Counter()
+        self.command_seconds = defaultdict(float)
+        self.grid_counts = Counter({operation: 0 for operation in REPORTED_GRID_OPERATIONS})
+        self.grid_seconds = defaultdict(float)
+        self.phase_seconds = defaultdict(float)
+        self.robots = 0
+        self.robots_lost = 0
+        self.robot_seconds = 0.0
+        self.per_robot = per_robot
+        self.robot_records = []
+
+    # Time a block of code as a named phase
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - start
+
+    # Wrap an iterator so the time spent producing each item is added to a phase
+    def timed_iter(self, name: str, iterator):
+        iterator = iter(iterator)
+        phase_seconds = self.phase_seconds
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                phase_seconds[name] += time.perf_counter() - start
+                return
+            phase_seconds[name] += time.perf_counter() - start
+            yield item
+
+    # Record the outcome of one robot
+    def record_robot(self, instructions: str, seconds: float, is_lost: bool):
+        self.robots += 1
+        self.robot_seconds += seconds
+        if is_lost:
+            self.robots_lost += 1
+        if self.per_robot:
+            self.robot_records.append({
+                'robot': self.robots,
+                'commands': len(instructions),
+                'seconds': seconds,
+                'lost': is_lost,
+            })
+
+    # Statistics as a JSON-serialisable dictionary
+    def to_dict(self) -> dict:
+        result = {
+            'commands': {command: {'count': count, 'seconds': self.command_seconds[command]}
+                         for command, count in sorted(self.command_counts.items())},
+            'grid': {operation: {'count': count, 'seconds': self.grid_seconds[operation]}
+                     for operation, count in sorted(self.grid_counts.items())},
+            'phases': dict(self.phase_seconds),
+            'robots': {'count': self.robots, 'lost': self.robots_lost, 'seconds': self.robot_seconds},
+        }
+        if self.per_robot:
+            result['per_robot'] = self.robot_records
+        return result
+
+    # Statistics as JSON text
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    # Statistics in the Prometheus text exposition format
+    def to_prometheus(self, prefix: str = 'mars') -> str:
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{labels} {value}")
+
+        metric('command_total', 'counter', "Commands executed per command character",
+               [(_labels(command=command), count) for command, count in sorted(self.command_counts.items())])
+        metric('command_seconds_total', 'counter', "Time spent per command character",
+               [(_labels(command=command), self.command_seconds[command]) for command in sorted(self.command_counts)])
+        metric('grid_operation_total', 'counter', "MarsGrid operations",
+               [(_labels(operation=operation), count) for operation, count in sorted(self.grid_counts.items())])
+        metric('grid_operation_seconds_total', 'counter', "Time spent in MarsGrid operations",
+               [(_labels(operation=operation), self.grid_seconds[operation]) for operation in sorted(self.grid_counts)])
+        metric('phase_seconds_total', 'counter', "Time spent per phase",
+               [(_labels(phase=phase), seconds) for phase, seconds in sorted(self.phase_seconds.items())])
+        metric('robots_total', 'counter', "Robots simulated", [('', self.robots)])
+        metric('robots_lost_total', 'counter', "Robots lost off the grid", [('', self.robots_lost)])
+        metric('robot_seconds_total', 'counter', "Time spent simulating robots", [('', self.robot_seconds)])
+        return '\n'.join(lines) + '\n'
+
+
+# Format Prometheus labels, escaping backslashes, quotes and newlines in values
+def _labels(**labels) -> str:
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+#
+# MarsGrid stand-in that counts and times scent operations on the wrapped grid
+#
+class InstrumentedGrid:
+
+    __slots__ = ('grid', 'stats', 'max_x', 'max_y')
+
+    def __init__(self, grid, stats: Stats):
+        self.grid = grid
+        self.stats = stats
+        self.max_x = grid.max_x
+        self.max_y = grid.max_y
+
+    # Anything not instrumented is read from the wrapped grid
+    def __getattr__(self, name):
+        return getattr(self.grid, name)
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        return self._timed('is_valid_position', self.grid.is_valid_position, x, y)
+
+    def has_scent(self, x: int, y: int) -> bool:
+        return self._timed('has_scent', self.grid.has_scent, x, y)
+
+    def add_scent(self, x: int, y: int):
+        return self._timed('add_scent', self.grid.add_scent, x, y)
+
+    def claim_scent(self, x: int, y: int) -> bool:
+        return self._timed('claim_scent', self.grid.claim_scent, x, y)
+
+    # Call a grid method, counting and timing it
+    def _timed(self, operation: str, method, x: int, y: int):
+        start = time.perf_counter()
+        result = method(x, y)
+        self.stats.grid_seconds[operation] += time.perf_counter() - start
+        self.stats.grid_counts[operation] += 1
+        return result
@@ -0,0 +1,146 @@
+#
+# Tick-based engine moving a whole fleet of robots concurrently on one grid.
+# Every robot is placed on the grid before the first tick, and in each tick every active robot
+# executes its next instruction, in robot order. A robot may not move onto a cell where another
+# robot stands: the move is blocked and counted as a collision, like a move stopped by a scent.
+# Lost robots leave the grid and free their cell, robots that run out of instructions stay parked
+# where they are. Moves off the grid follow the same scent rules as Robot.move_forward.
+#
+# The grid's occupancy index answers "who stands here" in O(1), and only robots that still have
+# instructions are visited, so a tick costs time proportional to the active robots.
+#
+from robot import Robot, DELTA_X, DELTA_Y
+from command_processor import expand_repetitions
+from occupancy import EMPTY
+
+#
+# Lockstep simulation of a fleet on one grid
+#
+class LockstepSimulation:
+
+    # Place the fleet on the grid
+    #
+    # Args:
+    #     grid: MarsGrid instance, its occupancy index is cleared and used by this simulation
+    #     robots: Iterable of (x, y, orientation, instructions) tuples
+    #     warn: Function called with each warning message, prints to stdout by default
+    #
+    # Raises:
+    #     ValueError: If two robots start on the same cell, or a robot's instructions expand
+    #         past command_processor.MAX_EXPANDED_LENGTH
+    def __init__(self, grid, robots, warn=print):
+        self.grid = grid
+        self.warn = warn
+        self.robots = []
+        self.instructions = []
+        self.collisions = 0
+        self.ticks = 0
+
+        occupancy = grid.occupancy
+        occupancy.clear()
+        for index, (x, y, orientation, instructions) in enumerate(robots):
+            robot = Robot(x, y, orientation, grid)
+            if grid.is_valid_position(x, y):
+                other = occupancy.get(x, y)
+                if other != EMPTY:
+                    raise ValueError(f"Robots {other + 1} and {index + 1} both start at ({x}, {y}).")
+                occupancy.place(x, y, index)
+            self.robots.append(robot)
+            self.instructions.append(expand_repetitions(instructions))
+
+        # Position in the instructions of every robot that still has some to execute
+        self._active = [[index, 0] for index, instructions in enumerate(self.instructions) if instructions]
+
+    # Number of robots that still have instructions to execute
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    # Advance every active robot by one instruction
+    #
+    # Returns:
+    #     Number of robots still active after the tick
+    def tick(self) -> int:
+        grid = self.grid
+        occupancy = grid.occupancy
+        robots = self.robots
+        instructions = self.instructions
+        max_x = grid.max_x
+        max_y = grid.max_y
+        still_active = []
+
+        for state in self._active:
+            index, position = state
+            robot = robots[index]
+            instruction = instructions[index][position]
+
+            if instruction == 'L':
+                robot.turn_left()
+            elif instruction == 'R':
+                robot.turn_right()
+            elif instruction == 'F':
+                x = robot.x
+                y = robot.y
+                heading = robot.heading
+                new_x = x + DELTA_X[heading]
+                new_y = y + DELTA_Y[heading]
+                on_grid = 0 <= x <= max_x and 0 <= y <= max_y
+                if 0 <= new_x <= max_x and 0 <= new_y <= max_y:
+                    if occupancy.get(new_x, new_y) != EMPTY:
+                        self.collisions += 1  # Another robot stands there, the move is blocked
+                    else:
+                        robot.x = new_x
+                        robot.y = new_y
+                        if on_grid:
+                            occupancy.move(x, y, new_x, new_y)
+                        else:
+                            occupancy.place(new_x, new_y, index)
+                else:
+                    robot.move_forward()  # Leaving the grid, scent rules decide
+                    if robot.is_lost and on_grid:
+                        occupancy.remove(x, y)
+            else:
+                self.warn(f"Warning: Unknown command '{instruction}' ignored")
+
+            position += 1
+            if not robot.is_lost and position < len(instructions[index]):
+                state[1] = position
+                still_active.append(state)
+
+        self._active = still_active
+        self.ticks += 1
+        return len(still_active)
+
+    # Run ticks until every robot has finished or been lost
+    #
+    # Args:
+    #     max_ticks: Stop after this many ticks, None runs to completion
+    #
+    # Returns:
+    #     List of result strings in robot order, formatted like str(Robot)
+    def run(self, max_ticks: int = None) -> list:
+        while self._active and (max_ticks is None or self.ticks < max_ticks):
+            self.tick()
+        return [str(robot) for robot in self.robots]
+
+    # Index of the robot standing on a cell, or None
+    def occupant(self, x: int, y: int):
+        if not self.grid.is_valid_position(x, y):
+            return None
+        index = self.grid.occupancy.get(x, y)
+        return None if index == EMPTY else index
+
+#
+# Simulate a fleet in lockstep ticks
+#
+# Args:
+#     grid: MarsGrid instance, scents left by lost robots are added to it
+#     robots: Iterable of (x, y, orientation, instructions) tuples
+#     warn: Function called with each warning message, prints to stdout by default
+#
+# Returns:
+#     Tuple of (results, collisions, ticks) where results are formatted like str(Robot)
+def simulate_lockstep(grid, robots, warn=print) -> tuple:
+    simulation = LockstepSimulation(grid, robots, warn)
+    results = simulation.run()
+    return results, simulation.collisions, simulation.ticks
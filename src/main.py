@@ -6,11 +6,34 @@ import sys
 from mars_grid import MarsGrid
 from robot import Robot
 from command_processor import CommandProcessor
+from validation import Limits, Validator, DEFAULT_LIMITS, UNLIMITED, parse_limit
+
+# Size of each bulk read when streaming input from stdin or a file
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+#
+# Validate grid dimensions against the mission constraints
+#
+# Args:
+#     limits: validation.Limits to enforce, the mission constraints by default
+def check_grid_limits(max_x: int, max_y: int, limits: Limits = None):
+    (DEFAULT_LIMITS if limits is None else limits).check_grid(max_x, max_y)
+
+#
+# Validate a robot instruction string against the mission constraints
+#
+# Args:
+#     limits: validation.Limits to enforce, the mission constraints by default
+def check_instructions(instructions: str, limits: Limits = None):
+    (DEFAULT_LIMITS if limits is None else limits).check_instructions(instructions)
 
 #
 # Parse input from stdin and return grid and robot data
 #
-def parse_input():
+# Args:
+#     limits: validation.Limits to enforce, the mission constraints by default
+def parse_input(limits: Limits = None):
+    validator = Validator(limits)
     try:
         # Read grid dimensions
         grid_line = input().strip()
@@ -20,31 +43,25 @@ def parse_input():
             print("Invalid grid dimensions. Please enter two integers separated by a space.")
             return None, []
         
-        if max_x > 50 or max_y > 50:
-            raise ValueError("Grid dimensions must not exceed 50 for either axis.")        
+        validator.limits.check_grid(max_x, max_y, 1)
         
         robots_data = []
         grid = MarsGrid(max_x, max_y)
+        line = 1
         
         # Read robot data in pairs
         while True:
             try:
                 # Read robot position and orientation
                 position_line = input().strip()
+                line += 1
                 if not position_line:
                     continue
-                    
-                parts = position_line.split()
-                x, y, orientation = int(parts[0]), int(parts[1]), parts[2]
                 
-                # Read robot instructions
+                # Read robot instructions, validated together with the position
                 instructions = input().strip()
-                
-                # Check instruction string length
-                if len(instructions) > 100:
-                    raise ValueError(f"Robot instruction string length ({len(instructions)}) exceeds maximum of 100 characters.")
-                
-                robots_data.append((x, y, orientation, instructions))
+                robots_data.append(validator.robot(position_line, instructions, line))
+                line += 1
                 
             except EOFError:
                 break
@@ -54,11 +71,424 @@ def parse_input():
     except EOFError:
         return None, []
 
+#
+# Read lines from a text stream using bulk buffered reads
+#
+# Args:
+#     stream: Text stream to read from (stdin or an open file)
+#     chunk_size: Number of characters fetched per read
+#
+# Yields:
+#     Each line of input without its trailing newline
+def iter_lines(stream, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    pending = []  # Chunks of an unfinished line, joined once its newline arrives
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if '\n' not in chunk:
+            pending.append(chunk)
+            continue
+        lines = chunk.split('\n')
+        if pending:
+            pending.append(lines[0])
+            lines[0] = ''.join(pending)
+        tail = lines.pop()
+        pending = [tail] if tail else []
+        yield from lines
+    if pending:
+        yield ''.join(pending)
+
+#
+# Lazily parse robot data from an iterator of lines, one robot at a time
+#
+# Args:
+#     lines: Iterator over the input lines following the grid dimensions
+#     limits: validation.Limits to enforce, the mission constraints by default
+#     first_line: Line number of the first line, used in error messages
+#
+# Yields:
+#     Tuple of (x, y, orientation, instructions) as soon as both robot lines arrive
+#
+# Raises:
+#     validation.ValidationError: At the first invalid robot, before any later line is read
+def stream_robots(lines, limits: Limits = None, first_line: int = 2):
+    return Validator(limits).robots(lines, first_line)
+
+#
+# Stream a mission from input to output, simulating each robot as soon as it is read
+# so memory stays flat and results appear without waiting for the end of input
+#
+# Args:
+#     in_stream: Text stream containing the mission
+#     out_stream: Buffered text stream receiving one result line per robot
+#     chunk_size: Number of characters fetched per read
+#     stats: Optional instrumentation.Stats collecting counters and phase timings
+#     limits: validation.Limits to enforce, the mission constraints by default
+#     result_cache: Optional result_cache.ResultCache reusing the results of identical robots,
+#         attached to the command processor of this stream
+#
+# Returns:
+#     Number of robots simulated, or None if the input is empty
+#
+# Raises:
+#     validation.ValidationError: For an invalid grid line, or at the first invalid robot
+def run_stream(in_stream, out_stream, chunk_size: int = DEFAULT_CHUNK_SIZE, stats=None, limits: Limits = None,
+               result_cache=None):
+    lines = iter_lines(in_stream, chunk_size)
+
+    grid_line = next(lines, None)
+    if grid_line is None:
+        return None
+    validator = Validator(limits)
+    max_x, max_y = validator.grid(grid_line)
+
+    grid = MarsGrid(max_x, max_y)
+    write = out_stream.write
+    count = 0
+
+    robots = validator.robots(lines)
+    if stats is not None:
+        robots = stats.timed_iter('parse', robots)
+        write = _timed_write(stats, write)
+
+    # Warnings go through the same buffered writer so they stay in line with the results
+    command_processor = CommandProcessor(warn=lambda message: write(f"{message}\n"), stats=stats)
+    execute_commands = command_processor.execute_commands
+    if result_cache is not None:
+        result_cache.command_processor = command_processor
+        execute_commands = result_cache.execute_commands
+
+    # One robot is reset for every robot in the mission rather than allocated each time
+    robot = Robot(0, 0, 'N', grid)
+    for x, y, orientation, instructions in robots:
+        robot.reset(x, y, orientation)
+        execute_commands(robot, instructions)
+        write(f"{robot}\n")
+        count += 1
+
+    out_stream.flush()
+    return count
+
+# Wrap a write function so its time is added to the output phase
+def _timed_write(stats, write):
+    def timed_write(text):
+        with stats.phase('output'):
+            write(text)
+    return timed_write
+
+#
+# Simulate a complete mission held in memory, as used by --batch
+#
+# The input is split as bytes in a single pass and the output is built as one buffer,
+# so the cost per line is only the parsing that each robot needs.
+#
+# Args:
+#     data: Complete mission in the text input format
+#     limits: validation.Limits to enforce, the mission constraints by default
+#     result_cache: Optional result_cache.ResultCache reusing the results of identical robots,
+#         attached to the command processor of this batch
+#
+# Returns:
+#     Output bytes with one line per warning or result, or None if there was no input
+def run_batch(data: bytes, limits: Limits = None, result_cache=None):
+    lines = data.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()  # Trailing newline
+    if not lines:
+        return None
+
+    validator = Validator(limits)
+    max_x, max_y = validator.grid(lines[0].decode(errors='replace'))
+
+    grid = MarsGrid(max_x, max_y)
+    output = []
+    command_processor = CommandProcessor(warn=output.append)
+    execute_commands = command_processor.execute_commands
+    if result_cache is not None:
+        result_cache.command_processor = command_processor
+        execute_commands = result_cache.execute_commands
+    append = output.append
+    robot = Robot(0, 0, 'N', grid)
+    index = 1
+    count = len(lines)
+
+    while index < count:
+        position_line = lines[index].strip()
+        index += 1
+        if not position_line:
+            continue
+        if index == count:
+            break  # Robot without instructions at end of input
+
+        # Line numbers count from 1, so the position line's number is the index after it
+        x, y, orientation, instructions = validator.robot(
+            position_line.decode(errors='replace'), lines[index].strip().decode(), index)
+        index += 1
+
+        robot.reset(x, y, orientation)
+        execute_commands(robot, instructions)
+        append(str(robot))
+
+    if not output:
+        return b''
+    output.append('')
+    return '\n'.join(output).encode()
+
+#
+# Report an error the same way in every non-interactive mode: on stderr, with exit status 1
+#
+def _fail(error: Exception):
+    sys.stdout.flush()  # Results printed before the error stay ahead of it
+    sys.stderr.write(f"Error: {error}\n")
+    sys.exit(1)
+
+#
+# Run --batch mode: one bulk read of the input and one buffered write of the output
+#
+def _run_batch(path, limits: Limits = None, dedup: bool = False):
+    if path is None:
+        data = sys.stdin.buffer.read()
+    else:
+        with open(path, 'rb') as in_stream:
+            data = in_stream.read()
+
+    result_cache = _result_cache(dedup)
+    try:
+        output = run_batch(data, limits, result_cache)
+    except ValueError as e:
+        _fail(e)
+
+    if output:
+        sys.stdout.buffer.write(output)
+        sys.stdout.buffer.flush()
+    _report_result_cache(result_cache)
+
+# Result cache for --dedup, None when deduplication is off
+def _result_cache(dedup: bool):
+    if not dedup:
+        return None
+    from result_cache import ResultCache
+    return ResultCache()
+
+# Print the result cache counters to stderr
+def _report_result_cache(result_cache):
+    if result_cache is not None:
+        stats = result_cache.stats()
+        sys.stderr.write(f"Result cache: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['stale']} stale), {stats['evictions']} evictions\n")
+
+#
+# Parse command line arguments
+#
+def _parse_args(argv):
+    import argparse  # Deferred so --batch pipelines do not pay for loading it
+
+    configured = Limits.from_env()
+    parser = argparse.ArgumentParser(description="Martian Robot Challenge")
+    parser.add_argument("input", nargs="?",
+                        help="Mission file to read (implies --stream)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Non-interactive mode: read all input at once and write all output in one go")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream results as robots are read, without the interactive banner")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Read concatenated missions and run them across N worker processes")
+    parser.add_argument("--profile", action="store_true",
+                        help="Stream the mission with instrumentation and print stats and a cProfile summary to stderr")
+    parser.add_argument("--stats-format", choices=("json", "prometheus"), default="json",
+                        help="Format of the stats printed by --profile")
+    parser.add_argument("--validate", action="store_true",
+                        help="Only validate the input, reporting every error with its line number")
+    parser.add_argument("--max-coordinate", type=parse_limit, default=configured.max_coordinate, metavar="N",
+                        help="Largest grid dimension allowed for either axis, or 'none' (default: %(default)s)")
+    parser.add_argument("--max-instructions", type=parse_limit, default=configured.max_instructions, metavar="N",
+                        help="Longest robot instruction string allowed, or 'none' (default: %(default)s)")
+    parser.add_argument("--no-limits", action="store_true",
+                        help="Disable the grid and instruction limits")
+    parser.add_argument("--large-grid", action="store_true",
+                        help="Accept grids of any size, keeping the instruction limit")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="Move all robots together in ticks, blocking moves onto occupied cells")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Reuse the results of robots with the same start and instructions, when the scent they met is unchanged")
+    parser.add_argument("--gc-pause", action="store_true",
+                        help="Freeze and disable the garbage collector while robots are simulated")
+    args = parser.parse_args(argv)
+
+    # Deduplication wraps the sequential engine, the other modes would silently ignore it
+    if args.dedup:
+        for option, enabled in (("--workers", args.workers is not None), ("--lockstep", args.lockstep),
+                                ("--profile", args.profile), ("--validate", args.validate)):
+            if enabled:
+                parser.error(f"--dedup cannot be combined with {option}, it applies to streaming and --batch")
+    return args
+
+#
+# Build the limits selected on the command line
+#
+def _limits(args) -> Limits:
+    if args.no_limits:
+        return UNLIMITED
+    if args.large_grid:
+        return Limits(None, args.max_instructions)
+    return Limits(args.max_coordinate, args.max_instructions)
+
+#
+# Validate a mission from a file or stdin in one pass, without simulating it
+#
+def _run_validation(path, limits: Limits) -> int:
+    from validation import validate_mission
+
+    if path is None:
+        return validate_mission(iter_lines(sys.stdin), limits)
+    with open(path) as in_stream:
+        return validate_mission(iter_lines(in_stream), limits)
+
+#
+# Run a mission in streaming mode from a file or stdin
+#
+def _run_streaming(path, limits: Limits = None, dedup: bool = False):
+    result_cache = _result_cache(dedup)
+
+    if path is None:
+        count = run_stream(sys.stdin, sys.stdout, limits=limits, result_cache=result_cache)
+    else:
+        with open(path) as in_stream:
+            count = run_stream(in_stream, sys.stdout, limits=limits, result_cache=result_cache)
+
+    _report_result_cache(result_cache)
+    return count
+
+#
+# Run a mission in streaming mode with instrumentation and cProfile enabled,
+# then dump the collected stats and a profile summary to stderr
+#
+def _run_profiled(path, stats_format: str, limits: Limits = None):
+    import cProfile
+    import pstats
+    from instrumentation import Stats
+
+    stats = Stats()
+    profiler = cProfile.Profile()
+    in_stream = sys.stdin if path is None else open(path)
+    try:
+        profiler.enable()
+        with stats.phase('total'):
+            count = run_stream(in_stream, sys.stdout, stats=stats, limits=limits)
+        profiler.disable()
+    finally:
+        if path is not None:
+            in_stream.close()
+
+    stats.phase_seconds['simulate'] = stats.robot_seconds
+    sys.stderr.write(stats.to_prometheus() if stats_format == 'prometheus' else stats.to_json() + '\n')
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+    return count
+
+#
+# Run a mission with every robot moving in lockstep ticks, reporting collisions on stderr
+#
+def _run_lockstep(path, limits: Limits = None):
+    from lockstep_engine import simulate_lockstep
+
+    in_stream = sys.stdin if path is None else open(path)
+    try:
+        lines = iter_lines(in_stream)
+        grid_line = next(lines, None)
+        if grid_line is None:
+            return None
+        max_x, max_y = Validator(limits).grid(grid_line)
+        grid = MarsGrid(max_x, max_y)
+        results, collisions, ticks = simulate_lockstep(grid, stream_robots(lines, limits))
+    finally:
+        if path is not None:
+            in_stream.close()
+
+    sys.stdout.write(''.join(f"{result}\n" for result in results))
+    sys.stderr.write(f"Ticks: {ticks}, collisions: {collisions}\n")
+    return len(results)
+
+#
+# Run a multi-mission input from a file or stdin across worker processes
+#
+def _run_missions(path, workers: int, limits: Limits = None, gc_pause: bool = False):
+    from mission_runner import run_mission_stream
+
+    if path is None:
+        return run_mission_stream(iter_lines(sys.stdin), sys.stdout, workers, limits, gc_pause)
+    with open(path) as in_stream:
+        return run_mission_stream(iter_lines(in_stream), sys.stdout, workers, limits, gc_pause)
+
 #
 # Main function to run the Martian Robot Challenge
 #
-def main():
+def main(argv=None):
     """Run the Martian Robot Challenge"""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Fast path for "--batch [file]", skips building the argument parser
+    if argv[:1] == ['--batch'] and (len(argv) == 1 or len(argv) == 2 and not argv[1].startswith('-')):
+        _run_batch(argv[1] if len(argv) == 2 else None, Limits.from_env())
+        return
+
+    args = _parse_args(argv)
+    limits = _limits(args)
+    if args.gc_pause:
+        from gc_control import gc_paused
+        with gc_paused():
+            _run(args, limits)
+    else:
+        _run(args, limits)
+
+#
+# Run the mode selected on the command line
+#
+def _run(args, limits: Limits):
+    if args.validate:
+        try:
+            count = _run_validation(args.input, limits)
+        except ValueError as e:
+            _fail(e)
+        print(f"Input is valid: {count} robots.")
+        return
+
+    if args.batch:
+        _run_batch(args.input, limits, args.dedup)
+        return
+
+    if args.workers is not None:
+        try:
+            if _run_missions(args.input, max(args.workers, 1), limits, args.gc_pause) == 0:
+                print("No input provided.")
+        except ValueError as e:
+            _fail(e)
+        return
+
+    if args.lockstep:
+        try:
+            if _run_lockstep(args.input, limits) is None:
+                print("No input provided.")
+        except ValueError as e:
+            _fail(e)
+        return
+
+    if args.profile:
+        try:
+            if _run_profiled(args.input, args.stats_format, limits) is None:
+                print("No input provided.")
+        except ValueError as e:
+            _fail(e)
+        return
+
+    if args.stream or args.input is not None:
+        try:
+            if _run_streaming(args.input, limits, args.dedup) is None:
+                print("No input provided.")
+        except ValueError as e:
+            _fail(e)
+        return
+
     print("Martian Robot Challenge")
     print("Enter grid dimensions e.g. 5 3")
     print("Then enter robot data as two lines")
@@ -69,7 +499,7 @@ def main():
     print("Enter your input below:")
     
     try:
-        grid, robots_data = parse_input()
+        grid, robots_data = parse_input(limits)
         
         if grid is None:
             print("No input provided.")
@@ -79,8 +509,9 @@ def main():
         results = []
         
         # Process each robot sequentially
+        robot = Robot(0, 0, 'N', grid)
         for x, y, orientation, instructions in robots_data:
-            robot = Robot(x, y, orientation, grid)
+            robot.reset(x, y, orientation)
             command_processor.execute_commands(robot, instructions)
             results.append(str(robot))
         
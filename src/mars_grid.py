@@ -1,3 +1,5 @@
+from scent_store import make_scent_store, scent_store_from_bytes, scent_store_kind, MappedScentStore
+
 #
 # This class represents the Mars surface grid with boundaries and supports scent tracking
 # to prevent multiple robots from getting lost from the same position.
@@ -8,12 +10,43 @@ class MarsGrid:
     # Args:
     #     max_x: Maximum x coordinate (upper-right corner)
     #     max_y: Maximum y coordinate (upper-right corner)
+    #     scent_store: Optional scent backend, chosen from the grid dimensions if omitted
     #
-    def __init__(self, max_x: int, max_y: int):
+    def __init__(self, max_x: int, max_y: int, scent_store=None):
+
+        self.max_x = max_x
+        self.max_y = max_y
+        # Record positions where robots were lost
+        self.scent_positions = scent_store if scent_store is not None else make_scent_store(max_x, max_y)
+        self._exit_map = None  # Built on first use
+        self._occupancy = None  # Built on first use
 
+    # Clear the grid for a new mission with the given dimensions, reusing the scent storage
+    # where it suits the new dimensions so long-running workers do not allocate a grid per mission
+    #
+    # Args:
+    #     max_x: Maximum x coordinate (upper-right corner)
+    #     max_y: Maximum y coordinate (upper-right corner)
+    #
+    # Returns:
+    #     The grid itself
+    #
+    # Raises:
+    #     ValueError: If the grid shares a scent file and the dimensions change
+    def reset(self, max_x: int, max_y: int):
+        store = self.scent_positions
+        if (max_x, max_y) == (store.max_x, store.max_y):
+            store.clear()
+        elif store.kind == MappedScentStore.kind or store.kind == scent_store_kind(max_x, max_y):
+            # A scent file is sized for one grid, so its reset refuses new dimensions
+            store.reset(max_x, max_y)
+        else:
+            self.scent_positions = make_scent_store(max_x, max_y)
         self.max_x = max_x
         self.max_y = max_y
-        self.scent_positions = set()  # Record positions where robots were lost
+        self._exit_map = None
+        self._occupancy = None
+        return self
 
     # Check if position is within grid bounds
     #
@@ -36,7 +69,7 @@ class MarsGrid:
     # Returns:
     #     True if position has scent, False otherwise
     def has_scent(self, x: int, y: int) -> bool:
-        return (x, y) in self.scent_positions
+        return self.scent_positions.has(x, y)
 
     # Add robot scent at given position
     #
@@ -45,7 +78,71 @@ class MarsGrid:
     #     y: Y coordinate
     #
     def add_scent(self, x: int, y: int):
-        self.scent_positions.add((x, y))
+        self.scent_positions.add(x, y)
+        if self._exit_map is not None:
+            self._exit_map.update(x, y)
+
+    # Add robot scent at given position unless it is already there, as a single atomic step
+    # so a robot is only lost if no other robot (or process sharing the scent store) got there first
+    #
+    # Args:
+    #     x: X coordinate
+    #     y: Y coordinate
+    #
+    # Returns:
+    #     True if this call added the scent, False if the position already had scent
+    def claim_scent(self, x: int, y: int) -> bool:
+        claimed = self.scent_positions.test_and_set(x, y)
+        if claimed and self._exit_map is not None:
+            self._exit_map.update(x, y)
+        return claimed
+
+    # Index of exit cells and their scent for O(1) forward run queries, kept up to date
+    # as scents are added through this grid
+    #
+    #    Returns:
+    #        ExitMap for this grid
+    @property
+    def exit_map(self):
+        if self._exit_map is None:
+            from exit_map import ExitMap
+            self._exit_map = ExitMap(self)
+        return self._exit_map
+
+    # Index of the robots standing on each cell, used by engines that move robots concurrently
+    #
+    #    Returns:
+    #        DenseOccupancy for small grids, SparseOccupancy for huge ones
+    @property
+    def occupancy(self):
+        if self._occupancy is None:
+            from occupancy import make_occupancy
+            self._occupancy = make_occupancy(self.max_x, self.max_y)
+        return self._occupancy
+
+    # Export scent state as a compact binary blob
+    #
+    #    Returns:
+    #        Bytes that can be passed to import_scents()
+    def export_scents(self) -> bytes:
+        return self.scent_positions.to_bytes()
+
+    # Replace scent state with the contents of a blob from export_scents()
+    #
+    # Args:
+    #     blob: Binary scent state exported from a grid of the same dimensions
+    #
+    def import_scents(self, blob: bytes):
+        imported = scent_store_from_bytes(blob)
+        if (imported.max_x, imported.max_y) != (self.max_x, self.max_y):
+            raise ValueError("Scent state was exported from a grid with different dimensions.")
+        if imported.kind == self.scent_positions.kind:
+            self.scent_positions = imported
+        else:
+            self.scent_positions.clear()
+            for x, y in imported:
+                self.scent_positions.add(x, y)
+        self._exit_map = None
 
     # Get grid dimensions
     #    
@@ -0,0 +1,176 @@
+#
+# Multi-mission input format and process pool runner for the Martian Robot Challenge.
+# A multi-mission stream is a concatenation of independent missions, each starting with its own
+# grid line ("max_x max_y") followed by pairs of robot lines. Grid lines have two values and robot
+# position lines have three, so a two-value line where a robot position is expected starts the
+# next mission. Each mission runs on its own MarsGrid, so scent state is never shared.
+#
+import multiprocessing
+from collections import deque
+from contextlib import nullcontext
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from validation import Limits, Validator, ValidationError
+from gc_control import gc_paused
+
+# Number of missions sent to a worker process in one task
+DEFAULT_CHUNK_SIZE = 16
+
+#
+# Parse missions from an iterator of lines
+#
+# Args:
+#     lines: Iterator over the input lines
+#     limits: validation.Limits to enforce, the mission constraints by default
+#
+# Yields:
+#     Tuple of (max_x, max_y, robots) where robots is a list of (x, y, orientation, instructions)
+def iter_missions(lines, limits: Limits = None):
+    validator = Validator(limits)
+    lines = iter(lines)
+    mission = None
+    number = 0
+    for line in lines:
+        number += 1
+        parts = line.split()
+        if not parts:
+            continue
+
+        if len(parts) == 2:
+            if mission is not None:
+                yield mission
+            try:
+                max_x, max_y = int(parts[0]), int(parts[1])
+            except ValueError:
+                raise ValidationError(f"Invalid grid dimensions '{line.strip()}'.", number)
+            validator.limits.check_grid(max_x, max_y, number)
+            mission = (max_x, max_y, [])
+            continue
+
+        if mission is None:
+            raise ValidationError("Robot data found before grid dimensions.", number)
+
+        instructions = next(lines, None)
+        if instructions is None:
+            break  # Robot without instructions at end of input
+        mission[2].append(validator.robot(line.strip(), instructions.strip(), number))
+        number += 1
+
+    if mission is not None:
+        yield mission
+
+# Grid, robot and command processor reused by every mission run in this process
+_grid = None
+_robot = None
+_command_processor = None
+
+#
+# Run a single mission on a cleared grid
+#
+# The grid, robot and command processor are kept per process and reset for each mission,
+# so long-running workers do not allocate them again for every mission.
+#
+# Args:
+#     mission: Tuple of (max_x, max_y, robots) as yielded by iter_missions()
+#
+# Returns:
+#     List of output lines, warnings included in the order they were raised
+def run_mission(mission) -> list:
+    global _grid, _robot, _command_processor
+
+    max_x, max_y, robots = mission
+    if _grid is None:
+        _grid = MarsGrid(max_x, max_y)
+        _robot = Robot(0, 0, 'N', _grid)
+        _command_processor = CommandProcessor()
+    else:
+        _grid.reset(max_x, max_y)
+    output = []
+    command_processor = _command_processor
+    command_processor.warn = output.append
+    robot = _robot
+
+    for x, y, orientation, instructions in robots:
+        robot.reset(x, y, orientation)
+        command_processor.execute_commands(robot, instructions)
+        output.append(str(robot))
+    return output
+
+
+# Run a chunk of missions inside a worker process, optionally with the garbage collector paused
+def _run_chunk(missions, gc_pause: bool = False) -> list:
+    if not gc_pause:
+        return [run_mission(mission) for mission in missions]
+    with gc_paused():
+        return [run_mission(mission) for mission in missions]
+
+
+#
+# Group items (missions or robots) into lists of up to chunk_size items
+#
+def chunked(items, chunk_size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+#
+# Run missions across a pool of worker processes, yielding results in input order
+#
+# Only a few chunks per worker are in flight at any time, so input is read as results are
+# produced rather than loaded up front.
+#
+# Args:
+#     missions: Iterable of missions as yielded by iter_missions()
+#     workers: Number of worker processes (1 runs in the current process)
+#     chunk_size: Number of missions per worker task
+#     gc_pause: Pause the garbage collector while workers simulate each chunk
+#
+# Yields:
+#     List of output lines for each mission
+def run_missions(missions, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE, gc_pause: bool = False):
+    if workers <= 1:
+        with gc_paused() if gc_pause else nullcontext():
+            for mission in missions:
+                yield run_mission(mission)
+        return
+
+    max_in_flight = workers * 2
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+        for chunk in chunked(missions, chunk_size):
+            pending.append(pool.apply_async(_run_chunk, (chunk, gc_pause)))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+#
+# Run a multi-mission stream and write the results, separating missions with a blank line
+#
+# Args:
+#     lines: Iterator over the input lines
+#     out_stream: Text stream receiving the output
+#     workers: Number of worker processes
+#     limits: validation.Limits to enforce, the mission constraints by default
+#     gc_pause: Pause the garbage collector while missions are simulated
+#
+# Returns:
+#     Number of missions run
+def run_mission_stream(lines, out_stream, workers: int = 1, limits: Limits = None, gc_pause: bool = False) -> int:
+    count = 0
+    for output in run_missions(iter_missions(lines, limits), workers, gc_pause=gc_pause):
+        if count:
+            out_stream.write("\n")
+        out_stream.write("\n".join(output))
+        if output:
+            out_stream.write("\n")
+        count += 1
+    out_stream.flush()
+    return count
@@ -0,0 +1,150 @@
+#
+# Editable mission session with incremental re-simulation.
+# A robot only affects later robots through the scent it leaves when it is lost, and it leaves at
+# most one, so the scent state after each robot is checkpointed as the cell that robot scented.
+# The scent state after robot i is the union of the checkpoints up to i.
+#
+# Editing robot k rolls the grid back to the checkpoint before k and re-simulates from k. After each
+# robot the scents of the new run are compared with those of the previous run, and as soon as the
+# two sets agree every later robot would see exactly the grid it saw before, so re-simulation stops
+# there. Only results that changed are returned.
+#
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from validation import Limits, Validator, ValidationError, DEFAULT_LIMITS, ORIENTATIONS
+
+#
+# Mission held in memory, re-simulated incrementally as its robots are edited
+#
+class MissionSession:
+
+    # Simulate the mission once, checkpointing the scent left by every robot
+    #
+    # Args:
+    #     max_x: Maximum x coordinate of the grid
+    #     max_y: Maximum y coordinate of the grid
+    #     robots: Iterable of (x, y, orientation, instructions) tuples
+    #     limits: validation.Limits enforced on the grid and on edits, the mission constraints by default
+    def __init__(self, max_x: int, max_y: int, robots, limits: Limits = None):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.limits.check_grid(max_x, max_y)
+        self.grid = MarsGrid(max_x, max_y)
+        self.robots = [tuple(robot) for robot in robots]
+        self.results = []
+        self.warnings = []  # Warning messages of every robot
+        self.scents = []  # Cell scented by every robot, None if it was not lost
+        self.resimulated = 0  # Robots simulated by the last edit
+
+        self._robot = Robot(0, 0, 'N', self.grid)
+        self._robot_warnings = None
+        self._command_processor = CommandProcessor(warn=lambda message: self._robot_warnings.append(message))
+
+        for index in range(len(self.robots)):
+            result, warnings, scent = self._simulate(index)
+            self.results.append(result)
+            self.warnings.append(warnings)
+            self.scents.append(scent)
+
+    # Create a session from the lines of a text mission
+    #
+    # Args:
+    #     lines: Iterator over all input lines, starting with the grid line
+    #     limits: validation.Limits to enforce, the mission constraints by default
+    #
+    # Raises:
+    #     validation.ValidationError: If the mission is empty or invalid
+    @classmethod
+    def from_lines(cls, lines, limits: Limits = None):
+        validator = Validator(limits)
+        lines = iter(lines)
+        grid_line = next(lines, None)
+        if grid_line is None:
+            raise ValidationError("Mission has no grid dimensions.", 1)
+        max_x, max_y = validator.grid(grid_line)
+        return cls(max_x, max_y, validator.robots(lines), validator.limits)
+
+    # Change one robot and re-simulate from it until the scent state converges
+    #
+    # Args:
+    #     index: Position of the robot in the mission, from 0
+    #     x, y, orientation, instructions: New values, None keeps the current one
+    #
+    # Returns:
+    #     Dictionary of robot index to new result string, for every result that changed
+    #
+    # Raises:
+    #     IndexError: If there is no robot at index, negative indexes are not accepted
+    #     validation.ValidationError: If the new orientation or instructions are invalid
+    def edit(self, index: int, x: int = None, y: int = None, orientation: str = None,
+             instructions: str = None) -> dict:
+        if index < 0:
+            raise IndexError(f"Robot index {index} must not be negative.")  # Rollback relies on the position
+        old = self.robots[index]
+        robot = (old[0] if x is None else x, old[1] if y is None else y,
+                 old[2] if orientation is None else orientation,
+                 old[3] if instructions is None else instructions)
+        if robot[2] not in ORIENTATIONS:
+            raise ValidationError(f"Invalid orientation '{robot[2]}'. Must be one of N, E, S, W.")
+        self.limits.check_instructions(robot[3])
+
+        self.resimulated = 0
+        if robot == old:
+            return {}
+        self.robots[index] = robot
+        self._rollback(index)
+
+        # Cells scented by only one of the two runs, over the robots simulated so far
+        difference = set()
+        changed = {}
+        count = len(self.robots)
+        position = index
+        while position < count:
+            result, warnings, scent = self._simulate(position)
+            self.resimulated += 1
+            previous = self.scents[position]
+            if scent != previous:
+                for cell in (previous, scent):
+                    if cell is not None:
+                        difference ^= {cell}
+            if result != self.results[position]:
+                changed[position] = result
+            self.results[position] = result
+            self.warnings[position] = warnings
+            self.scents[position] = scent
+            position += 1
+            if not difference:
+                break  # Later robots see the same scents as before
+
+        # Bring the grid up to date with the scents of the robots that were not re-simulated
+        grid = self.grid
+        for scent in self.scents[position:]:
+            if scent is not None:
+                grid.add_scent(*scent)
+        return changed
+
+    # Output lines of the mission, warnings interleaved with results as main.py prints them
+    def output_lines(self) -> list:
+        lines = []
+        for warnings, result in zip(self.warnings, self.results):
+            lines.extend(warnings)
+            lines.append(result)
+        return lines
+
+    # Restore the scent checkpoint from before a robot
+    def _rollback(self, index: int):
+        grid = self.grid.reset(self.grid.max_x, self.grid.max_y)
+        for scent in self.scents[:index]:
+            if scent is not None:
+                grid.add_scent(*scent)
+
+    # Simulate one robot on the current grid
+    #
+    # Returns:
+    #     Tuple of (result, warnings, scented cell or None)
+    def _simulate(self, index: int) -> tuple:
+        x, y, orientation, instructions = self.robots[index]
+        robot = self._robot.reset(x, y, orientation)
+        self._robot_warnings = warnings = []
+        self._command_processor.execute_commands(robot, instructions)
+        return str(robot), warnings, (robot.x, robot.y) if robot.is_lost else None
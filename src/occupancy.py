@@ -0,0 +1,105 @@
+#
+# Spatial occupancy index for robots sharing a Mars grid.
+# Maps each occupied cell to the index of the robot standing on it, so checking whether a cell is
+# free costs O(1) no matter how many robots are on the grid. Small grids use a flat array with one
+# slot per cell, huge grids a dictionary holding only the occupied cells. Only cells on the grid are
+# indexed, robots off the grid are not tracked.
+#
+from array import array
+
+# Largest number of cells for which the dense array is used, so the array never costs more than
+# a fixed 256 KiB however large the grid
+DENSE_OCCUPANCY_LIMIT = 1 << 16
+
+# Marker for an empty cell
+EMPTY = -1
+
+#
+# Array-backed occupancy, one slot per cell holding the robot index plus one (0 is empty)
+#
+class DenseOccupancy:
+
+    __slots__ = ('max_x', 'max_y', '_width', '_cells', '_count')
+    kind = 'dense'
+
+    def __init__(self, max_x: int, max_y: int):
+        self.max_x = max_x
+        self.max_y = max_y
+        self._width = max_x + 1
+        self._cells = array('i', [0]) * ((max_x + 1) * (max_y + 1))
+        self._count = 0
+
+    # Robot index on a cell, or EMPTY
+    def get(self, x: int, y: int) -> int:
+        return self._cells[y * self._width + x] - 1
+
+    # Put a robot on an empty cell
+    def place(self, x: int, y: int, robot: int):
+        self._cells[y * self._width + x] = robot + 1
+        self._count += 1
+
+    # Empty a cell
+    def remove(self, x: int, y: int):
+        self._cells[y * self._width + x] = 0
+        self._count -= 1
+
+    # Move the robot on one cell to another, empty cell
+    def move(self, x: int, y: int, new_x: int, new_y: int):
+        cells = self._cells
+        width = self._width
+        cells[new_y * width + new_x] = cells[y * width + x]
+        cells[y * width + x] = 0
+
+    # Empty every cell
+    def clear(self):
+        if self._count:
+            self._cells = array('i', [0]) * len(self._cells)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+#
+# Dictionary-backed occupancy for huge grids, memory grows only with the number of robots
+#
+class SparseOccupancy:
+
+    __slots__ = ('max_x', 'max_y', '_cells')
+    kind = 'sparse'
+
+    def __init__(self, max_x: int, max_y: int):
+        self.max_x = max_x
+        self.max_y = max_y
+        self._cells = {}
+
+    # Robot index on a cell, or EMPTY
+    def get(self, x: int, y: int) -> int:
+        return self._cells.get((x, y), EMPTY)
+
+    # Put a robot on an empty cell
+    def place(self, x: int, y: int, robot: int):
+        self._cells[(x, y)] = robot
+
+    # Empty a cell
+    def remove(self, x: int, y: int):
+        del self._cells[(x, y)]
+
+    # Move the robot on one cell to another, empty cell
+    def move(self, x: int, y: int, new_x: int, new_y: int):
+        cells = self._cells
+        cells[(new_x, new_y)] = cells.pop((x, y))
+
+    # Empty every cell
+    def clear(self):
+        self._cells.clear()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+#
+# Choose an occupancy index for the given grid dimensions
+#
+def make_occupancy(max_x: int, max_y: int):
+    if 0 <= max_x and 0 <= max_y and (max_x + 1) * (max_y + 1) <= DENSE_OCCUPANCY_LIMIT:
+        return DenseOccupancy(max_x, max_y)
+    return SparseOccupancy(max_x, max_y)
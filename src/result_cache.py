@@ -0,0 +1,169 @@
+#
+# Result deduplication cache around CommandProcessor.execute_commands.
+# A robot's outcome depends only on the grid dimensions, its start state, its instructions and the
+# scent of the cells its path actually consults, which are the few edge cells it tries to leave
+# from. Each run is made against a recording proxy of the grid that notes the scent seen on every
+# cell the first time it is consulted and every scent the run adds. A later robot with the same
+# key reuses the result if those cells still hold the scent recorded, replaying the scents the
+# run added and the warnings it gave. Otherwise it is simulated again and the entry replaced.
+#
+# Registered commands must depend only on the robot and its grid. A run that reaches the grid
+# through anything other than the scent methods (the exit map, the occupancy index) is not cached.
+#
+from collections import OrderedDict
+
+# Default number of results kept
+DEFAULT_RESULT_CACHE_SIZE = 65536
+
+#
+# Grid proxy recording the scent a run consults and adds
+#
+class RecordingGrid:
+
+    __slots__ = ('grid', 'max_x', 'max_y', 'reads', 'writes', 'opaque')
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.max_x = grid.max_x
+        self.max_y = grid.max_y
+        self.reads = {}  # Cell to the scent it held when first consulted
+        self.writes = []  # Cells scented by the run, in order
+        self.opaque = False  # Set when the run used the grid in a way that is not recorded
+
+    # Anything not recorded is read from the wrapped grid, and makes the run uncacheable
+    def __getattr__(self, name):
+        self.opaque = True
+        return getattr(self.grid, name)
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        return self.grid.is_valid_position(x, y)
+
+    def has_scent(self, x: int, y: int) -> bool:
+        scented = self.grid.has_scent(x, y)
+        self._read((x, y), scented)
+        return scented
+
+    def add_scent(self, x: int, y: int):
+        if not self.grid.has_scent(x, y):
+            self.writes.append((x, y))
+        self.grid.add_scent(x, y)
+
+    def claim_scent(self, x: int, y: int) -> bool:
+        claimed = self.grid.claim_scent(x, y)
+        self._read((x, y), not claimed)
+        if claimed:
+            self.writes.append((x, y))
+        return claimed
+
+    # Note the scent of a cell, unless an earlier read or this run's own scent already decided it
+    def _read(self, cell: tuple, scented: bool):
+        if cell not in self.reads and cell not in self.writes:
+            self.reads[cell] = scented
+
+#
+# Bounded LRU cache of robot outcomes, used in place of CommandProcessor.execute_commands
+#
+class ResultCache:
+
+    # Args:
+    #     command_processor: CommandProcessor running the robots that are not cached, run_stream
+    #         attaches its own when this is None
+    #     max_size: Maximum number of results kept (0 disables caching)
+    def __init__(self, command_processor=None, max_size: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.command_processor = command_processor
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Misses on a key whose consulted scent had changed
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    # Execute instructions on a robot, reusing the result of an identical earlier run when the
+    # scent it consulted is unchanged
+    #
+    # Args:
+    #     robot: Robot instance to command
+    #     instructions: String of command characters
+    def execute_commands(self, robot, instructions: str):
+        command_processor = self.command_processor
+        if robot.is_lost or command_processor.stats is not None or self.max_size <= 0:
+            command_processor.execute_commands(robot, instructions)
+            return
+
+        grid = robot.grid
+        key = (grid.max_x, grid.max_y, robot.x, robot.y, robot.heading, instructions)
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            x, y, heading, is_lost, reads, writes, warnings = entry
+            has_scent = grid.has_scent
+            if all(has_scent(*cell) == scented for cell, scented in reads):
+                entries.move_to_end(key)
+                self.hits += 1
+                for cell in writes:
+                    grid.add_scent(*cell)
+                for message in warnings:
+                    command_processor.warn(message)
+                robot.x = x
+                robot.y = y
+                robot.rotate(heading - robot.heading)
+                robot.is_lost = is_lost
+                return
+            self.stale += 1
+
+        self.misses += 1
+        self._run(robot, instructions, key)
+
+    # Simulate a robot against the recording proxy and store the outcome
+    def _run(self, robot, instructions: str, key: tuple):
+        command_processor = self.command_processor
+        grid = robot.grid
+        warn = command_processor.warn
+        warnings = []
+
+        def record_warning(message):
+            warnings.append(message)
+            warn(message)
+
+        recording = RecordingGrid(grid)
+        robot.grid = recording
+        command_processor.warn = record_warning
+        try:
+            command_processor.execute_commands(robot, instructions)
+        finally:
+            robot.grid = grid
+            command_processor.warn = warn
+
+        entries = self._entries
+        if recording.opaque:
+            entries.pop(key, None)
+            return
+        entries[key] = (robot.x, robot.y, robot.heading, robot.is_lost, tuple(recording.reads.items()),
+                        tuple(recording.writes), tuple(warnings))
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    # Number of results kept
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Forget every result
+    def clear(self):
+        self._entries.clear()
+
+    # Hit and miss counters
+    #
+    # Returns:
+    #     Dictionary of hits, misses, stale misses, evictions, entries and hit rate
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
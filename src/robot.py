@@ -4,7 +4,25 @@
 # in which case it will be marked as lost. A scent is left at the position where it got lost, to prevent
 # another robot from trying to move off the grid again from that position.
 #
+# Internally the heading is a small integer index into ORIENTATIONS, so turns and moves are plain
+# table lookups rather than list searches and dictionary lookups.
+#
+
+# Heading index of each orientation character
+HEADING_INDEX = {'N': 0, 'E': 1, 'S': 2, 'W': 3}
+
+# Heading reached after a left or right turn, indexed by current heading
+TURN_LEFT = (3, 0, 1, 2)
+TURN_RIGHT = (1, 2, 3, 0)
+
+# Movement deltas indexed by heading
+DELTA_X = (0, 1, 0, -1)
+DELTA_Y = (1, 0, -1, 0)
+
+
 class Robot:
+
+    __slots__ = ('x', 'y', '_heading', 'grid', 'is_lost')
     
     # Define orientations in clockwise order to establish convention for orientation changes
     ORIENTATIONS = ['N', 'E', 'S', 'W']
@@ -30,22 +48,67 @@ class Robot:
         self.orientation = orientation
         self.grid = grid
         self.is_lost = False
+
+    # Put the robot back on the grid at a new position, ready for the next set of instructions,
+    # so one robot object can be reused for every robot of a mission
+    #
+    # Args:
+    #     x: New x coordinate
+    #     y: New y coordinate
+    #     orientation: New orientation (N, S, E, W)
+    #     grid: MarsGrid to move the robot to, keeps the current grid if omitted
+    #
+    # Returns:
+    #     The robot itself
+    def reset(self, x: int, y: int, orientation: str, grid=None):
+        self.orientation = orientation
+        self.x = x
+        self.y = y
+        if grid is not None:
+            self.grid = grid
+        self.is_lost = False
+        return self
+
+    # Current orientation as one of N, E, S, W
+    @property
+    def orientation(self) -> str:
+        return self.ORIENTATIONS[self._heading]
+
+    @orientation.setter
+    def orientation(self, orientation: str):
+        try:
+            self._heading = HEADING_INDEX[orientation]
+        except KeyError:
+            raise ValueError(f"Invalid orientation '{orientation}'. Must be one of N, E, S, W.")
+
+    # Current heading as an index into ORIENTATIONS (0=N, 1=E, 2=S, 3=W)
+    @property
+    def heading(self) -> int:
+        return self._heading
     
     # Turn robot 90 degrees left (counterclockwise)
     def turn_left(self):
         if self.is_lost:
             return
             
-        current_index = self.ORIENTATIONS.index(self.orientation)
-        self.orientation = self.ORIENTATIONS[(current_index - 1) % 4]
+        self._heading = TURN_LEFT[self._heading]
     
     # Turn robot 90 degrees right (clockwise)
     def turn_right(self):
         if self.is_lost:
             return
             
-        current_index = self.ORIENTATIONS.index(self.orientation)
-        self.orientation = self.ORIENTATIONS[(current_index + 1) % 4]
+        self._heading = TURN_RIGHT[self._heading]
+
+    # Rotate robot clockwise by a number of quarter turns in a single step
+    #
+    # Args:
+    #     quarter_turns: Clockwise quarter turns, negative values turn counterclockwise
+    def rotate(self, quarter_turns: int):
+        if self.is_lost:
+            return
+
+        self._heading = (self._heading + quarter_turns) & 3
     
     # Move robot forward one step in current direction
     def move_forward(self):
@@ -53,16 +116,16 @@ class Robot:
             return
         
         # Calculate new position
-        dx, dy = self.DIRECTION_VECTORS[self.orientation]
-        new_x = self.x + dx
-        new_y = self.y + dy
+        heading = self._heading
+        new_x = self.x + DELTA_X[heading]
+        new_y = self.y + DELTA_Y[heading]
+        grid = self.grid
         
         # Check if new position is off the grid
-        if not self.grid.is_valid_position(new_x, new_y):
-            # Check if current position has scent (ignore move if it does)
-            if not self.grid.has_scent(self.x, self.y):
-                # Robot is lost, add scent at current position
-                self.grid.add_scent(self.x, self.y)
+        if not (0 <= new_x <= grid.max_x and 0 <= new_y <= grid.max_y):
+            # Robot is lost unless the current position has scent, checking and adding the
+            # scent is one atomic claim so scent stores shared between processes stay correct
+            if grid.claim_scent(self.x, self.y):
                 self.is_lost = True
             # If there's scent, ignore the move instruction
         else:
@@ -70,17 +133,77 @@ class Robot:
             self.x = new_x
             self.y = new_y
     
+    # Move robot forward a number of steps, resolving the whole run at once
+    #
+    # Equivalent to calling move_forward() the same number of times. The distance to the
+    # edge is computed directly, so the robot either ends that many cells ahead or stops
+    # on the boundary cell, where only that single exit cell is checked for scent.
+    #
+    # Args:
+    #     steps: Number of forward steps
+    def advance(self, steps: int):
+        if self.is_lost or steps <= 0:
+            return
+
+        grid = self.grid
+        max_x = grid.max_x
+        max_y = grid.max_y
+        x = self.x
+        y = self.y
+
+        if not (0 <= x <= max_x and 0 <= y <= max_y):
+            # Robot started off the grid, the first step decides whether it re-enters
+            self.move_forward()
+            if self.is_lost or (self.x == x and self.y == y):
+                return  # Lost, or stuck on a scent where every further move is ignored
+            steps -= 1
+            x = self.x
+            y = self.y
+
+        # Number of cells between the robot and the edge it is facing
+        heading = self._heading
+        if heading == 0:
+            room = max_y - y
+        elif heading == 1:
+            room = max_x - x
+        elif heading == 2:
+            room = y
+        else:
+            room = x
+
+        if steps <= room:
+            self.x = x + DELTA_X[heading] * steps
+            self.y = y + DELTA_Y[heading] * steps
+            return
+
+        # Robot reaches the edge and the next step would take it off the grid
+        self.x = x = x + DELTA_X[heading] * room
+        self.y = y = y + DELTA_Y[heading] * room
+        if grid.claim_scent(x, y):
+            self.is_lost = True
+
+    # Move a number of steps in a direction relative to the heading, without turning
+    #
+    # Args:
+    #     steps: Number of steps
+    #     direction: Clockwise quarter turns from the heading, 0 ahead, 1 right, 2 back, 3 left
+    def move(self, steps: int, direction: int):
+        heading = self._heading
+        self._heading = (heading + direction) & 3
+        self.advance(steps)
+        self._heading = heading
+
     # Get current position as tuple
     # Returns:
     #     Tuple of (x, y, orientation)
     def get_position(self) -> tuple:
-        return (self.x, self.y, self.orientation)
+        return (self.x, self.y, self.ORIENTATIONS[self._heading])
     
     # String representation of robot's final position
     # Returns:
     #     String in format "x y orientation" or "x y orientation LOST"
     def __str__(self) -> str:
-        result = f"{self.x} {self.y} {self.orientation}"
+        result = f"{self.x} {self.y} {self.ORIENTATIONS[self._heading]}"
         if self.is_lost:
             result += " LOST"
         return result
@@ -88,4 +211,4 @@ class Robot:
     # Developer-friendly representation
     def __repr__(self) -> str:
         status = " (LOST)" if self.is_lost else ""
-        return f"Robot(x={self.x}, y={self.y}, orientation='{self.orientation}'{status})"
\ No newline at end of file
+        return f"Robot(x={self.x}, y={self.y}, orientation='{self.orientation}'{status})"
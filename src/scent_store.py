@@ -0,0 +1,457 @@
+#
+# Scent storage backends for the Mars grid.
+# Robots can only fall off the grid from a boundary cell, so scents normally sit on the perimeter.
+# The dense store keeps one bit per perimeter cell in a bytearray, the sparse store keeps a set of
+# positions for grids whose perimeter is too large to allocate up front. Both stores share the same
+# interface and can be exported to and imported from a compact binary blob.
+#
+
+import os
+
+# Largest perimeter (in cells) for which the dense bitmap store is used
+DENSE_PERIMETER_LIMIT = 1 << 20
+
+# Binary blob header and backend identifiers
+SCENT_BLOB_MAGIC = b'MSC1'
+_KIND_SPARSE = 0
+_KIND_DENSE = 1
+
+#
+# Number of perimeter cells for a grid with the given upper-right corner
+#
+def perimeter_size(max_x: int, max_y: int) -> int:
+    if max_y == 0:
+        return max_x + 1
+    return 2 * (max_x + 1) + 2 * max(max_y - 1, 0)
+
+#
+# Offset of a cell along the grid perimeter
+#
+# The bottom row comes first, then the top row, then the left and right columns
+# without their corner cells.
+#
+# Returns:
+#     Perimeter offset, or -1 if the cell is not on the perimeter
+def perimeter_offset(max_x: int, max_y: int, x: int, y: int) -> int:
+    if 0 <= x <= max_x:
+        if y == 0:
+            return x
+        if y == max_y:
+            return max_x + 1 + x
+        if 0 < y < max_y:
+            if x == 0:
+                return 2 * (max_x + 1) + y - 1
+            if x == max_x:
+                return 2 * (max_x + 1) + max_y - 1 + y - 1
+    return -1
+
+#
+# Choose a scent store for the given grid dimensions
+#
+def make_scent_store(max_x: int, max_y: int):
+    if scent_store_kind(max_x, max_y) == DenseScentStore.kind:
+        return DenseScentStore(max_x, max_y)
+    return SparseScentStore(max_x, max_y)
+
+#
+# Kind of scent store chosen for the given grid dimensions
+#
+def scent_store_kind(max_x: int, max_y: int) -> str:
+    if max_x >= 0 and max_y >= 0 and perimeter_size(max_x, max_y) <= DENSE_PERIMETER_LIMIT:
+        return DenseScentStore.kind
+    return SparseScentStore.kind
+
+#
+# Rebuild a scent store from a binary blob produced by to_bytes()
+#
+def scent_store_from_bytes(blob: bytes):
+    view = memoryview(blob)
+    if bytes(view[:4]) != SCENT_BLOB_MAGIC:
+        raise ValueError("Invalid scent blob: bad header.")
+    kind = view[4]
+    max_x, pos = _read_varint(view, 5)
+    max_y, pos = _read_varint(view, pos)
+
+    if kind == _KIND_DENSE:
+        store = DenseScentStore(max_x, max_y)
+        end = pos + len(store._bits)
+        store._bits[:] = view[pos:end]
+        store._count = sum(bin(byte).count('1') for byte in store._bits)
+        pos = end
+    elif kind == _KIND_SPARSE:
+        store = SparseScentStore(max_x, max_y)
+    else:
+        raise ValueError(f"Invalid scent blob: unknown store kind {kind}.")
+
+    count, pos = _read_varint(view, pos)
+    for _ in range(count):
+        x, pos = _read_varint(view, pos)
+        y, pos = _read_varint(view, pos)
+        store.add(x, y)
+    return store
+
+
+# Append a signed integer as a zigzag LEB128 varint
+def _write_varint(out: bytearray, value: int):
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+# Read a zigzag LEB128 varint, returning the value and the next position
+def _read_varint(view, pos: int) -> tuple:
+    value = 0
+    shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    value = value >> 1 if not value & 1 else -(value >> 1) - 1
+    return value, pos
+
+
+# Header of a memory-mapped scent file: magic, max_x, max_y, padded to a fixed size
+# mmap, struct and fcntl are only imported when a scent file is opened, so in-memory grids
+# do not pay for loading them at startup
+SCENT_FILE_MAGIC = b'MSCM'
+_FILE_HEADER_FORMAT = '<4sqq'
+_FILE_HEADER_SIZE = 32
+
+#
+# Shared behaviour of the scent stores
+#
+class _ScentStore:
+
+    __slots__ = ()
+
+    # Check if a (x, y) position has scent
+    def __contains__(self, position) -> bool:
+        x, y = position
+        return self.has(x, y)
+
+    # Compare scent contents with another store or a set of positions
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_ScentStore, set, frozenset)):
+            return set(self) == set(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self)})"
+
+
+#
+# Set-backed scent store for huge grids, memory grows only with the number of scents
+#
+class SparseScentStore(_ScentStore):
+
+    __slots__ = ('max_x', 'max_y', '_cells')
+    kind = 'sparse'
+
+    def __init__(self, max_x: int, max_y: int):
+        self.max_x = max_x
+        self.max_y = max_y
+        self._cells = set()
+
+    # Check if position has scent
+    def has(self, x: int, y: int) -> bool:
+        return (x, y) in self._cells
+
+    # Add scent at position
+    def add(self, x: int, y: int):
+        self._cells.add((x, y))
+
+    # Add scent at position unless it is already there
+    #
+    # Returns:
+    #     True if the scent was added by this call, False if it was already present
+    def test_and_set(self, x: int, y: int) -> bool:
+        cells = self._cells
+        if (x, y) in cells:
+            return False
+        cells.add((x, y))
+        return True
+
+    # Remove all scents
+    def clear(self):
+        self._cells.clear()
+
+    # Remove all scents and take on new grid dimensions, keeping the set
+    def reset(self, max_x: int, max_y: int):
+        self.max_x = max_x
+        self.max_y = max_y
+        self._cells.clear()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    # Export scent state as a compact binary blob
+    def to_bytes(self) -> bytes:
+        out = bytearray(SCENT_BLOB_MAGIC)
+        out.append(_KIND_SPARSE)
+        _write_varint(out, self.max_x)
+        _write_varint(out, self.max_y)
+        _write_varint(out, len(self._cells))
+        for x, y in sorted(self._cells):
+            _write_varint(out, x)
+            _write_varint(out, y)
+        return bytes(out)
+
+
+#
+# Bitmap-backed scent store indexed by perimeter offset
+#
+# Scents away from the perimeter (e.g. added directly, or by a robot that started off the
+# grid) are kept in a small overflow set so the store accepts any position.
+#
+class DenseScentStore(_ScentStore):
+
+    __slots__ = ('max_x', 'max_y', '_bits', '_count', '_overflow')
+    kind = 'dense'
+
+    def __init__(self, max_x: int, max_y: int):
+        self.max_x = max_x
+        self.max_y = max_y
+        self._bits = bytearray((perimeter_size(max_x, max_y) + 7) >> 3)
+        self._count = 0
+        self._overflow = set()
+
+    # Check if position has scent
+    def has(self, x: int, y: int) -> bool:
+        offset = perimeter_offset(self.max_x, self.max_y, x, y)
+        if offset < 0:
+            return (x, y) in self._overflow
+        return (self._bits[offset >> 3] >> (offset & 7)) & 1 == 1
+
+    # Add scent at position
+    def add(self, x: int, y: int):
+        self.test_and_set(x, y)
+
+    # Add scent at position unless it is already there
+    #
+    # Returns:
+    #     True if the scent was added by this call, False if it was already present
+    def test_and_set(self, x: int, y: int) -> bool:
+        offset = perimeter_offset(self.max_x, self.max_y, x, y)
+        if offset < 0:
+            if (x, y) in self._overflow:
+                return False
+            self._overflow.add((x, y))
+            return True
+        mask = 1 << (offset & 7)
+        if self._bits[offset >> 3] & mask:
+            return False
+        self._bits[offset >> 3] |= mask
+        self._count += 1
+        return True
+
+    # Remove all scents
+    def clear(self):
+        self._bits[:] = bytes(len(self._bits))
+        self._count = 0
+        self._overflow.clear()
+
+    # Remove all scents and take on new grid dimensions, resizing the bitmap in place
+    def reset(self, max_x: int, max_y: int):
+        bits = self._bits
+        if self._count:
+            bits[:] = bytes(len(bits))
+        size = (perimeter_size(max_x, max_y) + 7) >> 3
+        if size < len(bits):
+            del bits[size:]
+        elif size > len(bits):
+            bits.extend(bytes(size - len(bits)))
+        self.max_x = max_x
+        self.max_y = max_y
+        self._count = 0
+        self._overflow.clear()
+
+    def __len__(self) -> int:
+        return self._count + len(self._overflow)
+
+    def __iter__(self):
+        max_x, max_y = self.max_x, self.max_y
+        for index, byte in enumerate(self._bits):
+            while byte:
+                low = byte & -byte
+                offset = (index << 3) + low.bit_length() - 1
+                byte ^= low
+                yield _perimeter_cell(max_x, max_y, offset)
+        yield from self._overflow
+
+    # Export scent state as a compact binary blob
+    def to_bytes(self) -> bytes:
+        out = bytearray(SCENT_BLOB_MAGIC)
+        out.append(_KIND_DENSE)
+        _write_varint(out, self.max_x)
+        _write_varint(out, self.max_y)
+        out += self._bits
+        _write_varint(out, len(self._overflow))
+        for x, y in sorted(self._overflow):
+            _write_varint(out, x)
+            _write_varint(out, y)
+        return bytes(out)
+
+
+#
+# File-backed scent store, memory-mapped with one bit per perimeter cell
+#
+# Several processes can open the same file and share scents. Bits only ever go from unset to set,
+# so reads need no locking, and test_and_set() takes a byte range lock so only one process can
+# claim a cell. Opening an existing file maps it as is, without replaying any scents. Scents away
+# from the perimeter are kept in a process-local overflow set and are not shared.
+#
+class MappedScentStore(DenseScentStore):
+
+    __slots__ = ('path', '_file', '_map')
+    kind = 'mapped'
+
+    # Open or create a scent file
+    #
+    # Args:
+    #     path: Scent file location
+    #     max_x: Maximum x coordinate of the grid
+    #     max_y: Maximum y coordinate of the grid
+    def __init__(self, path, max_x: int, max_y: int):
+        import mmap
+        import struct
+
+        header = struct.Struct(_FILE_HEADER_FORMAT)
+        self.max_x = max_x
+        self.max_y = max_y
+        self.path = path
+        self._count = 0
+        self._overflow = set()
+
+        size = _FILE_HEADER_SIZE + ((perimeter_size(max_x, max_y) + 7) >> 3)
+        self._file = open(path, 'a+b')
+        error = None
+        with self._locked(0):
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() == 0:
+                self._file.write(header.pack(SCENT_FILE_MAGIC, max_x, max_y).ljust(size, b'\0'))
+                self._file.flush()
+            else:
+                self._file.seek(0)
+                magic, file_max_x, file_max_y = header.unpack(self._file.read(header.size))
+                if magic != SCENT_FILE_MAGIC:
+                    error = f"'{path}' is not a scent file."
+                elif (file_max_x, file_max_y) != (max_x, max_y):
+                    error = f"Scent file '{path}' belongs to a {file_max_x}x{file_max_y} grid."
+        if error is not None:
+            self._file.close()  # Only once the lock is released
+            raise ValueError(error)
+
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._bits = memoryview(self._map)[_FILE_HEADER_SIZE:]
+
+    # Add scent at position unless it is already there, atomically across processes
+    #
+    # Returns:
+    #     True if the scent was added by this call, False if it was already present
+    def test_and_set(self, x: int, y: int) -> bool:
+        offset = perimeter_offset(self.max_x, self.max_y, x, y)
+        if offset < 0:
+            return DenseScentStore.test_and_set(self, x, y)
+        index = offset >> 3
+        mask = 1 << (offset & 7)
+        if self._bits[index] & mask:
+            return False
+        with self._locked(_FILE_HEADER_SIZE + index):
+            if self._bits[index] & mask:
+                return False  # Another process claimed the cell first
+            self._bits[index] |= mask
+            return True
+
+    # Remove all scents, for every process sharing the file
+    def clear(self):
+        with self._locked(0):
+            self._bits[:] = bytes(len(self._bits))
+        self._overflow.clear()
+
+    # Remove all scents, the file is sized for one grid so the dimensions cannot change
+    def reset(self, max_x: int, max_y: int):
+        if (max_x, max_y) != (self.max_x, self.max_y):
+            raise ValueError(f"Scent file '{self.path}' belongs to a {self.max_x}x{self.max_y} grid.")
+        self.clear()
+
+    def __len__(self) -> int:
+        return bin(int.from_bytes(self._bits, 'little')).count('1') + len(self._overflow)
+
+    # Flush and unmap the scent file
+    def close(self):
+        if self._map is not None:
+            self._bits.release()
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Hold an exclusive lock on one byte of the scent file
+    def _locked(self, position: int):
+        return _ByteLock(self._file.fileno(), position)
+
+#
+# Context manager holding an exclusive lock on one byte of a file, a no-op without fcntl
+#
+class _ByteLock:
+
+    __slots__ = ('fileno', 'position')
+
+    def __init__(self, fileno: int, position: int):
+        self.fileno = fileno
+        self.position = position
+
+    def __enter__(self):
+        fcntl = _fcntl()
+        if fcntl is not None:
+            fcntl.lockf(self.fileno, fcntl.LOCK_EX, 1, self.position, os.SEEK_SET)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl = _fcntl()
+        if fcntl is not None:
+            fcntl.lockf(self.fileno, fcntl.LOCK_UN, 1, self.position, os.SEEK_SET)
+
+
+# fcntl module, imported on first use, None where byte range locks are not available
+def _fcntl():
+    global _fcntl_module
+    if _fcntl_module is False:
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover - byte range locks are only available on POSIX systems
+            fcntl = None
+        _fcntl_module = fcntl
+    return _fcntl_module
+
+
+_fcntl_module = False  # Not imported yet
+
+
+# Position of the cell at a perimeter offset, inverse of perimeter_offset()
+def _perimeter_cell(max_x: int, max_y: int, offset: int) -> tuple:
+    width = max_x + 1
+    if offset < width:
+        return (offset, 0)
+    if max_y > 0 and offset < 2 * width:
+        return (offset - width, max_y)
+    offset -= 2 * width
+    if offset < max_y - 1:
+        return (0, offset + 1)
+    return (max_x, offset - (max_y - 1) + 1)
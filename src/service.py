@@ -0,0 +1,349 @@
+#
+# Long-lived asyncio TCP service for the Martian Robot Challenge.
+# Avoids paying interpreter startup per job: missions are sent over a socket and simulated by a
+# process that keeps its grids in memory, so scent persists between requests for the same grid.
+#
+# Protocol: each request is one line of JSON and gets one line of JSON back.
+#   {"id": 1, "grid_id": "alpha", "grid": [5, 3], "robots": [[1, 1, "E", "RFRFRFRF"]]}
+#   {"id": 2, "text": "5 3\n1 1 E\nRFRFRFRF\n"}
+# Responses carry the request id with either "results" and "warnings", or an "error" message.
+# Text requests also get "output", the warning and result lines interleaved as main.py prints them.
+# Requests naming a grid_id reuse that grid (and its scents); "grid" is only needed to create it.
+# At most max_grids named grids are kept, the least recently used one is dropped to make room, and
+#   {"id": 3, "delete_grid": "alpha"}
+# drops a grid straight away, answered with "deleted": true or false.
+# A connection whose first line is not JSON is read as a plain text mission until EOF and gets
+# the text output back, as printed by main.py.
+#
+# Concurrent requests are micro-batched: the batcher waits a short window after the first
+# request and then simulates everything queued in one pass, in arrival order. Batches run on a
+# single worker thread, so the event loop keeps accepting connections while one is simulated.
+#
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from main import check_grid_limits, check_instructions, stream_robots
+from validation import Limits, ORIENTATIONS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+
+# Seconds to wait for more requests after the first one of a batch arrives
+DEFAULT_BATCH_WINDOW = 0.001
+
+# Maximum number of requests simulated in one batch
+DEFAULT_MAX_BATCH = 256
+
+# Maximum number of named grids kept in memory
+DEFAULT_MAX_GRIDS = 1024
+
+#
+# Mission service holding grids in memory and batching requests
+#
+class MissionService:
+
+    # Initialize the service
+    #
+    # Args:
+    #     batch_window: Seconds to wait for more requests before running a batch
+    #     max_batch: Maximum number of requests per batch
+    #     limits: validation.Limits to enforce, the mission constraints by default
+    #     max_grids: Maximum number of named grids kept, the least recently used is dropped first
+    def __init__(self, batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH,
+                 limits: Limits = None, max_grids: int = DEFAULT_MAX_GRIDS):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.limits = limits
+        self.max_grids = max_grids
+        self.grids = OrderedDict()  # Named grids kept between requests, least recently used first
+        self.batches = 0
+        self.requests = 0
+        self.command_processor = CommandProcessor()
+        self._robot = Robot(0, 0, 'N', None)  # Reset for every robot simulated
+        self._scratch_grid = None  # Reused by requests without a grid_id
+        self._queue = None
+        self._batcher = None
+        self._executor = None
+        self._server = None
+
+    # Start listening, use port 0 to pick a free port
+    #
+    # Returns:
+    #     Port the service is listening on
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> int:
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)  # One thread keeps batches in order
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    # Serve until cancelled
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    # Stop listening and stop the batcher
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=False)
+
+    # Queue a request for the next batch
+    #
+    # Args:
+    #     request: Decoded request dictionary
+    #
+    # Returns:
+    #     Response dictionary
+    async def submit(self, request: dict) -> dict:
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    # Collect queued requests into batches and simulate them in arrival order
+    async def _run_batches(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            responses = await loop.run_in_executor(
+                self._executor, self._handle_batch, [request for request, _ in batch])
+            for (_, future), response in zip(batch, responses):
+                if not future.cancelled():
+                    future.set_result(response)
+
+    # Simulate a batch of requests in arrival order, on the worker thread
+    def _handle_batch(self, requests: list) -> list:
+        responses = []
+        for request in requests:
+            try:
+                response = self.handle_request(request)
+            except Exception as e:
+                # A single bad request must never stop the batcher
+                response = {'id': request.get('id') if isinstance(request, dict) else None,
+                            'error': f"Internal error: {e}"}
+            responses.append(response)
+        return responses
+
+    # Simulate a single request
+    #
+    # Args:
+    #     request: Decoded request dictionary
+    #
+    # Returns:
+    #     Response dictionary with results and warnings, or an error message
+    def handle_request(self, request: dict) -> dict:
+        self.requests += 1
+        response = {'id': request.get('id')} if isinstance(request, dict) else {'id': None}
+        if isinstance(request, dict) and 'delete_grid' in request:
+            try:
+                response['deleted'] = self.grids.pop(request['delete_grid'], None) is not None
+            except TypeError:
+                response['error'] = "Grid ids must be strings or numbers."
+            return response
+        try:
+            results, warnings, output = self._simulate(request)
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            response['error'] = str(e)
+        else:
+            response['results'] = results
+            response['warnings'] = warnings
+            if 'text' in request:
+                response['output'] = output
+        return response
+
+    # Resolve the grid and robots for a request and run them
+    def _simulate(self, request: dict) -> tuple:
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object.")
+
+        dimensions = request.get('grid')
+        if 'text' in request:
+            if not isinstance(request['text'], str):
+                raise ValueError("Request text must be a string.")
+            lines = iter(request['text'].split('\n'))
+            try:
+                dimensions = [int(value) for value in next(lines, '').split()]
+            except ValueError:
+                dimensions = None
+            if dimensions is None or len(dimensions) != 2:
+                raise ValueError("Invalid grid dimensions. Please enter two integers separated by a space.")
+            # Consume every robot so the whole request is validated before anything is simulated
+            robots = list(stream_robots(lines, self.limits))
+        else:
+            robots = [self._check_robot(robot) for robot in request.get('robots', [])]
+
+        # Compiling rejects repetition groups too long to run, and caches the programs for the run
+        for robot in robots:
+            self.command_processor.compile(robot[3])
+
+        grid = self._get_grid(request.get('grid_id'), dimensions)
+
+        warnings = []
+        results = []
+        output = []
+
+        def warn(message):
+            warnings.append(message)
+            output.append(message)
+
+        command_processor = self.command_processor
+        command_processor.warn = warn
+        robot = self._robot
+        robot.grid = grid
+        for x, y, orientation, instructions in robots:
+            robot.reset(x, y, orientation)
+            command_processor.execute_commands(robot, instructions)
+            results.append(str(robot))
+            output.append(results[-1])
+        return results, warnings, output
+
+    # Validate one JSON robot so a rejected request never touches a persistent grid
+    #
+    # Returns:
+    #     Tuple of (x, y, orientation, instructions)
+    #
+    # Raises:
+    #     ValueError: If the robot is malformed or breaks the instruction limit
+    def _check_robot(self, robot) -> tuple:
+        if not isinstance(robot, (list, tuple)) or len(robot) != 4:
+            raise ValueError(f"Invalid robot {robot!r}, expected [x, y, orientation, instructions].")
+        x, y, orientation, instructions = robot
+        if isinstance(x, bool) or isinstance(y, bool) or not isinstance(x, int) or not isinstance(y, int):
+            raise ValueError(f"Invalid robot position {x!r} {y!r}, coordinates must be integers.")
+        if orientation not in ORIENTATIONS:
+            raise ValueError(f"Invalid orientation {orientation!r}. Must be one of N, E, S, W.")
+        if not isinstance(instructions, str):
+            raise ValueError("Robot instructions must be a string.")
+        check_instructions(instructions, self.limits)
+        return x, y, orientation, instructions
+
+    # Look up a named grid, or create one from the given dimensions
+    def _get_grid(self, grid_id, dimensions):
+        if dimensions is not None:
+            if (not isinstance(dimensions, list) or len(dimensions) != 2
+                    or not all(type(value) is int for value in dimensions)):
+                raise ValueError("Grid dimensions must be a list of two integers, e.g. [5, 3].")
+            max_x, max_y = dimensions
+            check_grid_limits(max_x, max_y, self.limits)
+
+        if grid_id is None:
+            if dimensions is None:
+                raise ValueError("Grid dimensions are required for requests without a grid_id.")
+            # Anonymous grids only live for one request, so one grid is reset and reused
+            if self._scratch_grid is None:
+                self._scratch_grid = MarsGrid(max_x, max_y)
+                return self._scratch_grid
+            return self._scratch_grid.reset(max_x, max_y)
+
+        grid = self.grids.get(grid_id)
+        if grid is None:
+            if dimensions is None:
+                raise ValueError(f"Unknown grid '{grid_id}', grid dimensions are required.")
+            grid = MarsGrid(max_x, max_y)
+            self.grids[grid_id] = grid
+            if self.max_grids is not None and len(self.grids) > self.max_grids:
+                self.grids.popitem(last=False)
+        elif dimensions is not None and (max_x, max_y) != grid.get_dimensions():
+            raise ValueError(f"Grid '{grid_id}' already exists with dimensions {grid.get_dimensions()}.")
+        else:
+            self.grids.move_to_end(grid_id)
+        return grid
+
+    # Serve one client connection in JSON lines or plain text mode
+    async def _handle_connection(self, reader, writer):
+        try:
+            first_line = await reader.readline()
+            if first_line.lstrip().startswith(b'{'):
+                await self._serve_json_lines(first_line, reader, writer)
+            elif first_line:
+                text = (first_line + await reader.read()).decode()
+                response = await self.submit({'text': text})
+                if 'error' in response:
+                    output = [f"Error: {response['error']}"]
+                else:
+                    output = response['output']
+                writer.write(''.join(line + '\n' for line in output).encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    # Answer JSON line requests as they complete, tagged with their request id
+    async def _serve_json_lines(self, line, reader, writer):
+        pending = set()
+
+        async def answer(raw):
+            try:
+                request = json.loads(raw)
+            except ValueError as e:
+                response = {'id': None, 'error': f"Invalid JSON: {e}"}
+            else:
+                response = await self.submit(request)
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        while line:
+            if line.strip():
+                task = asyncio.ensure_future(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            line = await reader.readline()
+        if pending:
+            await asyncio.gather(*pending)
+
+
+#
+# Run the service from the command line
+#
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Martian Robot Challenge mission service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW,
+                        help="Seconds to wait for more requests before running a batch")
+    parser.add_argument("--max-grids", type=int, default=DEFAULT_MAX_GRIDS,
+                        help="Named grids kept in memory, the least recently used is dropped first")
+    parser.add_argument("--large-grid", action="store_true",
+                        help="Accept grids of any size, keeping the instruction limit")
+    args = parser.parse_args(argv)
+
+    # Limits come from the environment, like the command line simulator
+    limits = Limits.from_env()
+    if args.large_grid:
+        limits = Limits(None, limits.max_instructions)
+
+    async def run():
+        service = MissionService(batch_window=args.batch_window, limits=limits, max_grids=args.max_grids)
+        port = await service.start(args.host, args.port)
+        print(f"Mission service listening on {args.host}:{port}")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#
+# Speculative parallel engine for a single grid.
+# Robots on one grid only depend on each other through scent. Chunks of robots are first simulated
+# optimistically against a snapshot of the scent state (in worker processes), then committed in
+# robot order on the real grid. A robot only consults scent when it tries to leave the grid: scented
+# cells in the snapshot stay scented, so the only speculation that can go wrong is a robot that was
+# lost on a cell an earlier robot has scented since the snapshot. Those robots are re-simulated on
+# the committed grid, so the results match the sequential engine exactly.
+#
+import multiprocessing
+from collections import deque
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from mission_runner import chunked
+
+# Number of robots simulated by a worker in one task
+DEFAULT_CHUNK_SIZE = 1024
+
+#
+# Grid used for speculation, scents are read from the snapshot but never added
+#
+class _SnapshotGrid(MarsGrid):
+
+    # Lost robots leave no scent during speculation, scents are added at commit time
+    def add_scent(self, x: int, y: int):
+        pass
+
+    # A robot is lost wherever the snapshot has no scent, without claiming the cell
+    def claim_scent(self, x: int, y: int) -> bool:
+        return not self.has_scent(x, y)
+
+
+# Simulate a chunk of robots against a scent snapshot
+#
+# Returns:
+#     List of (x, y, orientation, is_lost, warnings) per robot
+def _speculate_chunk(max_x: int, max_y: int, scent_blob: bytes, robots) -> list:
+    grid = _SnapshotGrid(max_x, max_y)
+    grid.import_scents(scent_blob)
+    outcomes = []
+    command_processor = CommandProcessor()
+    robot = Robot(0, 0, 'N', grid)
+    for x, y, orientation, instructions in robots:
+        warnings = []
+        command_processor.warn = warnings.append
+        robot.reset(x, y, orientation)
+        command_processor.execute_commands(robot, instructions)
+        outcomes.append((robot.x, robot.y, robot.orientation, robot.is_lost, warnings))
+    return outcomes
+
+#
+# Simulate robots on one grid in parallel with in-order commit and conflict re-simulation
+#
+# Args:
+#     grid: MarsGrid instance, scents left by lost robots are added to it
+#     robots: Iterable of (x, y, orientation, instructions) tuples
+#     workers: Number of worker processes (1 speculates in the current process)
+#     chunk_size: Number of robots per speculative task
+#     warn: Function called with each warning message, in robot order
+#
+# Returns:
+#     Tuple of (results, resimulations) where results are formatted like str(Robot)
+def simulate_speculative(grid, robots, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         warn=print) -> tuple:
+    results = []
+    resimulations = 0
+    command_processor = CommandProcessor(warn=warn)
+
+    def commit(chunk, outcomes):
+        nonlocal resimulations
+        for robot_data, (x, y, orientation, is_lost, warnings) in zip(chunk, outcomes):
+            if is_lost and grid.has_scent(x, y):
+                # An earlier robot scented this exit after the snapshot was taken
+                robot = Robot(robot_data[0], robot_data[1], robot_data[2], grid)
+                command_processor.execute_commands(robot, robot_data[3])
+                results.append(str(robot))
+                resimulations += 1
+                continue
+
+            if is_lost:
+                grid.add_scent(x, y)
+            for message in warnings:
+                warn(message)
+            results.append(f"{x} {y} {orientation} LOST" if is_lost else f"{x} {y} {orientation}")
+
+    if workers <= 1:
+        for chunk in chunked(robots, chunk_size):
+            commit(chunk, _speculate_chunk(grid.max_x, grid.max_y, grid.export_scents(), chunk))
+        return results, resimulations
+
+    max_in_flight = workers * 2
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+        for chunk in chunked(robots, chunk_size):
+            # Each chunk speculates against the scent state committed so far
+            args = (grid.max_x, grid.max_y, grid.export_scents(), chunk)
+            pending.append((chunk, pool.apply_async(_speculate_chunk, args)))
+            if len(pending) >= max_in_flight:
+                chunk, outcome = pending.popleft()
+                commit(chunk, outcome.get())
+        while pending:
+            chunk, outcome = pending.popleft()
+            commit(chunk, outcome.get())
+
+    return results, resimulations
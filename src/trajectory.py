@@ -0,0 +1,239 @@
+#
+# Trajectory recording and replay for debugging robots.
+# A robot's trajectory is sampled every `stride` instructions into a preallocated, array-backed ring
+# buffer, so memory per robot is fixed no matter how long its instructions are. Any step can be
+# recovered on demand by replaying from the nearest earlier sample.
+#
+# Replay needs no copy of the scent state: a robot only consults scent when it tries to leave the
+# grid, and every such attempt before it was lost must have met a scent (otherwise it would have
+# been lost there). So a replay treats every exit as scented except the cell the robot was lost
+# from, where the first attempt to leave is the one that lost it.
+#
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from robot import Robot
+from command_processor import CommandProcessor
+
+# Default number of samples kept per robot
+DEFAULT_CAPACITY = 64
+
+# Default number of instructions between samples
+DEFAULT_STRIDE = 16
+
+#
+# Fixed-size ring buffer of (step, x, y, heading) samples backed by typed arrays
+#
+class RingBuffer:
+
+    __slots__ = ('capacity', 'steps', 'xs', 'ys', 'headings', '_start', '_size')
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1.")
+        self.capacity = capacity
+        self.steps = array('q', bytes(8 * capacity))
+        self.xs = array('q', bytes(8 * capacity))
+        self.ys = array('q', bytes(8 * capacity))
+        self.headings = array('b', bytes(capacity))
+        self._start = 0
+        self._size = 0
+
+    # Append a sample, overwriting the oldest one when full
+    def append(self, step: int, x: int, y: int, heading: int):
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self.steps[index] = step
+        self.xs[index] = x
+        self.ys[index] = y
+        self.headings[index] = heading
+
+    # Sample at a chronological position (0 is the oldest kept sample)
+    def __getitem__(self, position: int) -> tuple:
+        if not 0 <= position < self._size:
+            raise IndexError("Ring buffer position out of range.")
+        index = (self._start + position) % self.capacity
+        return self.steps[index], self.xs[index], self.ys[index], self.headings[index]
+
+    def __len__(self) -> int:
+        return self._size
+
+    # Latest kept sample taken at or before a step, or None
+    def floor(self, step: int):
+        size = self._size
+        steps = [self.steps[(self._start + position) % self.capacity] for position in range(size)]
+        position = bisect_right(steps, step) - 1
+        return self[position] if position >= 0 else None
+
+#
+# Grid used for replay: every exit is scented except the cell the robot was lost from
+#
+class _ReplayGrid:
+
+    __slots__ = ('max_x', 'max_y', 'lost_cell')
+
+    def __init__(self, max_x: int, max_y: int, lost_cell):
+        self.max_x = max_x
+        self.max_y = max_y
+        self.lost_cell = lost_cell
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        return 0 <= x <= self.max_x and 0 <= y <= self.max_y
+
+    def has_scent(self, x: int, y: int) -> bool:
+        return (x, y) != self.lost_cell
+
+    def add_scent(self, x: int, y: int):
+        pass
+
+    def claim_scent(self, x: int, y: int) -> bool:
+        return (x, y) == self.lost_cell
+
+#
+# Recorded trajectory of one robot
+#
+class Trajectory:
+
+    __slots__ = ('index', 'start', 'instructions', 'samples', 'final', 'lost_cell', '_grid', '_processor')
+
+    def __init__(self, index: int, robot, instructions: str, capacity: int, processor):
+        self.index = index
+        self.start = (robot.x, robot.y, robot.heading)
+        self.instructions = instructions
+        self.samples = RingBuffer(capacity)
+        self.final = None
+        self.lost_cell = None
+        self._grid = (robot.grid.max_x, robot.grid.max_y)
+        self._processor = processor
+
+    # Number of instruction steps in the trajectory
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    # State of the robot after a number of instructions
+    #
+    # Args:
+    #     step: Number of instructions executed, clamped to the trajectory length
+    #
+    # Returns:
+    #     Tuple of (x, y, orientation, is_lost)
+    def state_at(self, step: int) -> tuple:
+        step = max(0, min(step, len(self.instructions)))
+        sample = self.samples.floor(step)
+        if sample is None:
+            sample = (0,) + self.start
+
+        sample_step, x, y, heading = sample
+        robot = Robot(x, y, Robot.ORIENTATIONS[heading], _ReplayGrid(*self._grid, self.lost_cell))
+        processor = self._processor
+        warn = processor.warn
+        processor.warn = _ignore
+        try:
+            processor.execute_commands(robot, self.instructions[sample_step:step])
+        finally:
+            processor.warn = warn
+        return robot.x, robot.y, robot.orientation, robot.is_lost
+
+    # Replay every step of the trajectory, including the start state
+    #
+    # Yields:
+    #     Tuple of (step, x, y, orientation, is_lost)
+    def replay(self):
+        x, y, heading = self.start
+        robot = Robot(x, y, Robot.ORIENTATIONS[heading], _ReplayGrid(*self._grid, self.lost_cell))
+        yield (0, robot.x, robot.y, robot.orientation, False)
+        processor = self._processor
+        warn = processor.warn
+        processor.warn = _ignore
+        try:
+            for step, instruction in enumerate(self.instructions, 1):
+                processor.execute_commands(robot, instruction)
+                yield (step, robot.x, robot.y, robot.orientation, robot.is_lost)
+                if robot.is_lost:
+                    return
+        finally:
+            processor.warn = warn
+
+
+# Discard replay warnings, they were already reported during the real run
+def _ignore(message):
+    pass
+
+#
+# Records trajectories while executing robots
+#
+class TrajectoryRecorder:
+
+    # Initialize the recorder
+    #
+    # Args:
+    #     processor: CommandProcessor used to execute and replay robots
+    #     capacity: Samples kept per robot, older samples are overwritten
+    #     stride: Number of instructions between samples
+    #     sample_every: Record one robot in this many (1 records every robot)
+    #     max_robots: Maximum number of trajectories kept, the oldest are dropped (None keeps all)
+    def __init__(self, processor=None, capacity: int = DEFAULT_CAPACITY, stride: int = DEFAULT_STRIDE,
+                 sample_every: int = 1, max_robots=None):
+        if stride < 1:
+            raise ValueError("Trajectory stride must be at least 1.")
+        self.processor = processor if processor is not None else CommandProcessor()
+        self.capacity = capacity
+        self.stride = stride
+        self.sample_every = max(sample_every, 1)
+        self.max_robots = max_robots
+        self.trajectories = OrderedDict()
+        self.robots = 0
+
+    # Execute a robot's instructions, recording its trajectory if it is sampled
+    #
+    # Args:
+    #     robot: Robot instance to command
+    #     instructions: String of command characters
+    #
+    # Returns:
+    #     Robot index used to look up its trajectory
+    #
+    # Raises:
+    #     ValueError: If a sampled robot's instructions expand past the processor's max_expanded
+    def execute(self, robot, instructions: str) -> int:
+        index = self.robots
+        self.robots += 1
+        if index % self.sample_every:
+            self.processor.execute_commands(robot, instructions)
+            return index
+
+        # Steps count plain instructions, so repetition groups are recorded expanded
+        instructions = self.processor.expand(instructions)
+        trajectory = Trajectory(index, robot, instructions, self.capacity, self.processor)
+        stride = self.stride
+        execute_commands = self.processor.execute_commands
+        append = trajectory.samples.append
+        for start in range(0, len(instructions), stride):
+            execute_commands(robot, instructions[start:start + stride])
+            if robot.is_lost:
+                trajectory.lost_cell = (robot.x, robot.y)
+                break
+            append(min(start + stride, len(instructions)), robot.x, robot.y, robot.heading)
+        trajectory.final = (robot.x, robot.y, robot.orientation, robot.is_lost)
+
+        trajectories = self.trajectories
+        trajectories[index] = trajectory
+        if self.max_robots is not None and len(trajectories) > self.max_robots:
+            trajectories.popitem(last=False)
+        return index
+
+    # Recorded trajectory of a robot
+    #
+    # Raises:
+    #     KeyError: If the robot was not sampled or its trajectory was dropped
+    def trajectory(self, index: int) -> Trajectory:
+        return self.trajectories[index]
+
+    # State of a robot after a number of instructions
+    def seek(self, index: int, step: int) -> tuple:
+        return self.trajectories[index].state_at(step)
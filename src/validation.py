@@ -0,0 +1,242 @@
+#
+# Mission input validation with configurable limits
+# Limits replace the constants hard-coded in the mission constraints, and every error carries the
+# number of the input line it was found on. A Validator checks robots as they are parsed, so a
+# mission is validated in the same single pass that streams it and never has to be held in memory.
+#
+# Two modes are offered: fail-fast raises at the first error, collect-all records every error,
+# skips the robots that caused them and raises them together once the input is exhausted.
+#
+# Limits can also come from the environment. Lifting the coordinate limit gives the large-grid
+# mode: coordinates are plain Python integers of any size, and nothing allocated per mission grows
+# with the grid area.
+#
+
+# Default limits from the mission constraints
+DEFAULT_MAX_COORDINATE = 50
+DEFAULT_MAX_INSTRUCTIONS = 100
+
+# Environment variables overriding the default limits, "none" disables a limit
+MAX_COORDINATE_VARIABLE = 'MARS_MAX_COORDINATE'
+MAX_INSTRUCTIONS_VARIABLE = 'MARS_MAX_INSTRUCTIONS'
+
+# Valid robot orientations
+ORIENTATIONS = ('N', 'E', 'S', 'W')
+
+#
+# Validation error with the line of input it refers to
+#
+class ValidationError(ValueError):
+
+    # Args:
+    #     message: Description of the problem
+    #     line: Input line number (1 is the grid line), None if not known
+    #     errors: Individual errors when several were collected, defaults to this error alone
+    def __init__(self, message: str, line: int = None, errors: list = None):
+        super().__init__(message if line is None else f"Line {line}: {message}")
+        self.message = message
+        self.line = line
+        self.errors = [self] if errors is None else errors
+
+#
+# Configurable mission limits, None disables a limit
+#
+class Limits:
+
+    # Args:
+    #     max_coordinate: Largest grid dimension allowed for either axis
+    #     max_instructions: Longest robot instruction string allowed
+    def __init__(self, max_coordinate: int = DEFAULT_MAX_COORDINATE,
+                 max_instructions: int = DEFAULT_MAX_INSTRUCTIONS):
+        self.max_coordinate = max_coordinate
+        self.max_instructions = max_instructions
+
+    # Validate grid dimensions
+    #
+    # Raises:
+    #     ValidationError: If either dimension is negative or exceeds the limit
+    def check_grid(self, max_x: int, max_y: int, line: int = None):
+        if max_x < 0 or max_y < 0:
+            raise ValidationError("Grid dimensions must not be negative.", line)
+        if self.max_coordinate is not None and (max_x > self.max_coordinate or max_y > self.max_coordinate):
+            raise ValidationError(f"Grid dimensions must not exceed {self.max_coordinate} for either axis.", line)
+
+    # Validate a robot instruction string
+    #
+    # Raises:
+    #     ValidationError: If the string is longer than the limit
+    def check_instructions(self, instructions: str, line: int = None):
+        if self.max_instructions is not None and len(instructions) > self.max_instructions:
+            raise ValidationError(f"Robot instruction string length ({len(instructions)}) exceeds maximum "
+                                  f"of {self.max_instructions} characters.", line)
+
+    # Limits configured through the environment, defaulting to the mission constraints
+    #
+    # Args:
+    #     environ: Mapping of environment variables, os.environ by default
+    #
+    # Raises:
+    #     ValueError: If a variable is neither a non-negative integer nor "none"
+    @classmethod
+    def from_env(cls, environ=None):
+        if environ is None:
+            import os
+            environ = os.environ
+        return cls(parse_limit(environ.get(MAX_COORDINATE_VARIABLE, DEFAULT_MAX_COORDINATE), MAX_COORDINATE_VARIABLE),
+                   parse_limit(environ.get(MAX_INSTRUCTIONS_VARIABLE, DEFAULT_MAX_INSTRUCTIONS), MAX_INSTRUCTIONS_VARIABLE))
+
+    def __repr__(self) -> str:
+        return f"Limits(max_coordinate={self.max_coordinate}, max_instructions={self.max_instructions})"
+
+
+# Limits of the original mission constraints
+DEFAULT_LIMITS = Limits()
+
+# No limits at all
+UNLIMITED = Limits(None, None)
+
+# Large-grid mode: grids of any size, instruction strings still bounded
+LARGE_GRID_LIMITS = Limits(None, DEFAULT_MAX_INSTRUCTIONS)
+
+#
+# Parse a configured limit
+#
+# Args:
+#     value: Integer, or text holding a non-negative integer or "none"
+#     name: Name of the setting, used in error messages
+#
+# Returns:
+#     The limit, or None when the limit is disabled
+#
+# Raises:
+#     ValueError: If the value is not a non-negative integer or "none"
+def parse_limit(value, name: str = 'limit'):
+    if isinstance(value, str):
+        if value.strip().lower() == 'none':
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name} '{value}'. Must be a non-negative integer or 'none'.")
+    if value is not None and value < 0:
+        raise ValueError(f"Invalid {name} '{value}'. Must be a non-negative integer or 'none'.")
+    return value
+
+#
+# Single-pass validator for mission input
+#
+class Validator:
+
+    # Args:
+    #     limits: Limits to enforce, the mission constraints by default
+    #     collect: Collect every error instead of raising at the first one
+    def __init__(self, limits: Limits = None, collect: bool = False):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.collect = collect
+        self.errors = []
+
+    # Record an error, raising it straight away in fail-fast mode
+    def report(self, error: ValidationError):
+        if not self.collect:
+            raise error
+        self.errors.append(error)
+
+    # Parse and validate the grid line
+    #
+    # Returns:
+    #     Tuple of (max_x, max_y), or None if the line is invalid and errors are being collected
+    def grid(self, text: str, line: int = 1):
+        try:
+            max_x, max_y = map(int, text.split())
+        except ValueError:
+            self.report(ValidationError(
+                "Invalid grid dimensions. Please enter two integers separated by a space.", line))
+            return None
+        try:
+            self.limits.check_grid(max_x, max_y, line)
+        except ValidationError as e:
+            self.report(e)
+            return None
+        return max_x, max_y
+
+    # Parse and validate one robot from its position line and instruction line
+    #
+    # Returns:
+    #     Tuple of (x, y, orientation, instructions), or None if invalid and errors are being collected
+    def robot(self, position_text: str, instructions: str, line: int):
+        parts = position_text.split()
+        try:
+            x, y, orientation = int(parts[0]), int(parts[1]), parts[2]
+        except (IndexError, ValueError):
+            self.report(ValidationError(f"Invalid robot position '{position_text}'.", line))
+            return None
+        if orientation not in ORIENTATIONS:
+            self.report(ValidationError(f"Invalid orientation '{orientation}'. Must be one of N, E, S, W.", line))
+            return None
+        try:
+            self.limits.check_instructions(instructions, line + 1)
+        except ValidationError as e:
+            self.report(e)
+            return None
+        return x, y, orientation, instructions
+
+    # Lazily parse and validate robots from an iterator of lines
+    #
+    # Args:
+    #     lines: Iterator over the input lines following the grid dimensions
+    #     first_line: Line number of the first line in lines
+    #
+    # Yields:
+    #     Tuple of (x, y, orientation, instructions) for each valid robot, as soon as both lines arrive
+    def robots(self, lines, first_line: int = 2):
+        lines = iter(lines)
+        number = first_line - 1
+        for position_line in lines:
+            number += 1
+            position_line = position_line.strip()
+            if not position_line:
+                continue
+
+            instructions = next(lines, None)
+            if instructions is None:
+                break  # Robot without instructions at end of input
+            robot = self.robot(position_line, instructions.strip(), number)
+            number += 1
+            if robot is not None:
+                yield robot
+
+    # Raise every collected error together
+    #
+    # Raises:
+    #     ValidationError: Listing all collected errors, if there were any
+    def finish(self):
+        errors = self.errors
+        if len(errors) == 1:
+            raise errors[0]
+        if errors:
+            details = '\n'.join(str(error) for error in errors)
+            raise ValidationError(f"{len(errors)} validation errors:\n{details}", errors=list(errors))
+
+#
+# Validate a complete mission without simulating it
+#
+# Args:
+#     lines: Iterator over all input lines, starting with the grid line
+#     limits: Limits to enforce, the mission constraints by default
+#     collect: Collect every error instead of stopping at the first one
+#
+# Returns:
+#     Number of valid robots
+#
+# Raises:
+#     ValidationError: For the first error, or for all collected errors at the end of input
+def validate_mission(lines, limits: Limits = None, collect: bool = True) -> int:
+    validator = Validator(limits, collect)
+    lines = iter(lines)
+    grid_line = next(lines, None)
+    if grid_line is None:
+        return 0
+    validator.grid(grid_line)
+    count = sum(1 for _ in validator.robots(lines))
+    validator.finish()
+    return count
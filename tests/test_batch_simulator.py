@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import io
+import random
+from contextlib import redirect_stdout
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import batch_simulator
+from batch_simulator import simulate_batch
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+# Run robots one after another with the reference engine
+def simulate_sequential(grid, robots):
+    processor = CommandProcessor()
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        processor.execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results
+
+
+@unittest.skipIf(batch_simulator.np is None, "NumPy is not installed")
+class TestBatchSimulator(unittest.TestCase):
+    """Test cases for the vectorized batch simulator"""
+
+    def test_sample_input(self):
+        """Test the sample mission produces the expected output"""
+        robots = [(1, 1, 'E', 'RFRFRFRF'), (3, 2, 'N', 'FRRFLLFFRRFLL'), (0, 3, 'W', 'LLFFFLFLFL')]
+        grid = MarsGrid(5, 3)
+        self.assertEqual(simulate_batch(grid, robots), ["1 1 E", "3 3 N LOST", "2 3 S"])
+        self.assertEqual(grid.scent_positions, {(3, 3)})
+
+    def test_scent_from_same_block(self):
+        """Test that a later robot sees the scent left by an earlier robot in the same block"""
+        robots = [(2, 2, 'N', 'FFFF'), (2, 0, 'N', 'FFFFFFR'), (2, 3, 'N', 'F')]
+        self.assertEqual(simulate_batch(MarsGrid(5, 3), robots),
+                         ["2 3 N LOST", "2 3 E", "2 3 N"])
+
+    def test_unknown_command_warnings(self):
+        """Test that warnings match the sequential engine, including after a robot is lost"""
+        robots = [(1, 1, 'N', 'XFFFFY'), (1, 1, 'E', 'ZF')]
+        expected = io.StringIO()
+        with redirect_stdout(expected):
+            simulate_sequential(MarsGrid(5, 3), robots)
+        actual = io.StringIO()
+        with redirect_stdout(actual):
+            simulate_batch(MarsGrid(5, 3), robots)
+        self.assertEqual(actual.getvalue(), expected.getvalue())
+
+    def test_warn_callable(self):
+        """Test that warnings go to the warn function in robot order when robots are re-simulated"""
+        robots = [(2, 2, 'N', 'XFF'), (2, 1, 'N', 'YFFF'), (1, 1, 'E', 'Z')]
+        warnings = []
+        simulate_batch(MarsGrid(5, 3), robots, warn=warnings.append)
+        self.assertEqual(warnings, ["Warning: Unknown command 'X' ignored", "Warning: Unknown command 'Y' ignored",
+                                    "Warning: Unknown command 'Z' ignored"])
+
+    def test_repetition_syntax(self):
+        """Test that repetition groups are expanded like the sequential engine runs them"""
+        robots = [(1, 1, 'E', '(RF)*4'), (3, 2, 'N', 'F(RRFLLF)*2RRFLL'), (0, 3, 'W', '(L)*2(F)*3')]
+        grid = MarsGrid(5, 3)
+        self.assertEqual(simulate_batch(grid, robots), simulate_sequential(MarsGrid(5, 3), robots))
+
+    def test_matches_sequential_engine(self):
+        """Test random fleets with many shared exit cells against the sequential engine"""
+        rng = random.Random(1234)
+        robots = []
+        for _ in range(400):
+            robots.append((rng.randint(0, 4), rng.randint(0, 3), rng.choice('NESW'),
+                           ''.join(rng.choice('LRFFFF') for _ in range(rng.randint(0, 30)))))
+
+        grid_batch = MarsGrid(4, 3)
+        grid_sequential = MarsGrid(4, 3)
+        self.assertEqual(simulate_batch(grid_batch, robots, block_size=64),
+                         simulate_sequential(grid_sequential, robots))
+        self.assertEqual(grid_batch.scent_positions, grid_sequential.scent_positions)
+
+    def test_grouped_by_instruction_length(self):
+        """Test that splitting a block into small length groups does not change any result"""
+        rng = random.Random(99)
+        robots = [(rng.randint(0, 4), rng.randint(0, 3), rng.choice('NESW'),
+                   ''.join(rng.choice('LRFFX') for _ in range(rng.randint(0, 60)))) for _ in range(300)]
+        expected = io.StringIO()
+        with redirect_stdout(expected):
+            sequential = simulate_sequential(MarsGrid(4, 3), robots)
+        warnings = []
+        limit = batch_simulator._MAX_MATRIX_CELLS
+        batch_simulator._MAX_MATRIX_CELLS = 100
+        try:
+            self.assertEqual(simulate_batch(MarsGrid(4, 3), robots, warn=warnings.append), sequential)
+        finally:
+            batch_simulator._MAX_MATRIX_CELLS = limit
+        self.assertEqual(warnings, expected.getvalue().splitlines())
+
+    def test_long_robot_lost_early(self):
+        """Test that one long robot neither pads the short ones nor runs past its loss"""
+        robots = [(1, 1, 'N', 'F')] * 2000 + [(2, 2, 'N', '(F)*100000')]
+        results = simulate_batch(MarsGrid(5, 3), robots)
+        self.assertEqual(results[0], "1 2 N")
+        self.assertEqual(results[-1], "2 3 N LOST")
+
+    def test_invalid_orientation(self):
+        """Test that invalid orientations are rejected like Robot does"""
+        with self.assertRaises(ValueError):
+            simulate_batch(MarsGrid(5, 3), [(1, 1, 'Q', 'F')])
+
+
+if __name__ == '__main__':
+    unittest.main()
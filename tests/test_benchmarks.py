@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+
+# Add benchmarks directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from generators import generate_instruction_pool, iter_mission_lines, iter_robots
+from run_benchmarks import compare_reports, run_benchmarks, WORKLOADS
+from startup import loaded_modules
+from service_latency import measure_latency
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test cases for the benchmark generators and harness"""
+
+    def test_generators_are_reproducible(self):
+        """Test that the same seed produces the same fleet and a different seed does not"""
+        self.assertEqual(list(iter_robots('small', 1)), list(iter_robots('small', 1)))
+        self.assertNotEqual(list(iter_robots('small', 1)), list(iter_robots('small', 2)))
+
+    def test_instruction_mixes(self):
+        """Test that workload mixes shape the generated instructions"""
+        forward = ''.join(generate_instruction_pool('small', 1, 'forward'))
+        turn = ''.join(generate_instruction_pool('small', 1, 'turn'))
+        self.assertGreater(forward.count('F'), len(forward) // 2)
+        self.assertLess(turn.count('F'), len(turn) // 2)
+
+    def test_batch_startup_imports(self):
+        """Test that --batch does not load modules only other modes or scent files need"""
+        modules = loaded_modules()
+        self.assertIn('command_processor', modules)
+        for heavy in ('typing', 'argparse', 'mmap', 'struct', 'fcntl', 'contextlib'):
+            self.assertNotIn(heavy, modules)
+
+    def test_service_latency(self):
+        """Test that the latency benchmark answers every request and orders its percentiles"""
+        report = measure_latency(requests=20, clients=3)
+        self.assertEqual(report['requests'], 20)
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+        self.assertLessEqual(report['p99_ms'], report['max_ms'])
+
+    def test_mission_lines_format(self):
+        """Test that generated lines follow the text input format"""
+        lines = list(iter_mission_lines('small', 1))
+        self.assertEqual(lines[0], "5 3")
+        self.assertEqual(len(lines), 1 + 2 * 100)
+        self.assertEqual(len(lines[1].split()), 3)
+
+    def test_run_small_tier(self):
+        """Test that every workload of the small tier produces a timing"""
+        report = run_benchmarks(['small'], repeat=1)
+        self.assertEqual(set(report['results']), {f"small/{workload}" for workload in WORKLOADS})
+        for result in report['results'].values():
+            self.assertEqual(result['operations'], 100)
+            self.assertGreater(result['seconds'], 0)
+
+    def test_memory_and_gc_figures(self):
+        """Test that allocation figures and garbage collections are reported"""
+        report = run_benchmarks(['small'], ['execute'], repeat=1, memory=True, gc_pause=True)
+        result = report['results']['small/execute']
+        self.assertGreater(result['peak_bytes'], 0)
+        self.assertGreaterEqual(result['live_blocks'], 0)
+        self.assertEqual(result['gc_collections'], 0)
+        self.assertTrue(report['meta']['gc_pause'])
+
+    def test_compare_reports(self):
+        """Test that only slowdowns beyond the threshold are flagged"""
+        baseline = {'results': {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}, 'c': {'skipped': 'x'}}}
+        report = {'results': {'a': {'seconds': 1.05}, 'b': {'seconds': 1.5}, 'c': {'skipped': 'x'}}}
+        regressions = compare_reports(report, baseline, threshold=0.10)
+        self.assertEqual([name for name, _, _, _ in regressions], ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import io
+import random
+import tempfile
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from binary_format import (pack_instructions, unpack_instructions, encode_mission, decode_mission,
+                           decode_results, simulate_binary, simulate_file, text_to_binary,
+                           binary_to_text, results_to_text, main)
+from validation import Limits, UNLIMITED
+
+
+SAMPLE_INPUT = "5 3\n1 1 E\nRFRFRFRF\n3 2 N\nFRRFLLFFRRFLL\n0 3 W\nLLFFFLFLFL\n"
+SAMPLE_ROBOTS = [(1, 1, 'E', 'RFRFRFRF'), (3, 2, 'N', 'FRRFLLFFRRFLL'), (0, 3, 'W', 'LLFFFLFLFL')]
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test cases for the binary mission and result formats"""
+
+    def test_pack_round_trip(self):
+        """Test that instruction strings of every length survive packing"""
+        rng = random.Random(3)
+        for length in range(0, 30):
+            instructions = ''.join(rng.choice('LRF') for _ in range(length))
+            packed = pack_instructions(instructions)
+            self.assertEqual(len(packed), (length + 3) // 4)
+            self.assertEqual(unpack_instructions(packed, length), instructions)
+
+    def test_pack_rejects_unknown_commands(self):
+        """Test that only L, R and F can be packed"""
+        with self.assertRaises(ValueError):
+            pack_instructions("LRXF")
+
+    def test_mission_round_trip(self):
+        """Test encoding and decoding a mission, including negative coordinates"""
+        robots = SAMPLE_ROBOTS + [(-1, 7, 'S', '')]
+        max_x, max_y, decoded = decode_mission(encode_mission(5, 3, robots))
+        self.assertEqual((max_x, max_y), (5, 3))
+        self.assertEqual(list(decoded), robots)
+
+    def test_decode_from_memoryview_slice(self):
+        """Test decoding straight from a slice of a larger buffer"""
+        data = b'junk' + encode_mission(5, 3, SAMPLE_ROBOTS)
+        _, _, decoded = decode_mission(memoryview(data)[4:])
+        self.assertEqual(list(decoded), SAMPLE_ROBOTS)
+
+    def test_invalid_data(self):
+        """Test that corrupt missions and results are rejected"""
+        with self.assertRaises(ValueError):
+            decode_mission(b'nope')
+        with self.assertRaises(ValueError):
+            list(decode_mission(encode_mission(5, 3, SAMPLE_ROBOTS)[:-1])[2])
+        with self.assertRaises(ValueError):
+            list(decode_results(b'MRR1\x00'))
+
+    def test_simulate_binary(self):
+        """Test that the sample mission gives the expected results"""
+        results = list(decode_results(simulate_binary(encode_mission(5, 3, SAMPLE_ROBOTS))))
+        self.assertEqual(results, [(1, 1, 'E', False), (3, 3, 'N', True), (2, 3, 'S', False)])
+
+    def test_text_conversion_round_trip(self):
+        """Test converting text to binary and back"""
+        binary = io.BytesIO()
+        self.assertEqual(text_to_binary(io.StringIO(SAMPLE_INPUT), binary), 3)
+        text = io.StringIO()
+        binary_to_text(binary.getvalue(), text)
+        self.assertEqual(text.getvalue(), SAMPLE_INPUT)
+
+    def test_text_conversion_enforces_limits(self):
+        """Test that converting text validates the grid and robots against the limits"""
+        with self.assertRaisesRegex(ValueError, "Line 1:"):
+            text_to_binary(io.StringIO("51 3\n1 1 E\nF\n"), io.BytesIO())
+        with self.assertRaisesRegex(ValueError, "Line 3:"):
+            text_to_binary(io.StringIO("5 3\n1 1 E\nFFFF\n"), io.BytesIO(), Limits(50, 3))
+        with self.assertRaisesRegex(ValueError, "Line 2:"):
+            text_to_binary(io.StringIO("5 3\n1 1 X\nF\n"), io.BytesIO())
+        self.assertEqual(text_to_binary(io.StringIO("51 3\n1 1 E\nF\n"), io.BytesIO(), UNLIMITED), 1)
+
+    def test_coordinates_beyond_int64_raise_value_error(self):
+        """Test that values the 64-bit fields cannot hold are reported as ValueError"""
+        with self.assertRaisesRegex(ValueError, "64-bit"):
+            encode_mission(2 ** 63, 3, [])
+        with self.assertRaisesRegex(ValueError, "64-bit"):
+            encode_mission(5, 3, [(-2 ** 63 - 1, 0, 'N', 'F')])
+        with self.assertRaisesRegex(ValueError, "64-bit"):
+            text_to_binary(io.StringIO(f"{2 ** 64} 3\n1 1 E\nF\n"), io.BytesIO(), UNLIMITED)
+
+    def test_main_reports_oversized_grid_without_traceback(self):
+        """Test that the encode command exits with an error message for an oversized large grid"""
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, 'mission.txt')
+            with open(text_path, 'w') as text_file:
+                text_file.write(f"{2 ** 64} 3\n1 1 E\nF\n")
+            stderr = io.StringIO()
+            original, sys.stderr = sys.stderr, stderr
+            try:
+                with self.assertRaises(SystemExit) as exit_info:
+                    main(['encode', '--large-grid', text_path, os.path.join(directory, 'mission.bin')])
+            finally:
+                sys.stderr = original
+        self.assertEqual(exit_info.exception.code, 1)
+        self.assertIn("Error: Coordinates must fit in signed 64-bit integers", stderr.getvalue())
+
+    def test_simulate_file_through_mmap(self):
+        """Test simulating a mission file via mmap and printing the results as text"""
+        with tempfile.TemporaryDirectory() as directory:
+            mission_path = os.path.join(directory, 'mission.bin')
+            result_path = os.path.join(directory, 'results.bin')
+            with open(mission_path, 'wb') as mission_file:
+                mission_file.write(encode_mission(5, 3, SAMPLE_ROBOTS))
+            simulate_file(mission_path, result_path)
+            with open(result_path, 'rb') as result_file:
+                out = io.StringIO()
+                results_to_text(result_file.read(), out)
+        self.assertEqual(out.getvalue(), "1 1 E\n3 3 N LOST\n2 3 S\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
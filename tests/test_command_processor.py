@@ -1,11 +1,16 @@
 import unittest
 import sys
 import os
+import io
+import random
+from contextlib import redirect_stdout
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from command_processor import CommandProcessor
+from command_processor import (CommandProcessor, OP_TURN, OP_FORWARD, OP_CALL, OP_UNKNOWN, OP_REPEAT, OP_MOVE,
+                               Rotate, Move, Callback, parse_repetitions, expand_repetitions,
+                               expanded_length)
 from robot import Robot
 from mars_grid import MarsGrid
 
@@ -104,6 +109,257 @@ class TestCommandProcessor(unittest.TestCase):
         self.assertEqual(robot.y, 2)
         self.assertEqual(robot.orientation, 'N')
 
+    def test_compile_collapses_runs(self):
+        """Test that turn runs fold into a net rotation and F runs into a segment"""
+        program = self.processor.compile("LLLFFFRRXLR")
+        self.assertEqual(program, (
+            (OP_TURN, 1),
+            (OP_FORWARD, 3),
+            (OP_TURN, 2),
+            (OP_UNKNOWN, 'X'),
+        ))
+
+    def test_compile_keeps_registered_commands(self):
+        """Test that registered and overridden commands are not folded"""
+        def backward_command(robot):
+            pass
+
+        self.processor.register_command('B', backward_command)
+        self.processor.register_command('L', backward_command)
+        program = self.processor.compile("FBLR")
+        self.assertEqual(program, (
+            (OP_FORWARD, 1),
+            (OP_CALL, backward_command),
+            (OP_CALL, backward_command),
+            (OP_TURN, 1),
+        ))
+
+    def test_compile_cache_is_bounded_lru(self):
+        """Test that compiled programs are cached and the oldest are evicted"""
+        processor = CommandProcessor(cache_size=2)
+        first = processor.compile("RF")
+        self.assertIs(processor.compile("RF"), first)
+        processor.compile("LF")
+        processor.compile("RF")  # Refresh so "LF" is the oldest entry
+        processor.compile("FF")
+        self.assertIn("RF", processor._program_cache)
+        self.assertNotIn("LF", processor._program_cache)
+        self.assertEqual(len(processor._program_cache), 2)
+
+    def test_unknown_command_warnings_preserved(self):
+        """Test that warnings are printed in order and stop once the robot is lost"""
+        robot = Robot(5, 3, 'W', self.grid)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.processor.execute_commands(robot, "XRYFZ")
+        self.assertEqual(output.getvalue(),
+                         "Warning: Unknown command 'X' ignored\n"
+                         "Warning: Unknown command 'Y' ignored\n")
+        self.assertTrue(robot.is_lost)
+
+    def test_compiled_matches_character_dispatch(self):
+        """Test that compiled execution matches per-character execution on random missions"""
+        rng = random.Random(42)
+        grid_compiled = MarsGrid(6, 4)
+        grid_reference = MarsGrid(6, 4)
+        for _ in range(200):
+            x, y = rng.randint(0, 6), rng.randint(0, 4)
+            orientation = rng.choice('NESW')
+            instructions = ''.join(rng.choice('LRFFF') for _ in range(rng.randint(0, 40)))
+
+            compiled = Robot(x, y, orientation, grid_compiled)
+            self.processor.execute_commands(compiled, instructions)
+
+            reference = Robot(x, y, orientation, grid_reference)
+            for instruction in instructions:
+                if reference.is_lost:
+                    break
+                self.processor.commands[instruction](reference)
+
+            self.assertEqual(str(compiled), str(reference))
+        self.assertEqual(grid_compiled.scent_positions, grid_reference.scent_positions)
+
+
+    def test_parse_repetitions(self):
+        """Test parsing nested repetition groups and rejecting malformed syntax"""
+        self.assertEqual(parse_repetitions("F(R(F)*2)*10L"), ["F", ([("R"), (["F"], 2)], 10), "L"])
+        self.assertEqual(expand_repetitions("F(R(F)*2)*2"), "FRFFRFF")
+        for malformed in ("(RF", "RF)", "(RF)", "(RF)*", "(RF)x2", "((F)*2"):
+            self.assertIsNone(parse_repetitions(malformed))
+            self.assertEqual(expand_repetitions(malformed), malformed)
+
+    def test_expansion_limit(self):
+        """Test that expansions past the limit are refused before anything is expanded"""
+        self.assertEqual(expanded_length("F(R(F)*2)*10L"), 32)
+        self.assertEqual(expanded_length("(RF"), 3)
+        self.assertEqual(expanded_length("(RRRR)*99999999999999"), 399999999999996)
+        with self.assertRaises(ValueError):
+            expand_repetitions("(RRRR)*99999999999999")
+        with self.assertRaises(ValueError):
+            CommandProcessor(max_expanded=10).expand("(RF)*6")
+        self.assertEqual(expand_repetitions("(RF)*6", limit=None), "RF" * 6)
+
+    def test_unbounded_repeat_rejected(self):
+        """Test that groups run one repetition at a time are refused past the limit"""
+        robot = Robot(1, 1, 'N', self.grid)
+        for instructions in ("(X)*9999999999", "(RRRRX)*9999999999", "((X)*1000)*1000000"):
+            with self.assertRaises(ValueError):
+                self.processor.execute_commands(robot, instructions)
+        self.assertEqual(str(robot), "1 1 N")
+        # Groups with a closed form keep running at any count
+        self.processor.execute_commands(robot, "(RRRR)*9999999999")
+        self.assertEqual(str(robot), "1 1 N")
+
+    def test_repetition_syntax(self):
+        """Test that repetition groups compile to repeat ops and run like their expansion"""
+        program = self.processor.compile("(RFRF)*250")
+        self.assertEqual(len(program), 1)
+        self.assertEqual(program[0][0], OP_REPEAT)
+        self.assertEqual(self.processor.compile("(F)*5(L)*6"), ((OP_FORWARD, 5), (OP_TURN, 2)))
+
+        robot = Robot(1, 1, 'E', self.grid)
+        self.processor.execute_commands(robot, "(RFRF)*250")
+        self.assertEqual(str(robot), "1 1 E")
+
+    def test_malformed_repetition_falls_back(self):
+        """Test that malformed syntax is run character by character with warnings"""
+        robot = Robot(1, 1, 'N', self.grid)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.processor.execute_commands(robot, "(F")
+        self.assertEqual(output.getvalue(), "Warning: Unknown command '(' ignored\n")
+        self.assertEqual(str(robot), "1 2 N")
+
+    def test_repetition_disabled_by_registered_commands(self):
+        """Test that registering a bracket command turns the syntax off"""
+        calls = []
+        self.processor.register_command('(', calls.append)
+        self.processor.register_command(')', calls.append)
+        self.processor.register_command('*', calls.append)
+        self.processor.register_command('2', calls.append)
+        robot = Robot(1, 1, 'N', self.grid)
+        self.processor.execute_commands(robot, "(F)*2")
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(str(robot), "1 2 N")
+
+    def test_periodic_strings_detected(self):
+        """Test that a long string made of one repeated pattern compiles to a repeat op"""
+        program = self.processor.compile("RFLF" * 8)
+        self.assertEqual(len(program), 1)
+        self.assertEqual(program[0][0], OP_REPEAT)
+        self.assertEqual(program[0][1][1], 8)
+
+    def test_huge_repetition_counts(self):
+        """Test that repetitions far from the edge are skipped in closed form"""
+        grid = MarsGrid(50, 50)
+        robot = Robot(25, 25, 'N', grid)
+        self.processor.execute_commands(robot, "(FRFRFRFRL)*1000000000001")
+        self.assertEqual(str(robot), "25 25 W")
+
+        robot = Robot(0, 0, 'N', grid)
+        self.processor.execute_commands(robot, "(FRFL)*1000000000000")
+        self.assertEqual(str(robot), "50 50 N LOST")
+
+        robot = Robot(0, 0, 'N', grid)
+        self.processor.execute_commands(robot, "(FRFL)*1000000000000")
+        self.assertEqual(str(robot), "50 50 N")  # Held by the scent, turning in place
+
+    def test_repetition_matches_expansion(self):
+        """Test that repeat ops match running the expanded instructions on random missions"""
+        rng = random.Random(17)
+        grid_compiled = MarsGrid(7, 5)
+        grid_reference = MarsGrid(7, 5)
+        reference_processor = CommandProcessor(cache_size=0)
+        for _ in range(300):
+            x, y = rng.randint(0, 7), rng.randint(0, 5)
+            orientation = rng.choice('NESW')
+            inner = ''.join(rng.choice('LRFF') for _ in range(rng.randint(1, 4)))
+            body = ''.join(rng.choice('LRFFF') for _ in range(rng.randint(1, 5)))
+            instructions = f"{rng.choice('LRF')}({body}({inner})*{rng.randint(0, 3)})*{rng.randint(0, 40)}F"
+            if rng.random() < 0.3:
+                instructions = body * rng.randint(4, 20)
+
+            compiled = Robot(x, y, orientation, grid_compiled)
+            self.processor.execute_commands(compiled, instructions)
+
+            reference = Robot(x, y, orientation, grid_reference)
+            for instruction in expand_repetitions(instructions):
+                if reference.is_lost:
+                    break
+                reference_processor.commands[instruction](reference)
+
+            self.assertEqual(str(compiled), str(reference), instructions)
+        self.assertEqual(grid_compiled.scent_positions, grid_reference.scent_positions)
+
+    def test_declarative_commands_compile(self):
+        """Test that declarative commands fold into the program like the built-in ones"""
+        self.processor.register_command('B', Move(1, 2))
+        self.processor.register_command('J', Move(2))
+        self.processor.register_command('U', Rotate(2))
+        self.assertEqual(self.processor.compile("FJFBBULR"), (
+            (OP_FORWARD, 4),
+            (OP_MOVE, (2, 2)),
+            (OP_TURN, 2),
+        ))
+        robot = Robot(2, 1, 'N', self.grid)
+        self.processor.execute_commands(robot, "JBBBB")
+        self.assertEqual(str(robot), "2 0 N LOST")
+
+    def test_callbacks_dispatch_per_character(self):
+        """Test that plain functions and Callback specs stay opaque calls"""
+        calls = []
+        self.processor.register_command('C', calls.append)
+        self.processor.register_command('D', Callback(calls.append))
+        self.assertEqual(self.processor.commands['C'], Callback(calls.append))
+        self.assertEqual(self.processor.compile("CD"), ((OP_CALL, calls.append), (OP_CALL, calls.append)))
+        robot = Robot(1, 1, 'N', self.grid)
+        self.processor.execute_commands(robot, "CFD")
+        self.assertEqual(calls, [robot, robot])
+
+    def test_declarative_matches_single_steps(self):
+        """Test that compiled declarative commands match single steps with turns, repetitions included"""
+        specs = {'B': Move(1, 2), 'J': Move(2), 'S': Move(1, 1), 'U': Rotate(2)}
+        for char, spec in specs.items():
+            self.processor.register_command(char, spec)
+
+        # Reference: every step is a turn to the direction of travel, a forward move and a turn back
+        def step(robot, direction):
+            orientation = robot.orientation
+            robot.rotate(direction)
+            robot.move_forward()
+            robot.orientation = orientation
+
+        rng = random.Random(5)
+        grid_compiled = MarsGrid(6, 4)
+        grid_reference = MarsGrid(6, 4)
+        for _ in range(300):
+            x, y = rng.randint(0, 6), rng.randint(0, 4)
+            orientation = rng.choice('NESW')
+            body = ''.join(rng.choice('LRFBJSU') for _ in range(rng.randint(1, 6)))
+            instructions = f"{body}({body[::-1]})*{rng.randint(1, 20)}"
+
+            compiled = Robot(x, y, orientation, grid_compiled)
+            self.processor.execute_commands(compiled, instructions)
+
+            reference = Robot(x, y, orientation, grid_reference)
+            for instruction in expand_repetitions(instructions):
+                spec = specs.get(instruction, self.processor.commands[instruction])
+                if type(spec) is Rotate:
+                    reference.rotate(spec.quarter_turns)
+                else:
+                    for _ in range(spec.steps):
+                        step(reference, spec.direction)
+
+            self.assertEqual(str(compiled), str(reference), instructions)
+        self.assertEqual(grid_compiled.scent_positions, grid_reference.scent_positions)
+
+    def test_huge_declarative_repetitions(self):
+        """Test that repetitions of declarative commands are compressed"""
+        self.processor.register_command('B', Move(1, 2))
+        robot = Robot(2, 1, 'E', self.grid)
+        self.processor.execute_commands(robot, "(FB)*1000000000000F(BF)*1000000000000")
+        self.assertEqual(str(robot), "3 1 E")
+
 
 if __name__ == '__main__':
     unittest.main()
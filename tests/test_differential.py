@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import random
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import differential
+from differential import generate_mission, run_differential, run_reference, compare, shrink, format_mission
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+# Backend that forgets scents, so later robots are lost where they should have been saved
+def _run_without_scents(mission):
+    max_x, max_y, robots = mission
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, MarsGrid(max_x, max_y))
+        for instruction in instructions:
+            if robot.is_lost:
+                break
+            {'L': robot.turn_left, 'R': robot.turn_right, 'F': robot.move_forward}[instruction]()
+        results.append(str(robot))
+    return results, [], None
+
+
+class TestDifferential(unittest.TestCase):
+    """Test cases for the differential testing harness"""
+
+    def test_missions_are_deterministic(self):
+        """Test that the same seed generates the same missions"""
+        first = [generate_mission(random.Random(3)) for _ in range(5)]
+        second = [generate_mission(random.Random(3)) for _ in range(5)]
+        self.assertEqual(first, second)
+
+    def test_backends_match_reference(self):
+        """Test that every available backend matches the reference on random missions"""
+        report = run_differential(seed=2025, missions=60)
+        self.assertEqual(report['mismatches'], [])
+        for name, timing in report['backends'].items():
+            self.assertGreater(timing['missions'], 0, name)
+            self.assertGreater(timing['robots_per_sec'], 0, name)
+
+    def test_shrinks_to_minimal_reproducer(self):
+        """Test that a mismatch is shrunk to the two robots that expose it"""
+        rng = random.Random(8)
+        mission = generate_mission(rng, max_robots=25, unknown=False, repetitions=False)
+        while compare(mission, _run_without_scents) is None:
+            mission = generate_mission(rng, max_robots=25, unknown=False, repetitions=False)
+
+        reproducer = shrink(mission, _run_without_scents)
+        self.assertIsNotNone(compare(reproducer, _run_without_scents))
+        self.assertEqual(len(reproducer[2]), 2)  # One robot leaves a scent, the next ignores it
+        self.assertLessEqual(sum(len(robot[3]) for robot in reproducer[2]), 4)
+
+    def test_reports_mismatches(self):
+        """Test that a broken backend is reported with its reproducer"""
+        differential.BACKENDS['broken'] = (_run_without_scents, True)
+        try:
+            report = run_differential(seed=1, missions=30, backends=['broken'], max_mismatches=1)
+        finally:
+            del differential.BACKENDS['broken']
+        self.assertGreater(report['backends']['broken']['mismatches'], 0)
+        self.assertEqual(len(report['mismatches']), 1)
+        self.assertTrue(report['mismatches'][0]['reproducer'].endswith('\n'))
+
+    def test_format_mission(self):
+        """Test that missions are written in the text input format"""
+        self.assertEqual(format_mission((5, 3, [(1, 1, 'E', 'RF')])), "5 3\n1 1 E\nRF\n")
+        self.assertEqual(run_reference((5, 3, [(1, 1, 'E', 'RFX')]))[:2],
+                         (["1 0 S"], ["Warning: Unknown command 'X' ignored"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
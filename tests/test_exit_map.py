@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import random
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import exit_map
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+class TestExitMap(unittest.TestCase):
+    """Test cases for the exit map index"""
+
+    def setUp(self):
+        """Set up a grid with a scented corner"""
+        self.grid = MarsGrid(5, 3)
+        self.grid.add_scent(5, 3)
+
+    def test_exit(self):
+        """Test exit distance, cell and scent for each heading"""
+        exits = self.grid.exit_map
+        self.assertEqual(exits.exit(5, 1, 'N'), (2, 5, 3, True))
+        self.assertEqual(exits.exit(2, 3, 'E'), (3, 5, 3, True))
+        self.assertEqual(exits.exit(2, 1, 'S'), (1, 2, 0, False))
+        self.assertEqual(exits.exit(2, 1, 3), (2, 0, 1, False))
+
+    def test_off_grid_query(self):
+        """Test that only on-grid positions can be queried"""
+        with self.assertRaises(ValueError):
+            self.grid.exit_map.exit(6, 0, 'N')
+
+    def test_updates_incrementally(self):
+        """Test that scents added after the map is built are reflected"""
+        exits = self.grid.exit_map
+        self.assertTrue(exits.will_be_lost(0, 0, 'W', 1))
+        Robot(0, 0, 'W', self.grid).move_forward()
+        self.assertFalse(exits.will_be_lost(0, 0, 'W', 1))
+        self.assertFalse(exits.will_be_lost(0, 0, 'S', 1))  # The corner is scented for both edges
+        self.grid.add_scent(3, 0)
+        self.assertEqual(exits.outcome(3, 2, 'S', 5), (3, 0, False))
+
+    def test_rebuilt_after_import(self):
+        """Test that importing scents replaces the map"""
+        exits = self.grid.exit_map
+        other = MarsGrid(5, 3)
+        other.add_scent(0, 3)
+        self.grid.import_scents(other.export_scents())
+        self.assertIsNot(self.grid.exit_map, exits)
+        self.assertTrue(self.grid.exit_map.exit(0, 0, 'N')[3])
+        self.assertFalse(self.grid.exit_map.exit(5, 0, 'N')[3])
+
+    def test_outcome_matches_robot(self):
+        """Test random queries against robots running the same forward steps"""
+        rng = random.Random(5)
+        for _ in range(300):
+            x, y = rng.randint(0, 5), rng.randint(0, 3)
+            orientation = rng.choice('NESW')
+            steps = rng.randint(0, 8)
+            expected_x, expected_y, expected_lost = self.grid.exit_map.outcome(x, y, orientation, steps)
+
+            robot = Robot(x, y, orientation, self.grid)
+            for _ in range(steps):
+                robot.move_forward()
+            self.assertEqual((robot.x, robot.y, robot.is_lost), (expected_x, expected_y, expected_lost))
+
+    def test_sparse_edges_for_huge_grids(self):
+        """Test that huge grids use sparse edge flags"""
+        size = exit_map.DENSE_PERIMETER_LIMIT + 10
+        grid = MarsGrid(size, size)
+        grid.add_scent(size, 7)
+        self.assertEqual(grid.exit_map.exit(1, 7, 'E'), (size - 1, size, 7, True))
+        self.assertIsInstance(grid.exit_map._edges[1], exit_map._SparseEdge)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import sys
+import os
+import gc
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gc_control import gc_paused, collection_counts
+
+
+class TestGcControl(unittest.TestCase):
+    """Test cases for garbage collector tuning"""
+
+    def test_gc_paused(self):
+        """Test that the collector is disabled and frozen inside the block and restored after it"""
+        self.assertTrue(gc.isenabled())
+        with gc_paused():
+            self.assertFalse(gc.isenabled())
+            self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(gc.get_freeze_count(), 0)
+
+    def test_gc_paused_keeps_disabled_collector_disabled(self):
+        """Test that a collector disabled beforehand stays disabled"""
+        gc.disable()
+        try:
+            with gc_paused(freeze=False):
+                pass
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
+    def test_collection_counts(self):
+        """Test that collections are counted per generation"""
+        before = collection_counts()
+        gc.collect()
+        after = collection_counts()
+        self.assertEqual(len(after), 3)
+        self.assertEqual(after[2], before[2] + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import io
+import json
+from contextlib import redirect_stdout
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from instrumentation import Stats
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+from main import run_stream
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the opt-in instrumentation layer"""
+
+    def setUp(self):
+        """Set up an instrumented processor"""
+        self.grid = MarsGrid(5, 3)
+        self.stats = Stats(per_robot=True)
+        self.processor = CommandProcessor(stats=self.stats)
+
+    def test_command_and_grid_counters(self):
+        """Test counts per command character and per grid operation"""
+        with redirect_stdout(io.StringIO()):
+            self.processor.execute_commands(Robot(3, 2, 'N', self.grid), "FXFFR")
+        self.assertEqual(self.stats.command_counts, {'F': 2, 'X': 1})
+        self.assertEqual(self.stats.grid_counts['claim_scent'], 1)
+        self.assertEqual(set(self.stats.to_dict()['grid']), {'claim_scent'})
+        self.assertEqual(self.stats.robots, 1)
+        self.assertEqual(self.stats.robots_lost, 1)
+        self.assertEqual(self.stats.robot_records[0]['commands'], 5)
+        self.assertTrue(self.stats.robot_records[0]['lost'])
+
+    def test_grid_calls_from_callbacks(self):
+        """Test that grid operations are counted only when they are actually called"""
+        self.processor.register_command('S', lambda robot: robot.grid.has_scent(robot.x, robot.y))
+        self.processor.execute_commands(Robot(1, 1, 'N', self.grid), "SFS")
+        self.assertEqual(self.stats.grid_counts['has_scent'], 2)
+        self.assertEqual(self.stats.grid_counts['claim_scent'], 0)
+        self.assertNotIn('is_valid_position', self.stats.to_dict()['grid'])
+
+    def test_expansion_limit(self):
+        """Test that the per-step interpreter refuses repetition counts it cannot run"""
+        with self.assertRaises(ValueError):
+            self.processor.execute_commands(Robot(1, 1, 'N', self.grid), "(RRRR)*99999999999999")
+        self.assertEqual(self.stats.robots, 0)
+
+    def test_results_unchanged(self):
+        """Test that instrumented execution gives the same result as the fast path"""
+        robot = Robot(3, 2, 'N', self.grid)
+        self.processor.execute_commands(robot, "FRRFLLFFRRFLL")
+        self.assertEqual(str(robot), "3 3 N LOST")
+        self.assertIs(robot.grid, self.grid)
+
+    def test_disabled_by_default(self):
+        """Test that processors without stats collect nothing"""
+        processor = CommandProcessor()
+        self.assertIsNone(processor.stats)
+        processor.execute_commands(Robot(1, 1, 'N', self.grid), "FFF")
+        self.assertEqual(self.stats.robots, 0)
+
+    def test_json_export(self):
+        """Test that stats export as JSON"""
+        self.processor.execute_commands(Robot(1, 1, 'E', self.grid), "RFRFRFRF")
+        exported = json.loads(self.stats.to_json())
+        self.assertEqual(exported['commands']['R']['count'], 4)
+        self.assertEqual(exported['robots']['count'], 1)
+        self.assertEqual(len(exported['per_robot']), 1)
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format, including label escaping"""
+        with redirect_stdout(io.StringIO()):
+            self.processor.execute_commands(Robot(1, 1, 'E', self.grid), 'F"')
+        text = self.stats.to_prometheus()
+        self.assertIn('# TYPE mars_command_total counter', text)
+        self.assertIn('mars_command_total{command="F"} 1', text)
+        self.assertIn('mars_command_total{command="\\""} 1', text)
+        self.assertIn('mars_robots_total 1', text)
+
+    def test_stream_phases(self):
+        """Test that streaming with stats records parse and output phases"""
+        out = io.StringIO()
+        run_stream(io.StringIO("5 3\n1 1 E\nRFRFRFRF\n"), out, stats=self.stats)
+        self.assertEqual(out.getvalue(), "1 1 E\n")
+        self.assertIn('parse', self.stats.phase_seconds)
+        self.assertIn('output', self.stats.phase_seconds)
+
+
+if __name__ == '__main__':
+    unittest.main()
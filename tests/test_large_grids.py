@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from lockstep_engine import simulate_lockstep
+from validation import LARGE_GRID_LIMITS, ValidationError
+from main import main, run_stream, run_batch
+
+# Robots lost along the top edge in the memory workload
+EDGE_ROBOTS = 200
+
+
+# Lose robots along the top edge, resolve a long forward run through the exit map, run a small
+# lockstep fleet and stream a mission, keeping the grid alive until the peak has been taken
+def _edge_workload(size: int):
+    grid = MarsGrid(size, size)
+    command_processor = CommandProcessor(warn=lambda message: None)
+    robot = Robot(0, 0, 'N', grid)
+    step = size // EDGE_ROBOTS
+    for index in range(EDGE_ROBOTS):
+        robot.reset(index * step, size, 'N')
+        command_processor.execute_commands(robot, 'FRFF')
+    grid.exit_map.outcome(0, 0, 'N', 2 * size)
+    simulate_lockstep(grid, [(0, 0, 'E', 'F' * 50), (size, size, 'S', 'F' * 50)], warn=lambda message: None)
+    mission = f"{size} {size}\n{size} {size} N\nFFRF\n0 0 S\nLFFF\n"
+    run_stream(io.StringIO(mission), io.StringIO(), limits=LARGE_GRID_LIMITS)
+    return grid
+
+
+# Peak traced memory of the edge workload on a grid of the given size
+def _peak_bytes(size: int) -> int:
+    tracemalloc.start()
+    try:
+        grid = _edge_workload(size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del grid
+    return peak
+
+
+class TestLargeGrids(unittest.TestCase):
+    """Test cases for huge grids in large-grid mode"""
+
+    def test_memory_stays_flat(self):
+        """Test that peak memory does not grow with the grid once every index is sparse"""
+        _peak_bytes(10 ** 7)  # Warm up caches and lazy imports
+        peaks = {size: _peak_bytes(size) for size in (10 ** 7, 10 ** 9, 10 ** 12, 10 ** 30)}
+        smallest = min(peaks.values())
+        for size, peak in peaks.items():
+            self.assertLess(peak, smallest * 1.25 + 16384, f"peak {peak} bytes for a {size} grid")
+            self.assertLess(peak, 1 << 20, f"peak {peak} bytes for a {size} grid")
+
+    def test_dense_indexes_bounded_by_perimeter(self):
+        """Test that a grid of ten billion cells still costs memory in proportion to its perimeter"""
+        _peak_bytes(10 ** 5)
+        self.assertLess(_peak_bytes(10 ** 5), 1 << 20)
+
+    def test_arbitrary_size_coordinates(self):
+        """Test that coordinates beyond 64 bits are simulated exactly"""
+        size = 10 ** 30
+        mission = f"{size} {size}\n{size} {size} N\nFRF\n{size} {size} N\nFRFL\n{size - 1} 0 E\nFFF\n"
+        out = io.StringIO()
+        run_stream(io.StringIO(mission), out, limits=LARGE_GRID_LIMITS)
+        self.assertEqual(out.getvalue().splitlines(), [
+            f"{size} {size} N LOST",
+            f"{size} {size} N",
+            f"{size} 0 E LOST",
+        ])
+        self.assertEqual(run_batch(mission.encode(), LARGE_GRID_LIMITS).decode(), out.getvalue())
+
+    def test_default_limits_reject_huge_grids(self):
+        """Test that huge grids still need large-grid mode"""
+        with self.assertRaises(ValidationError):
+            run_batch(b"1000000 1000000\n0 0 N\nF\n")
+
+    def test_large_grid_flag(self):
+        """Test that --large-grid and MARS_MAX_COORDINATE accept huge grids from the command line"""
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as mission:
+            mission.write("1000000000 1000000000\n1000000000 5 E\nFLF\n")
+        try:
+            for argv, environ in ((['--large-grid', mission.name], {}),
+                                  (['--stream', mission.name], {'MARS_MAX_COORDINATE': 'none'})):
+                with patch.dict(os.environ, environ), patch('sys.stdout', new_callable=io.StringIO) as out:
+                    main(argv)
+                self.assertEqual(out.getvalue(), "1000000000 5 E LOST\n")
+        finally:
+            os.unlink(mission.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
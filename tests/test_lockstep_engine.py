@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import random
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lockstep_engine import LockstepSimulation, simulate_lockstep
+from occupancy import DenseOccupancy, SparseOccupancy, EMPTY, DENSE_OCCUPANCY_LIMIT
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+class TestOccupancy(unittest.TestCase):
+    """Test cases for the occupancy index"""
+
+    def test_dense_and_sparse_indexes(self):
+        """Test that both indexes place, move and remove robots alike"""
+        for index in (DenseOccupancy(5, 3), SparseOccupancy(5, 3)):
+            index.place(1, 2, 7)
+            self.assertEqual(index.get(1, 2), 7)
+            index.move(1, 2, 2, 2)
+            self.assertEqual(index.get(1, 2), EMPTY)
+            self.assertEqual(index.get(2, 2), 7)
+            index.remove(2, 2)
+            self.assertEqual(len(index), 0)
+            index.place(0, 0, 0)
+            index.clear()
+            self.assertEqual(index.get(0, 0), EMPTY)
+
+    def test_grid_chooses_index(self):
+        """Test that small grids get a dense index and huge grids a sparse one"""
+        self.assertEqual(MarsGrid(50, 50).occupancy.kind, 'dense')
+        self.assertEqual(MarsGrid(DENSE_OCCUPANCY_LIMIT, 1).occupancy.kind, 'sparse')
+        grid = MarsGrid(5, 3)
+        occupancy = grid.occupancy
+        grid.reset(8, 8)
+        self.assertIsNot(grid.occupancy, occupancy)
+
+
+class TestLockstepEngine(unittest.TestCase):
+    """Test cases for the lockstep engine"""
+
+    def test_single_robot_matches_sequential(self):
+        """Test that a lone robot ends where the sequential engine puts it"""
+        rng = random.Random(4)
+        processor = CommandProcessor()
+        for _ in range(100):
+            x, y, orientation = rng.randint(0, 5), rng.randint(0, 3), rng.choice('NESW')
+            instructions = ''.join(rng.choice('LRFF') for _ in range(rng.randint(0, 30)))
+            reference = Robot(x, y, orientation, MarsGrid(5, 3))
+            processor.execute_commands(reference, instructions)
+            results, collisions, _ = simulate_lockstep(MarsGrid(5, 3), [(x, y, orientation, instructions)])
+            self.assertEqual(results, [str(reference)])
+            self.assertEqual(collisions, 0)
+
+    def test_collision_blocks_move(self):
+        """Test that robots cannot move onto each other"""
+        robots = [(0, 0, 'E', 'FFF'), (2, 0, 'W', 'FFF')]
+        results, collisions, ticks = simulate_lockstep(MarsGrid(5, 3), robots)
+        self.assertEqual(results, ["1 0 E", "2 0 W"])
+        self.assertEqual(collisions, 5)
+        self.assertEqual(ticks, 3)
+
+    def test_moves_in_robot_order(self):
+        """Test that a cell vacated earlier in the same tick can be entered"""
+        leader_first = [(0, 1, 'N', 'FF'), (0, 0, 'N', 'FF')]
+        self.assertEqual(simulate_lockstep(MarsGrid(5, 3), leader_first)[:2], (["0 3 N", "0 2 N"], 0))
+        follower_first = [(0, 0, 'N', 'FF'), (0, 1, 'N', 'FF')]
+        self.assertEqual(simulate_lockstep(MarsGrid(5, 3), follower_first)[:2], (["0 1 N", "0 3 N"], 1))
+
+    def test_scent_rules(self):
+        """Test that a lost robot frees its cell and its scent saves later robots"""
+        robots = [(0, 3, 'N', 'F'), (0, 1, 'N', 'FFFF')]
+        grid = MarsGrid(5, 3)
+        results, collisions, _ = simulate_lockstep(grid, robots)
+        self.assertEqual(results, ["0 3 N LOST", "0 3 N"])
+        self.assertEqual(collisions, 0)
+        self.assertEqual(grid.scent_positions, {(0, 3)})
+
+    def test_tick_by_tick(self):
+        """Test stepping the simulation and looking up occupants"""
+        simulation = LockstepSimulation(MarsGrid(5, 3), [(1, 1, 'N', 'FX'), (4, 1, 'E', 'L')], warn=[].append)
+        self.assertEqual(simulation.occupant(1, 1), 0)
+        self.assertEqual(simulation.tick(), 1)
+        self.assertEqual(simulation.occupant(1, 2), 0)
+        self.assertIsNone(simulation.occupant(1, 1))
+        self.assertEqual(simulation.run(), ["1 2 N", "4 1 N"])
+        self.assertEqual(simulation.active, 0)
+
+    def test_duplicate_start(self):
+        """Test that two robots cannot start on the same cell"""
+        with self.assertRaises(ValueError):
+            LockstepSimulation(MarsGrid(5, 3), [(1, 1, 'N', 'F'), (1, 1, 'E', 'F')])
+
+    def test_expansion_limit(self):
+        """Test that repetition counts too large to step through are refused"""
+        with self.assertRaises(ValueError):
+            LockstepSimulation(MarsGrid(5, 3), [(1, 1, 'N', '(RRRR)*99999999999999')])
+
+    def test_huge_grid(self):
+        """Test a fleet on a huge grid using the sparse index"""
+        size = 10 ** 9
+        robots = [(index * 3, 0, 'N', 'F' * 10 + 'R' + 'F' * 5) for index in range(100)]
+        robots.append((0, 5, 'W', ''))  # Parked in the way of the first robot
+        grid = MarsGrid(size, size)
+        results, collisions, _ = simulate_lockstep(grid, robots)
+        self.assertEqual(grid.occupancy.kind, 'sparse')
+        self.assertEqual(results[0], "5 4 E")
+        self.assertEqual(results[1], "8 10 E")
+        self.assertEqual(results[-1], "0 5 W")
+        self.assertEqual(collisions, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from mars_grid import MarsGrid
+from scent_store import DENSE_PERIMETER_LIMIT
 
 
 class TestMarsGrid(unittest.TestCase):
@@ -76,6 +77,37 @@ class TestMarsGrid(unittest.TestCase):
         self.assertFalse(self.grid.has_scent(1, 1))
         self.assertFalse(self.grid.has_scent(3, 3))
     
+    def test_reset_reuses_scent_storage(self):
+        """Test that reset clears scents and resizes the existing store in place"""
+        store = self.grid.scent_positions
+        self.grid.add_scent(5, 3)
+        exit_map = self.grid.exit_map
+        self.assertIs(self.grid.reset(20, 10), self.grid)
+        self.assertIs(self.grid.scent_positions, store)
+        self.assertEqual(self.grid.get_dimensions(), (20, 10))
+        self.assertEqual(len(store), 0)
+        self.assertIsNot(self.grid.exit_map, exit_map)
+
+        self.grid.add_scent(20, 10)
+        self.grid.reset(2, 2)
+        self.assertIs(self.grid.scent_positions, store)
+        self.assertFalse(self.grid.has_scent(2, 2))
+        self.grid.add_scent(2, 2)
+        self.assertEqual(self.grid.scent_positions, {(2, 2)})
+
+    def test_reset_changes_store_kind(self):
+        """Test that reset switches between dense and sparse stores when the size requires it"""
+        huge = DENSE_PERIMETER_LIMIT
+        self.grid.reset(huge, huge)
+        self.assertEqual(self.grid.scent_positions.kind, 'sparse')
+        sparse = self.grid.scent_positions
+        self.grid.add_scent(0, huge)
+        self.grid.reset(huge + 1, huge)
+        self.assertIs(self.grid.scent_positions, sparse)
+        self.assertEqual(len(sparse), 0)
+        self.grid.reset(5, 3)
+        self.assertEqual(self.grid.scent_positions.kind, 'dense')
+
     def test_get_dimensions(self):
         """Test dimension retrieval"""
         dimensions = self.grid.get_dimensions()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import io
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mission_runner import iter_missions, run_mission, run_missions, run_mission_stream
+
+
+MULTI_MISSION_INPUT = [
+    '5 3',
+    '1 1 E', 'RFRFRFRF',
+    '3 2 N', 'FRRFLLFFRRFLL',
+    '0 3 W', 'LLFFFLFLFL',
+    '',
+    '2 2',
+    '2 2 N', 'FF',
+    '2 2 N', 'FXF',
+]
+
+
+class TestMissionRunner(unittest.TestCase):
+    """Test cases for the multi-mission format and process pool runner"""
+
+    def test_iter_missions(self):
+        """Test that grid lines split the stream into independent missions"""
+        missions = list(iter_missions(MULTI_MISSION_INPUT))
+        self.assertEqual(len(missions), 2)
+        self.assertEqual(missions[0][:2], (5, 3))
+        self.assertEqual(len(missions[0][2]), 3)
+        self.assertEqual(missions[1], (2, 2, [(2, 2, 'N', 'FF'), (2, 2, 'N', 'FXF')]))
+
+    def test_iter_missions_validation(self):
+        """Test that limits and ordering are enforced"""
+        with self.assertRaises(ValueError):
+            list(iter_missions(['51 3']))
+        with self.assertRaises(ValueError):
+            list(iter_missions(['1 1 E', 'F']))
+        with self.assertRaises(ValueError):
+            list(iter_missions(['5 3', '1 1 E', 'F' * 101]))
+
+    def test_run_mission_collects_warnings_in_order(self):
+        """Test that warnings are returned in line with the results"""
+        output = run_mission((2, 2, [(2, 2, 'N', 'FF'), (2, 2, 'N', 'FXF')]))
+        self.assertEqual(output, ["2 2 N LOST", "Warning: Unknown command 'X' ignored", "2 2 N"])
+
+    def test_scent_is_private_to_each_mission(self):
+        """Test that a scent from one mission does not save a robot in the next"""
+        mission = (2, 2, [(2, 2, 'N', 'F')])
+        outputs = list(run_missions([mission, mission]))
+        self.assertEqual(outputs, [["2 2 N LOST"], ["2 2 N LOST"]])
+
+    def test_reused_grid_between_missions(self):
+        """Test that missions of different sizes run on the reused grid as on fresh grids"""
+        missions = [(2, 2, [(2, 2, 'N', 'F'), (2, 2, 'N', 'FR')]),
+                    (8, 1, [(8, 1, 'E', 'F'), (8, 1, 'E', 'F')]),
+                    (2, 2, [(2, 2, 'N', 'F')])]
+        outputs = list(run_missions(missions, gc_pause=True))
+        self.assertEqual(outputs, [["2 2 N LOST", "2 2 E"], ["8 1 E LOST", "8 1 E"], ["2 2 N LOST"]])
+
+    def test_workers_preserve_input_order(self):
+        """Test that pooled results come back in input order and match a single process"""
+        missions = [(5, 3, [(index % 6, 1, 'N', 'F' * (index % 5) + 'R')]) for index in range(40)]
+        single = list(run_missions(missions, workers=1))
+        pooled = list(run_missions(missions, workers=2, chunk_size=3))
+        self.assertEqual(pooled, single)
+
+    def test_run_mission_stream_output(self):
+        """Test that missions are written separated by a blank line"""
+        out = io.StringIO()
+        count = run_mission_stream(MULTI_MISSION_INPUT, out, workers=1)
+        self.assertEqual(count, 2)
+        self.assertEqual(out.getvalue(),
+                         "1 1 E\n3 3 N LOST\n2 3 S\n\n"
+                         "2 2 N LOST\nWarning: Unknown command 'X' ignored\n2 2 N\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
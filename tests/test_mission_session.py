@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import random
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mission_session import MissionSession
+from mars_grid import MarsGrid
+from robot import Robot
+from command_processor import CommandProcessor
+from validation import ValidationError
+
+
+# Simulate a mission from scratch, one robot after another
+def simulate(max_x, max_y, robots):
+    grid = MarsGrid(max_x, max_y)
+    command_processor = CommandProcessor(warn=lambda message: None)
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        command_processor.execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results
+
+
+# Random robot for a 5x3 grid, forward-heavy so many robots are lost
+def random_robot(rng):
+    instructions = ''.join(rng.choice('LRFFF') for _ in range(rng.randint(1, 20)))
+    return rng.randint(0, 5), rng.randint(0, 3), rng.choice('NESW'), instructions
+
+
+class TestMissionSession(unittest.TestCase):
+    """Test cases for incremental re-simulation of edited missions"""
+
+    def test_sample_mission(self):
+        """Test that a session reproduces the sample output"""
+        session = MissionSession.from_lines(["5 3", "1 1 E", "RFRFRFRF", "3 2 N", "FRRFLLFFRRFLL",
+                                             "0 3 W", "LLFFFLFLFL"])
+        self.assertEqual(session.results, ["1 1 E", "3 3 N LOST", "2 3 S"])
+        self.assertEqual(session.scents, [None, (3, 3), None])
+
+    def test_edit_returns_changed_results(self):
+        """Test that removing a lost robot's scent changes the later robot that relied on it"""
+        session = MissionSession.from_lines(["5 3", "1 1 E", "RFRFRFRF", "3 2 N", "FRRFLLFFRRFLL",
+                                             "0 3 W", "LLFFFLFLFL"])
+        changed = session.edit(1, instructions="L")
+        self.assertEqual(changed, {1: "3 2 W", 2: "3 3 N LOST"})
+        self.assertEqual(session.scents, [None, None, (3, 3)])
+        self.assertEqual(session.resimulated, 2)
+
+    def test_stops_when_scents_converge(self):
+        """Test that an edit leaving the scents unchanged re-simulates only the edited robot"""
+        rng = random.Random(3)
+        robots = [random_robot(rng) for _ in range(1000)]
+        robots[500] = (2, 1, 'N', 'F')
+        session = MissionSession(5, 3, robots)
+        changed = session.edit(500, instructions='R')
+        self.assertEqual(changed, {500: "2 1 E"})
+        self.assertEqual(session.resimulated, 1)
+
+    def test_random_edits_match_full_runs(self):
+        """Test that the session always agrees with re-running the whole mission"""
+        rng = random.Random(7)
+        robots = [random_robot(rng) for _ in range(200)]
+        session = MissionSession(5, 3, robots)
+        for _ in range(100):
+            index = rng.randrange(len(robots))
+            robots[index] = random_robot(rng)
+            before = list(session.results)
+            changed = session.edit(index, *robots[index])
+            expected = simulate(5, 3, robots)
+            self.assertEqual(session.results, expected)
+            self.assertEqual(changed, {i: result for i, result in enumerate(expected) if result != before[i]})
+            self.assertEqual(sorted(session.grid.scent_positions),
+                             sorted(scent for scent in session.scents if scent is not None))
+
+    def test_warnings_kept_per_robot(self):
+        """Test that warnings are recorded with their robot and replayed in the output"""
+        session = MissionSession(5, 3, [(1, 1, 'E', 'FX'), (0, 0, 'N', 'F')])
+        self.assertEqual(session.output_lines(), ["Warning: Unknown command 'X' ignored", "2 1 E", "0 1 N"])
+        session.edit(0, instructions='F')
+        self.assertEqual(session.output_lines(), ["2 1 E", "0 1 N"])
+
+    def test_invalid_edits(self):
+        """Test that invalid edits are rejected without changing the mission"""
+        session = MissionSession(5, 3, [(1, 1, 'E', 'F')])
+        with self.assertRaises(ValidationError):
+            session.edit(0, orientation='X')
+        with self.assertRaises(ValidationError):
+            session.edit(0, instructions='F' * 101)
+        with self.assertRaises(IndexError):
+            session.edit(1, instructions='F')
+        with self.assertRaises(IndexError):
+            session.edit(-1, instructions='FF')
+        self.assertEqual(session.edit(0, instructions='F'), {})
+        self.assertEqual(session.results, ["2 1 E"])
+
+
+if __name__ == '__main__':
+    unittest.main()
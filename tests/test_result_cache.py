@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import io
+import random
+from contextlib import redirect_stderr
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from result_cache import ResultCache
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+from main import run_stream, run_batch, _parse_args
+
+
+# Simulate a fleet, through the cache when one is given, returning results and warnings
+def simulate(robots, cache=None, max_x=5, max_y=3):
+    grid = MarsGrid(max_x, max_y)
+    warnings = []
+    command_processor = CommandProcessor(warn=warnings.append)
+    execute_commands = command_processor.execute_commands
+    if cache is not None:
+        cache.command_processor = command_processor
+        execute_commands = cache.execute_commands
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results, warnings, sorted(grid.scent_positions)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the result deduplication cache"""
+
+    def test_duplicate_fleet_matches_reference(self):
+        """Test that a fleet full of duplicates gives the same results, warnings and scents"""
+        rng = random.Random(11)
+        starts = [(rng.randint(0, 5), rng.randint(0, 3), rng.choice('NESW')) for _ in range(10)]
+        pool = [''.join(rng.choice('LRFFFX') for _ in range(12)) for _ in range(10)]
+        robots = [rng.choice(starts) + (rng.choice(pool),) for _ in range(2000)]
+        cache = ResultCache()
+        self.assertEqual(simulate(robots, cache), simulate(robots))
+        self.assertGreater(cache.hits, cache.misses)
+        self.assertGreater(cache.stale, 0)
+
+    def test_changed_scent_is_not_reused(self):
+        """Test that a result is recomputed when a cell it consulted gained scent"""
+        cache = ResultCache()
+        results, _, _ = simulate([(3, 3, 'N', 'FRF'), (3, 3, 'N', 'FRF')], cache)
+        self.assertEqual(results, ["3 3 N LOST", "4 3 E"])
+        self.assertEqual((cache.hits, cache.misses, cache.stale), (0, 2, 1))
+
+    def test_reuse_replays_scents_and_warnings(self):
+        """Test that a hit adds the scent and repeats the warnings of the original run"""
+        cache = ResultCache(CommandProcessor(warn=lambda message: None))
+        first = MarsGrid(5, 3)
+        cache.execute_commands(Robot(3, 3, 'N', first), 'XF')
+
+        warnings = []
+        cache.command_processor.warn = warnings.append
+        second = MarsGrid(5, 3)
+        robot = Robot(3, 3, 'N', second)
+        cache.execute_commands(robot, 'XF')
+        self.assertEqual(str(robot), "3 3 N LOST")
+        self.assertTrue(second.has_scent(3, 3))
+        self.assertEqual(warnings, ["Warning: Unknown command 'X' ignored"])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_bounded_eviction(self):
+        """Test that the least recently used result is evicted"""
+        cache = ResultCache(CommandProcessor(), max_size=2)
+        grid = MarsGrid(5, 3)
+        for instructions in ('F', 'R', 'F', 'L'):
+            cache.execute_commands(Robot(1, 1, 'N', grid), instructions)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache.execute_commands(Robot(1, 1, 'N', grid), 'R')
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+    def test_untracked_grid_access_is_not_cached(self):
+        """Test that runs reading the grid through unrecorded means are never reused"""
+        command_processor = CommandProcessor()
+        command_processor.register_command('E', lambda robot: robot.grid.exit_map.exit(robot.x, robot.y, 'N'))
+        cache = ResultCache(command_processor)
+        grid = MarsGrid(5, 3)
+        cache.execute_commands(Robot(1, 1, 'N', grid), 'EF')
+        cache.execute_commands(Robot(1, 1, 'N', grid), 'EF')
+        self.assertEqual((cache.hits, len(cache)), (0, 0))
+
+    def test_run_stream(self):
+        """Test that streaming through the cache gives the same output"""
+        mission = "5 3\n" + "3 2 N\nFRRFLLFFRRFLL\n1 1 E\nRFRFRFRF\n" * 50
+        expected = io.StringIO()
+        run_stream(io.StringIO(mission), expected)
+        out = io.StringIO()
+        cache = ResultCache()
+        run_stream(io.StringIO(mission), out, result_cache=cache)
+        self.assertEqual(out.getvalue(), expected.getvalue())
+        self.assertEqual(cache.misses, 3)
+
+    def test_run_batch(self):
+        """Test that batch mode through the cache gives the same output"""
+        mission = ("5 3\n" + "3 2 N\nFRRFLLFFRRFLL\n1 1 E\nRFRXFRFRF\n" * 50).encode()
+        cache = ResultCache()
+        self.assertEqual(run_batch(mission, result_cache=cache), run_batch(mission))
+        self.assertEqual(cache.misses, 3)
+
+    def test_dedup_rejected_in_other_modes(self):
+        """Test that --dedup is refused where it would be ignored"""
+        self.assertTrue(_parse_args(['--batch', '--dedup']).dedup)
+        for mode in (['--workers', '2'], ['--lockstep'], ['--profile'], ['--validate']):
+            with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+                _parse_args(mode + ['--dedup'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import sys
 import os
+import random
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -58,6 +59,55 @@ class TestRobot(unittest.TestCase):
         robot.turn_right()
         self.assertEqual(robot.orientation, 'N')
     
+    def test_rotate(self):
+        """Test rotating by several quarter turns at once"""
+        robot = Robot(1, 1, 'N', self.grid)
+        robot.rotate(3)
+        self.assertEqual(robot.orientation, 'W')
+        robot.rotate(2)
+        self.assertEqual(robot.orientation, 'E')
+        robot.rotate(-1)
+        self.assertEqual(robot.orientation, 'N')
+
+    def test_heading_index(self):
+        """Test that the integer heading follows the ORIENTATIONS order"""
+        for index, orientation in enumerate(Robot.ORIENTATIONS):
+            robot = Robot(1, 1, orientation, self.grid)
+            self.assertEqual(robot.heading, index)
+
+    def test_orientation_assignment(self):
+        """Test that orientation can be reassigned and is validated"""
+        robot = Robot(1, 1, 'N', self.grid)
+        robot.orientation = 'S'
+        self.assertEqual(robot.orientation, 'S')
+        self.assertEqual(str(robot), "1 1 S")
+
+        with self.assertRaises(ValueError):
+            Robot(1, 1, 'X', self.grid)
+
+    def test_slots(self):
+        """Test that robots use slots rather than a per-instance dict"""
+        robot = Robot(1, 1, 'N', self.grid)
+        self.assertFalse(hasattr(robot, '__dict__'))
+        with self.assertRaises(AttributeError):
+            robot.speed = 2
+
+    def test_reset(self):
+        """Test that a reset robot behaves like a new one"""
+        robot = Robot(3, 3, 'N', self.grid)
+        robot.move_forward()
+        self.assertTrue(robot.is_lost)
+        self.assertIs(robot.reset(1, 2, 'W'), robot)
+        self.assertEqual(str(robot), "1 2 W")
+        robot.move_forward()
+        self.assertEqual(str(robot), "0 2 W")
+
+        other_grid = MarsGrid(1, 1)
+        robot.reset(1, 1, 'E', other_grid)
+        self.assertIs(robot.grid, other_grid)
+        with self.assertRaises(ValueError):
+            robot.reset(0, 0, 'X')
+
     def test_move_forward_valid(self):
         """Test valid forward movement"""
         # Test moving north
@@ -101,6 +151,57 @@ class TestRobot(unittest.TestCase):
         self.assertEqual(robot2.x, 5)
         self.assertEqual(robot2.y, 3)
     
+    def test_advance_within_grid(self):
+        """Test that a forward run that stays on the grid moves the full distance"""
+        robot = Robot(0, 1, 'E', self.grid)
+        robot.advance(4)
+        self.assertEqual(robot.get_position(), (4, 1, 'E'))
+        self.assertFalse(robot.is_lost)
+
+    def test_advance_off_grid(self):
+        """Test that a forward run past the edge is lost on the boundary cell"""
+        robot = Robot(1, 1, 'N', self.grid)
+        robot.advance(10)
+        self.assertEqual(str(robot), "1 3 N LOST")
+        self.assertTrue(self.grid.has_scent(1, 3))
+
+        # A second robot stops on the scent instead
+        robot = Robot(1, 0, 'N', self.grid)
+        robot.advance(10)
+        self.assertEqual(str(robot), "1 3 N")
+
+    def test_advance_matches_single_steps(self):
+        """Test that forward runs are identical to repeated single steps"""
+        rng = random.Random(7)
+        grid_run = MarsGrid(6, 4)
+        grid_steps = MarsGrid(6, 4)
+        for _ in range(500):
+            # Include starting positions just off the grid
+            x, y = rng.randint(-2, 8), rng.randint(-2, 6)
+            orientation = rng.choice('NESW')
+            steps = rng.randint(0, 12)
+
+            robot_run = Robot(x, y, orientation, grid_run)
+            robot_run.advance(steps)
+
+            robot_steps = Robot(x, y, orientation, grid_steps)
+            for _ in range(steps):
+                robot_steps.move_forward()
+
+            self.assertEqual(str(robot_run), str(robot_steps))
+            self.assertEqual(grid_run.scent_positions, grid_steps.scent_positions)
+
+    def test_move_in_other_directions(self):
+        """Test that moves backwards or sideways keep the heading and follow the scent rules"""
+        robot = Robot(2, 1, 'N', self.grid)
+        robot.move(1, 2)
+        self.assertEqual(str(robot), "2 0 N")
+        robot.move(3, 1)
+        self.assertEqual(str(robot), "5 0 N")
+        robot.move(1, 2)
+        self.assertEqual(str(robot), "5 0 N LOST")
+        self.assertTrue(self.grid.has_scent(5, 0))
+
     def test_lost_robot_ignores_commands(self):
         """Test that lost robot ignores further commands"""
         robot = Robot(5, 3, 'N', self.grid)
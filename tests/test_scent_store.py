@@ -0,0 +1,186 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import multiprocessing
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import scent_store
+from scent_store import (DenseScentStore, SparseScentStore, MappedScentStore, make_scent_store,
+                         perimeter_offset, perimeter_size, scent_store_from_bytes)
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+# Claim every cell along the bottom row of a shared scent file, returning the number won
+def claim_bottom_row(path):
+    with MappedScentStore(path, 50, 50) as store:
+        return sum(store.test_and_set(x, 0) for x in range(51))
+
+
+class TestScentStore(unittest.TestCase):
+    """Test cases for the scent storage backends"""
+
+    def test_perimeter_offsets_are_unique_and_dense(self):
+        """Test that every boundary cell maps to a distinct offset within the perimeter"""
+        for max_x, max_y in [(5, 3), (0, 0), (0, 4), (4, 0), (1, 1), (50, 50)]:
+            offsets = []
+            for x in range(max_x + 1):
+                for y in range(max_y + 1):
+                    offset = perimeter_offset(max_x, max_y, x, y)
+                    on_boundary = x in (0, max_x) or y in (0, max_y)
+                    self.assertEqual(offset >= 0, on_boundary)
+                    if on_boundary:
+                        self.assertLess(offset, perimeter_size(max_x, max_y))
+                        offsets.append(offset)
+            self.assertEqual(len(offsets), len(set(offsets)))
+
+    def test_dense_store_round_trip(self):
+        """Test adding, iterating and counting scents in the dense store"""
+        store = DenseScentStore(5, 3)
+        for x, y in [(0, 0), (5, 3), (0, 2), (5, 1), (3, 0), (3, 0)]:
+            store.add(x, y)
+        self.assertEqual(len(store), 5)
+        self.assertEqual(set(store), {(0, 0), (5, 3), (0, 2), (5, 1), (3, 0)})
+        self.assertTrue(store.has(5, 1))
+        self.assertFalse(store.has(5, 2))
+
+    def test_dense_store_accepts_off_perimeter_positions(self):
+        """Test that interior and off-grid scents fall back to the overflow set"""
+        store = DenseScentStore(5, 3)
+        store.add(2, 2)
+        store.add(-4, 9)
+        self.assertTrue(store.has(2, 2))
+        self.assertTrue((-4, 9) in store)
+        self.assertEqual(len(store), 2)
+
+    def test_backend_selection(self):
+        """Test that the backend is chosen from the grid dimensions"""
+        self.assertIsInstance(make_scent_store(50, 50), DenseScentStore)
+        huge = scent_store.DENSE_PERIMETER_LIMIT
+        self.assertIsInstance(make_scent_store(huge, huge), SparseScentStore)
+        self.assertIsInstance(MarsGrid(5, 3).scent_positions, DenseScentStore)
+
+    def test_blob_round_trip(self):
+        """Test exporting and importing both backends"""
+        for store in (DenseScentStore(7, 4), SparseScentStore(7, 4)):
+            for x, y in [(0, 0), (7, 4), (7, 2), (3, 3)]:
+                store.add(x, y)
+            restored = scent_store_from_bytes(store.to_bytes())
+            self.assertEqual(type(restored), type(store))
+            self.assertEqual(restored, store)
+            self.assertEqual(len(restored), 4)
+
+    def test_dense_blob_is_compact(self):
+        """Test that a dense blob is a few bytes per perimeter octet"""
+        store = DenseScentStore(50, 50)
+        for x in range(51):
+            store.add(x, 0)
+        self.assertLess(len(store.to_bytes()), 40)
+
+    def test_invalid_blob(self):
+        """Test that blobs without the expected header are rejected"""
+        with self.assertRaises(ValueError):
+            scent_store_from_bytes(b'nope')
+
+    def test_grid_export_import(self):
+        """Test moving scent state between grids, including across backends"""
+        grid = MarsGrid(5, 3)
+        grid.add_scent(5, 3)
+        grid.add_scent(0, 0)
+
+        copy = MarsGrid(5, 3)
+        copy.import_scents(grid.export_scents())
+        self.assertTrue(copy.has_scent(5, 3))
+        self.assertTrue(copy.has_scent(0, 0))
+
+        sparse = MarsGrid(5, 3, scent_store=SparseScentStore(5, 3))
+        sparse.import_scents(grid.export_scents())
+        self.assertEqual(sparse.scent_positions, {(5, 3), (0, 0)})
+
+        with self.assertRaises(ValueError):
+            MarsGrid(4, 3).import_scents(grid.export_scents())
+
+    def test_test_and_set(self):
+        """Test that only the first claim of a position succeeds"""
+        for store in (DenseScentStore(5, 3), SparseScentStore(5, 3)):
+            self.assertTrue(store.test_and_set(5, 3))
+            self.assertFalse(store.test_and_set(5, 3))
+            self.assertTrue(store.test_and_set(2, 2))
+            self.assertFalse(store.test_and_set(2, 2))
+            self.assertEqual(len(store), 2)
+
+
+class TestMappedScentStore(unittest.TestCase):
+    """Test cases for the memory-mapped scent store"""
+
+    def setUp(self):
+        """Set up a temporary directory for scent files"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'grid.scent')
+
+    def tearDown(self):
+        """Remove the scent files"""
+        shutil.rmtree(self.directory)
+
+    def test_grid_reset_keeps_scent_file(self):
+        """Test that resetting a grid backed by a scent file never swaps the file for memory"""
+        with MappedScentStore(self.path, 5, 3) as store:
+            grid = MarsGrid(5, 3, scent_store=store)
+            grid.add_scent(3, 3)
+            grid.reset(5, 3)
+            self.assertIs(grid.scent_positions, store)
+            self.assertEqual(len(store), 0)
+            with self.assertRaises(ValueError):
+                grid.reset(10, 10)
+            self.assertIs(grid.scent_positions, store)
+
+    def test_scents_persist_between_runs(self):
+        """Test that a reopened scent file already knows the deadly edges"""
+        with MappedScentStore(self.path, 5, 3) as store:
+            robot = Robot(3, 3, 'N', MarsGrid(5, 3, scent_store=store))
+            robot.move_forward()
+            self.assertTrue(robot.is_lost)
+
+        with MappedScentStore(self.path, 5, 3) as store:
+            self.assertEqual(set(store), {(3, 3)})
+            robot = Robot(3, 3, 'N', MarsGrid(5, 3, scent_store=store))
+            robot.move_forward()
+            self.assertFalse(robot.is_lost)
+
+    def test_shared_between_open_stores(self):
+        """Test that two mappings of one file see each other's scents"""
+        with MappedScentStore(self.path, 5, 3) as first, MappedScentStore(self.path, 5, 3) as second:
+            self.assertTrue(first.test_and_set(0, 2))
+            self.assertTrue(second.has(0, 2))
+            self.assertFalse(second.test_and_set(0, 2))
+
+    def test_dimension_mismatch(self):
+        """Test that a scent file cannot be opened for a different grid"""
+        MappedScentStore(self.path, 5, 3).close()
+        with self.assertRaises(ValueError):
+            MappedScentStore(self.path, 6, 3)
+
+    def test_export_matches_dense_store(self):
+        """Test that a mapped store exports the same blob as a dense store"""
+        dense = DenseScentStore(5, 3)
+        with MappedScentStore(self.path, 5, 3) as mapped:
+            for store in (dense, mapped):
+                store.add(5, 1)
+                store.add(0, 0)
+            self.assertEqual(mapped.to_bytes(), dense.to_bytes())
+            self.assertEqual(len(mapped), 2)
+
+    def test_claims_are_atomic_across_processes(self):
+        """Test that each cell is claimed by exactly one of several processes"""
+        MappedScentStore(self.path, 50, 50).close()
+        with multiprocessing.Pool(4) as pool:
+            wins = pool.map(claim_bottom_row, [self.path] * 4)
+        self.assertEqual(sum(wins), 51)
+
+
+if __name__ == '__main__':
+    unittest.main()
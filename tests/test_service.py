@@ -0,0 +1,183 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+import time
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from service import MissionService
+
+
+# Start a service on a free localhost port, run a client coroutine against it and stop the service
+def run_with_service(client, **options):
+    async def scenario():
+        service = MissionService(**options)
+        port = await service.start('127.0.0.1', 0)
+        try:
+            return await client(service, port)
+        finally:
+            await service.close()
+
+    return asyncio.run(scenario())
+
+
+# Send JSON line requests over one connection and return the responses keyed by id
+async def send_json_lines(port, requests):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b'\n')
+    writer.write_eof()
+    responses = {}
+    for _ in requests:
+        response = json.loads(await reader.readline())
+        responses[response['id']] = response
+    writer.close()
+    return responses
+
+
+class TestMissionService(unittest.TestCase):
+    """Test cases for the asyncio mission service, run against localhost"""
+
+    def test_json_request(self):
+        """Test a mission sent as a JSON line"""
+        async def client(service, port):
+            return await send_json_lines(port, [{
+                'id': 1, 'grid': [5, 3],
+                'robots': [[1, 1, 'E', 'RFRFRFRF'], [3, 2, 'N', 'FRRFLLFFRRFLL'], [0, 3, 'W', 'LLFFFLFLFL']],
+            }])
+
+        responses = run_with_service(client)
+        self.assertEqual(responses[1]['results'], ["1 1 E", "3 3 N LOST", "2 3 S"])
+        self.assertEqual(responses[1]['warnings'], [])
+
+    def test_text_format_connection(self):
+        """Test a connection sending the plain text format"""
+        async def client(service, port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b"5 3\n1 1 E\nRFRFRFRF\n3 2 N\nFXRRFLLFFRRFLL\n")
+            writer.write_eof()
+            output = await reader.read()
+            writer.close()
+            return output.decode()
+
+        self.assertEqual(run_with_service(client),
+                         "1 1 E\nWarning: Unknown command 'X' ignored\n3 3 N LOST\n")
+
+    def test_scent_persists_between_requests(self):
+        """Test that a named grid keeps its scents for later requests"""
+        async def client(service, port):
+            first = await send_json_lines(port, [{'id': 'a', 'grid_id': 'mars', 'grid': [5, 3],
+                                                  'robots': [[3, 3, 'N', 'F']]}])
+            second = await send_json_lines(port, [{'id': 'b', 'grid_id': 'mars',
+                                                   'robots': [[3, 3, 'N', 'F']]}])
+            return first['a'], second['b']
+
+        first, second = run_with_service(client)
+        self.assertEqual(first['results'], ["3 3 N LOST"])
+        self.assertEqual(second['results'], ["3 3 N"])
+
+    def test_concurrent_requests_are_batched(self):
+        """Test that requests arriving together are simulated in one batch"""
+        async def client(service, port):
+            requests = [{'id': index, 'grid': [5, 3], 'robots': [[1, 1, 'N', 'F']]} for index in range(20)]
+            responses = await asyncio.gather(*(send_json_lines(port, [request]) for request in requests))
+            return service.batches, responses
+
+        batches, responses = run_with_service(client, batch_window=0.05)
+        self.assertLess(batches, 20)
+        for response in responses:
+            self.assertEqual(list(response.values())[0]['results'], ["1 2 N"])
+
+    def test_errors(self):
+        """Test that invalid requests get an error response and do not stop the service"""
+        async def client(service, port):
+            return await send_json_lines(port, [
+                {'id': 1, 'grid_id': 'unknown', 'robots': []},
+                {'id': 2, 'grid': [51, 3], 'robots': []},
+                {'id': 3, 'grid': [5, 3], 'robots': [[1, 1, 'N', 'F' * 101]]},
+                {'id': 4, 'grid': [5, 3], 'robots': [[1, 1, 'N', 'F']]},
+                {'id': 5, 'text': 5},
+                {'id': 6, 'text': None},
+                {'id': 7, 'grid': [5, 3], 'robots': [[1, 1, 'N']]},
+                {'id': 8, 'grid': [5, 3], 'robots': [[1, 1, 'N', 'F']]},
+                {'id': 9, 'grid': [5, 3], 'robots': [[1, 1, 'N', '(X)*9999999999']]},
+                {'id': 10, 'grid': "53", 'robots': []},
+                {'id': 11, 'grid': [5.9, 3], 'robots': []},
+                {'id': 12, 'grid': [-1, 3], 'robots': []},
+                {'id': 13, 'robots': [[1, 1, 'N', 'F']]},
+            ])
+
+        responses = run_with_service(client)
+        self.assertIn("must be a string", responses[5]['error'])
+        self.assertIn("must be a string", responses[6]['error'])
+        self.assertIn("Invalid robot", responses[7]['error'])
+        self.assertEqual(responses[8]['results'], ["1 2 N"])
+        self.assertIn("run one at a time", responses[9]['error'])
+        self.assertIn("list of two integers", responses[10]['error'])
+        self.assertIn("list of two integers", responses[11]['error'])
+        self.assertIn("must not be negative", responses[12]['error'])
+        self.assertEqual(responses[13]['error'], "Grid dimensions are required for requests without a grid_id.")
+        self.assertIn("Unknown grid", responses[1]['error'])
+        self.assertIn("must not exceed 50", responses[2]['error'])
+        self.assertIn("exceeds maximum of 100", responses[3]['error'])
+        self.assertEqual(responses[4]['results'], ["1 2 N"])
+
+    def test_rejected_request_leaves_grid_untouched(self):
+        """Test that a request rejected by a later robot leaves no scent on a named grid"""
+        async def client(service, port):
+            return await send_json_lines(port, [
+                {'id': 1, 'grid_id': 'a', 'grid': [5, 3],
+                 'robots': [[3, 2, 'N', 'FRRFLLFFRRFLL'], [0, 0, 'N', 'F' * 101]]},
+                {'id': 2, 'grid_id': 'a', 'grid': [5, 3], 'robots': [[3, 2, 'N', 'FRRFLLFFRRFLL']]},
+            ])
+
+        responses = run_with_service(client)
+        self.assertIn("exceeds maximum of 100", responses[1]['error'])
+        self.assertEqual(responses[2]['results'], ["3 3 N LOST"])
+
+    def test_named_grids_are_bounded(self):
+        """Test that the least recently used grid is dropped and grids can be deleted"""
+        async def client(service, port):
+            responses = await send_json_lines(port, [
+                {'id': 1, 'grid_id': 'a', 'grid': [5, 3], 'robots': []},
+                {'id': 2, 'grid_id': 'b', 'grid': [5, 3], 'robots': []},
+                {'id': 3, 'grid_id': 'a', 'robots': []},
+                {'id': 4, 'grid_id': 'c', 'grid': [5, 3], 'robots': []},
+            ])
+            kept = list(service.grids)
+            deleted = await send_json_lines(port, [{'id': 5, 'delete_grid': 'a'}, {'id': 6, 'delete_grid': 'b'}])
+            return responses, kept, deleted, list(service.grids)
+
+        responses, kept, deleted, remaining = run_with_service(client, max_grids=2)
+        self.assertNotIn('error', responses[4])
+        self.assertEqual(kept, ['a', 'c'])
+        self.assertTrue(deleted[5]['deleted'])
+        self.assertFalse(deleted[6]['deleted'])
+        self.assertEqual(remaining, ['c'])
+
+    def test_simulation_runs_off_the_event_loop(self):
+        """Test that the event loop keeps running while a batch is simulated"""
+        async def client(service, port):
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.001)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            # A callback slows every step down, so the request takes a while to simulate
+            service.command_processor.register_command('S', lambda robot: time.sleep(0.0005))
+            await send_json_lines(port, [{'id': 1, 'grid': [5, 3], 'robots': [[1, 1, 'N', 'S' * 100]]}])
+            task.cancel()
+            return ticks
+
+        self.assertGreater(run_with_service(client), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
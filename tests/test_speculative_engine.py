@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import io
+import random
+from contextlib import redirect_stdout
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from speculative_engine import simulate_speculative
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+# Run robots one after another with the reference engine
+def simulate_sequential(grid, robots):
+    processor = CommandProcessor()
+    results = []
+    for x, y, orientation, instructions in robots:
+        robot = Robot(x, y, orientation, grid)
+        processor.execute_commands(robot, instructions)
+        results.append(str(robot))
+    return results
+
+
+class TestSpeculativeEngine(unittest.TestCase):
+    """Test cases for the speculative parallel engine"""
+
+    def setUp(self):
+        """Set up a fleet where many robots share exit cells"""
+        rng = random.Random(99)
+        self.robots = [(rng.randint(0, 4), rng.randint(0, 3), rng.choice('NESW'),
+                        ''.join(rng.choice('LRFFFX') for _ in range(rng.randint(0, 25))))
+                       for _ in range(300)]
+
+    def test_sample_input(self):
+        """Test the sample mission and the re-simulation of the conflicting robot"""
+        robots = [(1, 1, 'E', 'RFRFRFRF'), (3, 2, 'N', 'FRRFLLFFRRFLL'), (0, 3, 'W', 'LLFFFLFLFL')]
+        results, resimulations = simulate_speculative(MarsGrid(5, 3), robots)
+        self.assertEqual(results, ["1 1 E", "3 3 N LOST", "2 3 S"])
+
+        # Both robots fall from (3, 3) in the same snapshot, the second must be re-simulated
+        results, resimulations = simulate_speculative(MarsGrid(5, 3), [(3, 3, 'N', 'F'), (3, 2, 'N', 'FFR')])
+        self.assertEqual(results, ["3 3 N LOST", "3 3 E"])
+        self.assertEqual(resimulations, 1)
+
+    def test_matches_sequential_in_process(self):
+        """Test that in-process speculation matches the sequential engine, warnings included"""
+        expected_output = io.StringIO()
+        grid_sequential = MarsGrid(4, 3)
+        with redirect_stdout(expected_output):
+            expected = simulate_sequential(grid_sequential, self.robots)
+
+        output = io.StringIO()
+        grid = MarsGrid(4, 3)
+        with redirect_stdout(output):
+            results, _ = simulate_speculative(grid, self.robots, chunk_size=32)
+        self.assertEqual(results, expected)
+        self.assertEqual(output.getvalue(), expected_output.getvalue())
+        self.assertEqual(grid.scent_positions, grid_sequential.scent_positions)
+
+    def test_matches_sequential_with_workers(self):
+        """Test that multi-process speculation matches the sequential engine"""
+        warnings = []
+        expected = simulate_sequential(MarsGrid(4, 3), [robot[:3] + (robot[3].replace('X', ''),)
+                                                        for robot in self.robots])
+        results, resimulations = simulate_speculative(MarsGrid(4, 3), self.robots, workers=2,
+                                                      chunk_size=25, warn=warnings.append)
+        self.assertEqual(results, expected)
+        self.assertGreater(resimulations, 0)
+        self.assertTrue(warnings)
+
+
+if __name__ == '__main__':
+    unittest.main()
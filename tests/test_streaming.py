@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+import io
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import iter_lines, stream_robots, run_stream, run_batch
+
+
+SAMPLE_INPUT = "5 3\n1 1 E\nRFRFRFRF\n3 2 N\nFRRFLLFFRRFLL\n0 3 W\nLLFFFLFLFL\n"
+
+
+class TestStreaming(unittest.TestCase):
+    """Test cases for the streaming parser and writer in main.py"""
+
+    def test_iter_lines_across_chunk_boundaries(self):
+        """Test that lines split across small chunks are reassembled"""
+        lines = list(iter_lines(io.StringIO(SAMPLE_INPUT), chunk_size=3))
+        self.assertEqual(lines, SAMPLE_INPUT.split('\n')[:-1])
+
+    def test_iter_lines_without_trailing_newline(self):
+        """Test that the final line is yielded without a trailing newline"""
+        lines = list(iter_lines(io.StringIO("5 3\n1 1 E"), chunk_size=4))
+        self.assertEqual(lines, ['5 3', '1 1 E'])
+
+    def test_iter_lines_long_line(self):
+        """Test that a line spanning many chunks, and empty lines after it, are kept intact"""
+        text = "5 3\n" + "F" * 10000 + "\n\nRF\n"
+        lines = list(iter_lines(io.StringIO(text), chunk_size=7))
+        self.assertEqual(lines, ['5 3', 'F' * 10000, '', 'RF'])
+
+    def test_stream_robots_is_lazy(self):
+        """Test that a robot is yielded as soon as its two lines are read"""
+        def lines():
+            yield '1 1 E'
+            yield 'RFRFRFRF'
+            raise AssertionError("Read beyond the first robot")
+
+        robots = stream_robots(lines())
+        self.assertEqual(next(robots), (1, 1, 'E', 'RFRFRFRF'))
+
+    def test_stream_robots_skips_blank_lines(self):
+        """Test that blank lines between robots are ignored"""
+        robots = list(stream_robots(['', '1 1 E', 'RF', '   ', '2 2 N', 'L']))
+        self.assertEqual(robots, [(1, 1, 'E', 'RF'), (2, 2, 'N', 'L')])
+
+    def test_stream_robots_rejects_long_instructions(self):
+        """Test that the 100 character instruction limit applies when streaming"""
+        with self.assertRaises(ValueError) as context:
+            list(stream_robots(['1 1 E', 'F' * 101]))
+        self.assertIn("exceeds maximum of 100", str(context.exception))
+
+    def test_run_stream_sample_input(self):
+        """Test the sample mission produces the expected output"""
+        out = io.StringIO()
+        count = run_stream(io.StringIO(SAMPLE_INPUT), out, chunk_size=5)
+        self.assertEqual(count, 3)
+        self.assertEqual(out.getvalue(), "1 1 E\n3 3 N LOST\n2 3 S\n")
+
+    def test_run_stream_rejects_large_grid(self):
+        """Test that the 50 unit grid limit applies when streaming"""
+        with self.assertRaises(ValueError) as context:
+            run_stream(io.StringIO("51 3\n"), io.StringIO())
+        self.assertIn("Grid dimensions must not exceed 50", str(context.exception))
+
+    def test_invalid_grid_line_fails_in_every_mode(self):
+        """Test that an invalid grid line raises in streaming and batch mode alike"""
+        with self.assertRaises(ValueError) as context:
+            run_stream(io.StringIO("x 3\n1 1 E\nF\n"), io.StringIO())
+        self.assertIn("Line 1: Invalid grid dimensions", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            run_batch(b"x 3\n1 1 E\nF\n")
+        self.assertIn("Line 1: Invalid grid dimensions", str(context.exception))
+
+    def test_run_stream_empty_input(self):
+        """Test that empty input is reported as no grid"""
+        self.assertIsNone(run_stream(io.StringIO(""), io.StringIO()))
+
+    def test_run_batch_matches_stream(self):
+        """Test that batch mode produces the same output as streaming mode"""
+        data = SAMPLE_INPUT + "\n2 2 N\nFXF\n"
+        out = io.StringIO()
+        run_stream(io.StringIO(data), out)
+        self.assertEqual(run_batch(data.encode()).decode(), out.getvalue())
+
+    def test_run_batch_edge_cases(self):
+        """Test empty input, a trailing robot without instructions and blank instructions"""
+        self.assertIsNone(run_batch(b""))
+        self.assertEqual(run_batch(b"5 3\n"), b"")
+        self.assertEqual(run_batch(b"5 3\n1 1 E\nF\n2 2 N"), b"2 1 E\n")
+        self.assertEqual(run_batch(b"5 3\r\n1 1 E\r\n\r\n"), b"1 1 E\n")
+
+    def test_run_batch_validation(self):
+        """Test that batch mode enforces the same limits and formats"""
+        with self.assertRaises(ValueError):
+            run_batch(b"51 3\n")
+        with self.assertRaises(ValueError):
+            run_batch(b"five three\n")
+        with self.assertRaises(ValueError):
+            run_batch(b"5 3\n1 E\nF\n")
+        with self.assertRaises(ValueError):
+            run_batch(b"5 3\n1 1 E\n" + b"F" * 101 + b"\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import random
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trajectory import RingBuffer, TrajectoryRecorder
+from command_processor import CommandProcessor
+from mars_grid import MarsGrid
+from robot import Robot
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test cases for the array-backed ring buffer"""
+
+    def test_overwrites_oldest(self):
+        """Test that the buffer keeps only the newest samples in order"""
+        buffer = RingBuffer(3)
+        for step in range(5):
+            buffer.append(step * 10, step, -step, step % 4)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual([buffer[position][0] for position in range(3)], [20, 30, 40])
+        self.assertEqual(buffer[0], (20, 2, -2, 2))
+
+    def test_floor(self):
+        """Test finding the latest sample at or before a step"""
+        buffer = RingBuffer(4)
+        for step in (5, 10, 15):
+            buffer.append(step, step, 0, 0)
+        self.assertIsNone(buffer.floor(4))
+        self.assertEqual(buffer.floor(12)[0], 10)
+        self.assertEqual(buffer.floor(99)[0], 15)
+
+    def test_invalid_capacity(self):
+        """Test that an empty ring buffer is rejected"""
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+    """Test cases for trajectory recording and replay"""
+
+    def test_seek_matches_step_by_step_run(self):
+        """Test that every step of every robot replays exactly, including lost robots"""
+        rng = random.Random(11)
+        grid = MarsGrid(5, 3)
+        reference_grid = MarsGrid(5, 3)
+        processor = CommandProcessor()
+        recorder = TrajectoryRecorder(processor, capacity=2, stride=3)
+
+        for _ in range(150):
+            x, y, orientation = rng.randint(0, 5), rng.randint(0, 3), rng.choice('NESW')
+            instructions = ''.join(rng.choice('LRFFF') for _ in range(rng.randint(0, 30)))
+
+            # Reference states after every instruction on a separate grid
+            reference = Robot(x, y, orientation, reference_grid)
+            states = [(x, y, orientation, False)]
+            for instruction in instructions:
+                processor.execute_commands(reference, instruction)
+                states.append((reference.x, reference.y, reference.orientation, reference.is_lost))
+
+            robot = Robot(x, y, orientation, grid)
+            index = recorder.execute(robot, instructions)
+            self.assertEqual(str(robot), str(reference))
+
+            for step, state in enumerate(states):
+                self.assertEqual(recorder.seek(index, step), state)
+
+    def test_replay(self):
+        """Test replaying a lost robot step by step"""
+        grid = MarsGrid(5, 3)
+        recorder = TrajectoryRecorder()
+        recorder.execute(Robot(3, 2, 'N', grid), "FRRFLLFFRRFLL")
+        steps = list(recorder.trajectory(0).replay())
+        self.assertEqual(steps[0], (0, 3, 2, 'N', False))
+        self.assertEqual(steps[-1], (8, 3, 3, 'N', True))
+
+    def test_repetition_syntax_recorded_expanded(self):
+        """Test that steps of a repetition group count its expanded instructions"""
+        recorder = TrajectoryRecorder(stride=2)
+        recorder.execute(Robot(1, 1, 'E', MarsGrid(5, 3)), "(RF)*4")
+        self.assertEqual(len(recorder.trajectory(0)), 8)
+        self.assertEqual(recorder.seek(0, 2), (1, 0, 'S', False))
+        self.assertEqual(recorder.seek(0, 8), (1, 1, 'E', False))
+
+    def test_memory_is_bounded(self):
+        """Test robot sampling and the limit on kept trajectories"""
+        grid = MarsGrid(5, 3)
+        recorder = TrajectoryRecorder(capacity=4, stride=10, sample_every=2, max_robots=3)
+        for index in range(10):
+            recorder.execute(Robot(1, 1, 'N', grid), "RL" * 100)
+        self.assertEqual(list(recorder.trajectories), [4, 6, 8])
+        self.assertEqual(len(recorder.trajectory(8).samples), 4)
+        with self.assertRaises(KeyError):
+            recorder.trajectory(5)
+
+
+if __name__ == '__main__':
+    unittest.main()
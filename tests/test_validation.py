@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+import io
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from validation import Limits, Validator, ValidationError, UNLIMITED, LARGE_GRID_LIMITS, parse_limit, validate_mission
+from main import parse_input, stream_robots, run_stream, run_batch
+
+
+class TestLimits(unittest.TestCase):
+    """Test cases for configurable limits"""
+
+    def test_default_limits(self):
+        """Test that the defaults match the mission constraints"""
+        limits = Limits()
+        limits.check_grid(50, 50)
+        limits.check_instructions('F' * 100)
+        with self.assertRaises(ValidationError) as context:
+            limits.check_grid(51, 0, line=1)
+        self.assertEqual(str(context.exception), "Line 1: Grid dimensions must not exceed 50 for either axis.")
+        self.assertEqual(context.exception.line, 1)
+        with self.assertRaises(ValidationError):
+            limits.check_instructions('F' * 101)
+
+    def test_custom_and_disabled_limits(self):
+        """Test raised limits and limits switched off"""
+        Limits(max_coordinate=1000, max_instructions=5000).check_grid(1000, 20)
+        UNLIMITED.check_grid(10 ** 9, 10 ** 9)
+        UNLIMITED.check_instructions('F' * 10000)
+        with self.assertRaises(ValidationError) as context:
+            Limits(max_instructions=5).check_instructions('FFFFFF')
+        self.assertIn("exceeds maximum of 5 characters", str(context.exception))
+
+    def test_limits_from_environment(self):
+        """Test that limits are read from the environment, with 'none' disabling one"""
+        limits = Limits.from_env({})
+        self.assertEqual((limits.max_coordinate, limits.max_instructions), (50, 100))
+        limits = Limits.from_env({'MARS_MAX_COORDINATE': 'none', 'MARS_MAX_INSTRUCTIONS': '500'})
+        self.assertEqual((limits.max_coordinate, limits.max_instructions), (None, 500))
+        with self.assertRaises(ValueError):
+            Limits.from_env({'MARS_MAX_COORDINATE': 'big'})
+        with self.assertRaises(ValueError):
+            parse_limit('-1')
+
+    def test_large_grid_limits(self):
+        """Test that large-grid mode lifts the coordinate limit only"""
+        LARGE_GRID_LIMITS.check_grid(10 ** 30, 10 ** 30)
+        with self.assertRaises(ValidationError):
+            LARGE_GRID_LIMITS.check_instructions('F' * 101)
+
+    def test_negative_grid(self):
+        """Test that negative grid dimensions are rejected even without limits"""
+        with self.assertRaises(ValidationError):
+            UNLIMITED.check_grid(-1, 3)
+
+
+class TestValidator(unittest.TestCase):
+    """Test cases for single-pass validation"""
+
+    def test_fail_fast_stops_reading(self):
+        """Test that the first invalid robot raises before any later line is read"""
+        read = []
+
+        def lines():
+            for line in ['1 1 E', 'RF', '2 2 Q', 'F', '3 3 N', 'F']:
+                read.append(line)
+                yield line
+
+        robots = Validator().robots(lines())
+        self.assertEqual(next(robots), (1, 1, 'E', 'RF'))
+        with self.assertRaises(ValidationError) as context:
+            next(robots)
+        self.assertEqual(context.exception.line, 4)
+        self.assertEqual(len(read), 4)
+
+    def test_collect_all(self):
+        """Test that collect mode skips invalid robots and reports every error"""
+        validator = Validator(collect=True)
+        robots = list(validator.robots(['1 1 E', 'RF', '', 'x y N', 'F', '2 2 N', 'F' * 101, '3 3 S', 'L']))
+        self.assertEqual(robots, [(1, 1, 'E', 'RF'), (3, 3, 'S', 'L')])
+        self.assertEqual([error.line for error in validator.errors], [5, 8])
+        with self.assertRaises(ValidationError) as context:
+            validator.finish()
+        self.assertEqual(len(context.exception.errors), 2)
+        self.assertIn("Line 5: Invalid robot position 'x y N'.", str(context.exception))
+
+    def test_validate_mission(self):
+        """Test validating a whole mission without simulating it"""
+        self.assertEqual(validate_mission(['5 3', '1 1 E', 'RFRF', '3 2 N', 'FF']), 2)
+        with self.assertRaises(ValidationError) as context:
+            validate_mission(['5 x', '1 1 E', 'RF', '1 1 E', 'F' * 101])
+        self.assertEqual([error.line for error in context.exception.errors], [1, 5])
+        self.assertEqual(validate_mission(['60 60', '1 1 E', 'RF'], Limits(max_coordinate=100)), 1)
+
+
+class TestLimitsIntegration(unittest.TestCase):
+    """Test cases for limits passed to the input readers"""
+
+    def test_parse_input_limits(self):
+        """Test that parse_input enforces the limits it is given"""
+        with patch('builtins.input', side_effect=['80 80', '1 1 E', 'F' * 150, EOFError()]):
+            grid, robots_data = parse_input(Limits(100, 200))
+        self.assertEqual(grid.max_x, 80)
+        self.assertEqual(len(robots_data), 1)
+
+        with patch('builtins.input', side_effect=['5 3', '1 1 E', 'RF', '', '2 2 N', 'F' * 101]):
+            with self.assertRaises(ValueError) as context:
+                parse_input()
+        self.assertIn("Line 6:", str(context.exception))
+
+    def test_stream_and_batch_line_numbers(self):
+        """Test that streaming and batch modes report the same line numbers"""
+        mission = "5 3\n1 1 E\nRF\n\n1 1 E\n" + 'F' * 101 + "\n"
+        with self.assertRaises(ValueError) as stream_error:
+            run_stream(io.StringIO(mission), io.StringIO())
+        with self.assertRaises(ValueError) as batch_error:
+            run_batch(mission.encode())
+        self.assertEqual(str(stream_error.exception), str(batch_error.exception))
+        self.assertEqual(stream_error.exception.line, 6)
+
+        output = run_batch(mission.encode(), UNLIMITED)
+        self.assertEqual(output, b"1 0 S\n5 1 E LOST\n")
+
+    def test_stream_robots_limits(self):
+        """Test that stream_robots accepts limits"""
+        robots = list(stream_robots(['1 1 E', 'F' * 101], Limits(max_instructions=200)))
+        self.assertEqual(len(robots), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()